@@ -0,0 +1,213 @@
+# demo_scene.py
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Optional
+
+from OpenGL import GL as gl
+
+from matrix import Matrix, TransformNode
+
+from graphics_pipeline import GraphicsPipeline
+from graphics_library import GraphicsLibrary
+
+from primitives import Sprite2DVertex
+from primitives import Shape2DVertex
+
+from graphics_array_buffer import GraphicsArrayBuffer
+from graphics_index_buffer import GraphicsIndexBuffer
+from graphics_texture import GraphicsTexture
+from graphics_sprite import GraphicsSprite
+from redraw_scheduler import RedrawScheduler
+from render_layers import RenderLayer, RenderLayerStack
+from texture_cache import TextureCache
+
+import tracing
+
+class DemoScene:
+    """
+    The spinning sprite + shape scene. Only touches GraphicsLibrary, so
+    it draws the same into a GLFW window (main.py) or an offscreen
+    framebuffer on a headless context (render_headless.py).
+
+    The sprite ("base") and the shape ("labels") are cached layers; the
+    rotation is the layer stack's view transform, so spinning only
+    re-composites the two layer textures.
+
+    With a scheduler, the rotation runs as a scheduler animation and any
+    other change goes through mark_dirty(), so a paused scene is not
+    redrawn at all.
+    """
+
+    ANIMATION_ROTATE = "DemoScene.rotate"
+
+    def __init__(self) -> None:
+        self.graphics: Optional[GraphicsLibrary] = None
+        self.pipeline: Optional[GraphicsPipeline] = None
+
+        self.texture = GraphicsTexture()
+        self.texture_cache: Optional[TextureCache] = None
+        self.sprite = GraphicsSprite()
+
+        self.sprite_vertex_buffer = GraphicsArrayBuffer[Sprite2DVertex]()
+        self.sprite_index_buffer = GraphicsIndexBuffer()
+        self.shape_vertex_buffer = GraphicsArrayBuffer[Shape2DVertex]()
+        self.shape_index_buffer = GraphicsIndexBuffer()
+
+        self.roz = float(0.0)
+        self.animating: bool = True
+        self.scheduler: Optional[RedrawScheduler] = None
+
+        # Cached across frames; only re-composed (and re-uploaded) when changed.
+        self.projection_node = TransformNode()
+        self.content_node = TransformNode()
+        self.model_view = Matrix()
+
+        self.layers = RenderLayerStack()
+        self.layer_base = RenderLayer("base", self.draw_base)
+        self.layer_labels = RenderLayer("labels", self.draw_labels)
+
+    def load(
+        self,
+        pipeline: GraphicsPipeline,
+        graphics: GraphicsLibrary,
+        image_path: Path,
+        texture_cache: Optional[TextureCache] = None,
+    ) -> None:
+        """
+        With a texture_cache the image is shared through it (and decodes in
+        the background if the cache has a loader; the base layer shows the
+        placeholder until it arrives).
+        """
+        self.pipeline = pipeline
+        self.graphics = graphics
+
+        self.texture_cache = texture_cache
+        if texture_cache is not None:
+            self.texture = texture_cache.acquire(image_path, on_loaded=self._texture_loaded)
+        else:
+            self.texture.graphics = graphics
+            self.texture.file_name = image_path
+            self.texture.load()
+            self._texture_loaded(self.texture)
+
+        sprite_vertices = [
+            Sprite2DVertex(x=-140.0, y=-133.0, u=0.0, v=1.0),
+            Sprite2DVertex(x=140.0,  y=-133.0, u=1.0, v=1.0),
+            Sprite2DVertex(x=-140.0,  y=140.0, u=0.0, v=0.0),
+            Sprite2DVertex(x=140.0,  y=140.0, u=1.0, v=0.0),
+        ]
+        self.sprite_vertex_buffer.load(graphics, sprite_vertices)
+        self.sprite_index_buffer.load(graphics, [0, 1, 2, 3])
+
+        shape_vertices = [
+            Shape2DVertex(x=-128.0, y=-128.0),
+            Shape2DVertex(x=128.0,  y=-128.0),
+            Shape2DVertex(x=-128.0,  y=128.0),
+            Shape2DVertex(x=128.0,  y=128.0),
+        ]
+        self.shape_vertex_buffer.load(graphics, shape_vertices)
+        self.shape_index_buffer.load(graphics, [0, 1, 2, 3])
+
+        self.layers.load(graphics, pipeline.program_sprite2d)
+        self.layers.add(self.layer_base)
+        self.layers.add(self.layer_labels)
+
+    def _texture_loaded(self, texture: GraphicsTexture) -> None:
+        # May run inside TextureCache.acquire(), before load() has stored the result
+        self.texture = texture
+        texture.print()
+        self.sprite.load(graphics=self.graphics, texture=texture)
+        self.sprite.print()
+        self.layer_base.mark_dirty()
+
+    def attach_scheduler(self, scheduler: RedrawScheduler) -> None:
+        self.scheduler = scheduler
+        self.layers.attach_scheduler(scheduler)
+        self.set_animating(self.animating)
+
+    def set_animating(self, animating: bool) -> None:
+        self.animating = animating
+        if self.scheduler is None:
+            return
+        if animating:
+            self.scheduler.animation_start(self.ANIMATION_ROTATE)
+        else:
+            self.scheduler.animation_stop(self.ANIMATION_ROTATE)
+
+    def mark_dirty(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.request_redraw()
+
+    def update(self) -> None:
+        graphics = self.graphics
+        if self.animating:
+            self.roz += 0.5
+
+        self.projection_node.set_ortho_size(width=graphics.width, height=graphics.height)
+
+        # Content layers cover the window diagonal, so no rotation of the
+        # view ever shows a clipped layer edge.
+        content_size = int(math.ceil(math.hypot(graphics.width, graphics.height)))
+        self.layers.set_content_size(content_size, content_size)
+        content_center = content_size / 2
+
+        # Layer content: centered, scaled up. Only changes with the
+        # content size, which re-renders the layers anyway.
+        self.model_view.reset()
+        self.model_view.translate(x=content_center, y=content_center, z=0.0)
+        self.model_view.scale(2.0)
+        self.content_node.set_matrix(self.model_view)
+
+        # View: rotate the cached layers about the window center
+        self.model_view.reset()
+        self.model_view.translate(x=graphics.width / 2, y=graphics.height / 2, z=0.0)
+        self.model_view.rotate_z(self.roz * 0.04)
+        self.model_view.translate(x=-content_center, y=-content_center, z=0.0)
+        self.layers.view_node.set_matrix(self.model_view)
+
+    def draw(self) -> None:
+        graphics = self.graphics
+        with tracing.span("DemoScene.draw"):
+            graphics.clear_rgb(0.22, 0.22, 0.28)
+            self.layers.update()
+            self.layers.composite(self.projection_node)
+
+    def draw_base(self, layer: RenderLayer) -> None:
+        graphics = self.graphics
+        sprite_prog = self.pipeline.program_sprite2d
+
+        graphics.blend_set_alpha()
+
+        graphics.link_buffer_to_shader_program_array_buffer(sprite_prog, self.sprite_vertex_buffer)
+        graphics.uniforms_texture_set_sprite(program=sprite_prog, sprite=self.sprite)
+        graphics.uniforms_modulate_color_set(sprite_prog, r=1.0, g=1.0, b=0.5, a=0.5)
+        graphics.uniforms_matrices_set_nodes(sprite_prog, layer.projection_node, self.content_node)
+        graphics.draw_primitives(index_buffer=self.sprite_index_buffer, primitive_type=gl.GL_TRIANGLE_STRIP, count=4)
+        graphics.unlink_buffer_from_shader_program(sprite_prog)
+
+    def draw_labels(self, layer: RenderLayer) -> None:
+        graphics = self.graphics
+        shape_prog = self.pipeline.program_shape2d
+
+        graphics.blend_set_alpha()
+
+        graphics.link_buffer_to_shader_program_array_buffer(shape_prog, self.shape_vertex_buffer)
+        graphics.uniforms_matrices_set_nodes(shape_prog, layer.projection_node, self.content_node)
+        graphics.uniforms_modulate_color_set(shape_prog, r=1.0, g=0.25, b=0.5, a=0.5)
+        graphics.draw_primitives(index_buffer=self.shape_index_buffer, primitive_type=gl.GL_TRIANGLE_STRIP, count=4)
+        graphics.unlink_buffer_from_shader_program(shape_prog)
+
+    def unload(self) -> None:
+        for vertex_buffer in (self.sprite_vertex_buffer, self.shape_vertex_buffer):
+            self.graphics.buffer_array_delete(vertex_buffer.buffer_index)
+            vertex_buffer.buffer_index = -1
+        self.sprite_index_buffer.unload()
+        self.shape_index_buffer.unload()
+        self.layers.unload()
+        if self.texture_cache is not None:
+            self.texture_cache.release(self.texture)
+        else:
+            self.texture.unload()
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Generic, TypeVar, Optional, Sequence, TYPE_CHECKING
+from typing import Generic, TypeVar, Optional, Sequence, Union, TYPE_CHECKING
+
+import numpy as np
+from OpenGL import GL as gl
 
 from float_bufferable import FloatBufferable
+from vertex_array import VertexArray
 
 if TYPE_CHECKING:
     from graphics_library import GraphicsLibrary
@@ -15,37 +19,68 @@ class GraphicsArrayBuffer(Generic[T]):
     """
     Statically allocated graphics buffer.
     The content can be replaced, but it cannot change size.
+
+    Partial updates: write_vertices() / mark_dirty() record vertex ranges,
+    flush() merges them and uploads only those ranges with glBufferSubData.
+
+    Usage hint: pass one explicitly, or leave it as None to start with
+    GL_STATIC_DRAW and switch to GL_DYNAMIC_DRAW once the buffer has been
+    updated more than once.
     """
-    
-    def __init__(self) -> None:
+
+    DYNAMIC_AFTER_UPDATES = 2
+
+    def __init__(self, usage: Optional[int] = None) -> None:
         self.graphics: Optional["GraphicsLibrary"] = None
-        self.vertex_buffer: list[float] = []
+        self.vertex_buffer: np.ndarray = np.zeros(0, dtype=np.float32)
         self.buffer_index: int = -1
         self.size: int = 0  # in bytes
+        self.vertex_size: int = 0  # floats per vertex
+
+        self.usage_fixed: bool = usage is not None
+        self.usage: int = int(usage) if usage is not None else gl.GL_STATIC_DRAW
+        self.update_count: int = 0
 
-    def load(self, graphics: "GraphicsLibrary", items: Sequence[T]) -> None:
+        # Pending [start, end) vertex ranges, merged in flush()
+        self.dirty_ranges: list[tuple[int, int]] = []
+
+    @property
+    def vertex_count(self) -> int:
+        if self.vertex_size <= 0:
+            return 0
+        return len(self.vertex_buffer) // self.vertex_size
+
+    def load(self, graphics: "GraphicsLibrary", items: Union[Sequence[T], VertexArray]) -> None:
         """
-        Initialize the buffer from a sequence of FloatBufferable items.
+        Initialize the buffer from a sequence of FloatBufferable items,
+        or from a VertexArray (uploaded as-is, no per-vertex packing).
+        The buffer keeps its own copy of the floats, so write_vertices()
+        never touches the caller's VertexArray.
         """
         self.graphics = graphics
-        if not items:
-            self.vertex_buffer = []
-            self.buffer_index = -1
-            self.size = 0
-            return
+        self.dirty_ranges = []
+        self.update_count = 0
 
-        # Total float count, then bytes
-        float_count = graphics.buffer_float_size(items)
-        self.size = float_count * 4  # 4 bytes per float
+        if isinstance(items, VertexArray):
+            if len(items) == 0:
+                self._clear()
+                return
+            self.vertex_buffer = items.floats().copy()
+            self.vertex_size = items.vertex_size()
+        else:
+            if not items:
+                self._clear()
+                return
+            self.vertex_buffer = self._pack(graphics, items)
+            self.vertex_size = items[0].size()
 
-        # Build vertex data as Python list[float]
-        self.vertex_buffer = graphics.buffer_float_generate_from_array(items)
+        self.size = self.vertex_buffer.nbytes
 
         # Create VBO and upload
         self.buffer_index = graphics.buffer_array_generate()
-        graphics.buffer_array_write(self.buffer_index, self.vertex_buffer)
+        graphics.buffer_array_write(self.buffer_index, self.vertex_buffer, self.usage)
 
-    def write(self, items: Sequence[T]) -> None:
+    def write(self, items: Union[Sequence[T], VertexArray]) -> None:
         """
         Overwrite the existing buffer contents with new items.
         Size must not change.
@@ -54,18 +89,145 @@ class GraphicsArrayBuffer(Generic[T]):
             return
         graphics = self.graphics
 
-        # Rebuild vertex data
-        new_data: list[float] = []
-        graphics.buffer_float_write_from_list(items, new_data)
+        # Rebuild vertex data (a VertexArray is already packed)
+        if isinstance(items, VertexArray):
+            new_data = items.floats().copy()
+        else:
+            new_data = self._pack(graphics, items)
+
+        self.dirty_ranges = []
+        promoted = self._note_update()
+
+        if new_data.nbytes == self.size and not promoted:
+            # Same size: update in place, no re-specification.
+            self.vertex_buffer = new_data
+            graphics.buffer_array_write_range(self.buffer_index, 0, self.vertex_buffer)
+        else:
+            if new_data.nbytes != self.size:
+                print(
+                    f"[GraphicsArrayBuffer] WARNING: write() changed float count "
+                    f"from {self.size // 4} to {len(new_data)}. Reallocating."
+                )
+            self.vertex_buffer = new_data
+            self.size = new_data.nbytes
+            graphics.buffer_array_write(self.buffer_index, self.vertex_buffer, self.usage)
+
+    # ----------------------------------------------------------------------
+    # Partial updates
+    # ----------------------------------------------------------------------
 
-        # Optional sanity check: same number of floats
-        old_floats = self.size // 4 if self.size > 0 else 0
-        new_floats = len(new_data)
-        if old_floats != 0 and new_floats != old_floats:
+    def write_vertices(self, start: int, items: Union[Sequence[T], VertexArray]) -> None:
+        """
+        Overwrite vertices [start, start + len(items)) in the buffer's own
+        CPU copy (never the array passed to load() / write()) and mark
+        them dirty. Nothing is uploaded until flush().
+        """
+        if self.graphics is None or self.buffer_index == -1:
+            return
+
+        if isinstance(items, VertexArray):
+            data = items.floats()
+        else:
+            data = self._pack(self.graphics, items)
+
+        if len(data) == 0:
+            return
+
+        begin = int(start) * self.vertex_size
+        end = begin + len(data)
+        if begin < 0 or end > len(self.vertex_buffer):
             print(
-                f"[GraphicsArrayBuffer] WARNING: write() changed float count "
-                f"from {old_floats} to {new_floats}. Uploading anyway."
+                f"[GraphicsArrayBuffer] WARNING: write_vertices() range "
+                f"[{begin}, {end}) outside buffer of {len(self.vertex_buffer)} floats. Ignoring."
+            )
+            return
+
+        self.vertex_buffer[begin:end] = data
+        self.mark_dirty(start, len(data) // self.vertex_size)
+
+    def mark_dirty(self, start: int, count: int) -> None:
+        """
+        Mark vertices [start, start + count) for upload on the next flush().
+        Raises ValueError if the range is outside the buffer.
+        """
+        if count <= 0:
+            return
+        if start < 0 or int(start) + int(count) > self.vertex_count:
+            raise ValueError(
+                f"Dirty range [{start}, {int(start) + int(count)}) outside buffer of {self.vertex_count} vertices"
             )
+        self.dirty_ranges.append((int(start), int(start) + int(count)))
+
+    def merged_dirty_ranges(self) -> list[tuple[int, int]]:
+        """
+        Dirty ranges sorted, with overlapping or touching ranges merged.
+        """
+        if not self.dirty_ranges:
+            return []
+        ranges = sorted(self.dirty_ranges)
+        merged = [ranges[0]]
+        for start, end in ranges[1:]:
+            last_start, last_end = merged[-1]
+            if start <= last_end:
+                if end > last_end:
+                    merged[-1] = (last_start, end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    def flush(self) -> None:
+        """
+        Upload every dirty range with glBufferSubData.
+        """
+        if not self.dirty_ranges:
+            return
+        if self.graphics is None or self.buffer_index == -1:
+            self.dirty_ranges = []
+            return
+        graphics = self.graphics
+
+        if self._note_update():
+            # Re-specified with the new usage hint, which uploads everything
+            self.dirty_ranges = []
+            graphics.buffer_array_write(self.buffer_index, self.vertex_buffer, self.usage)
+            return
+
+        vertex_size = self.vertex_size
+        for start, end in self.merged_dirty_ranges():
+            begin = start * vertex_size
+            graphics.buffer_array_write_range(
+                self.buffer_index,
+                begin * 4,
+                self.vertex_buffer[begin:end * vertex_size],
+            )
+        self.dirty_ranges = []
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    def _pack(self, graphics: "GraphicsLibrary", items: Sequence[T]) -> np.ndarray:
+        float_buffer: list[float] = []
+        graphics.buffer_float_write_from_list(items, float_buffer)
+        return np.asarray(float_buffer, dtype=np.float32)
+
+    def _note_update(self) -> bool:
+        """
+        Count an update about to be uploaded. Returns True if it switched
+        the usage hint to GL_DYNAMIC_DRAW; the caller then re-specifies the
+        whole buffer with glBufferData instead of its glBufferSubData, so
+        the data goes up once.
+        """
+        self.update_count += 1
+        if self.usage_fixed or self.usage != gl.GL_STATIC_DRAW:
+            return False
+        if self.update_count < self.DYNAMIC_AFTER_UPDATES:
+            return False
+        self.usage = gl.GL_DYNAMIC_DRAW
+        return True
 
-        self.vertex_buffer = new_data
-        graphics.buffer_array_write(self.buffer_index, self.vertex_buffer)
+    def _clear(self) -> None:
+        self.vertex_buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_index = -1
+        self.size = 0
+        self.vertex_size = 0
@@ -0,0 +1,125 @@
+# graphics_framebuffer.py
+
+from __future__ import annotations
+
+from typing import Any, Optional, TYPE_CHECKING
+
+import numpy as np
+from OpenGL import GL as gl
+from PIL import Image
+
+if TYPE_CHECKING:
+    from graphics_library import GraphicsLibrary
+
+class GraphicsFramebuffer:
+    """
+    Offscreen render target: a framebuffer object with one RGBA texture
+    as its color attachment.
+
+    begin() redirects drawing (and GraphicsLibrary.width/height, which the
+    projection is built from) to the framebuffer; end() restores the
+    previous target. texture_index can be drawn like any other texture.
+    """
+
+    def __init__(self) -> None:
+        self.graphics: Optional["GraphicsLibrary"] = None
+        self.framebuffer_index: int = -1
+        self.texture_index: int = -1
+        self.width: int = 0
+        self.height: int = 0
+
+        # Saved by begin(), restored by end()
+        self._previous: Optional[tuple[int, Optional[tuple[int, int, int, int]], int, int]] = None
+
+    def load(self, graphics: "GraphicsLibrary", width: int, height: int) -> None:
+        self.unload()
+        self.graphics = graphics
+        self.width = int(width)
+        self.height = int(height)
+
+        self.texture_index = graphics.texture_generate_empty(self.width, self.height)
+        self.framebuffer_index = graphics.framebuffer_generate()
+        previous = graphics.state_framebuffer or 0
+        complete = graphics.framebuffer_attach_texture(self.framebuffer_index, self.texture_index)
+        graphics.framebuffer_bind(previous)
+        if not complete:
+            self.unload()
+            raise RuntimeError(f"Framebuffer {width}x{height} is not complete")
+
+    def unload(self) -> None:
+        if self.graphics is not None:
+            self.graphics.framebuffer_delete(self.framebuffer_index)
+            self.graphics.texture_delete(self.texture_index)
+        self.framebuffer_index = -1
+        self.texture_index = -1
+        self.width = 0
+        self.height = 0
+
+    def resize(self, width: int, height: int) -> None:
+        if self.graphics is None or (int(width), int(height)) == (self.width, self.height):
+            return
+        self.load(self.graphics, width, height)
+
+    def begin(self) -> None:
+        graphics = self.graphics
+        if graphics is None or self.framebuffer_index == -1:
+            return
+        viewport = graphics.state_viewport
+        if viewport is None:
+            # Nobody set one through GraphicsLibrary yet; ask GL, not graphics.width
+            viewport = tuple(int(value) for value in gl.glGetIntegerv(gl.GL_VIEWPORT))
+        self._previous = (
+            graphics.state_framebuffer or 0,
+            viewport,
+            graphics.width,
+            graphics.height,
+        )
+        graphics.framebuffer_bind(self.framebuffer_index)
+        graphics.viewport_set(0, 0, self.width, self.height)
+        graphics.width = self.width
+        graphics.height = self.height
+
+    def end(self) -> None:
+        graphics = self.graphics
+        if graphics is None or self._previous is None:
+            return
+        framebuffer, viewport, width, height = self._previous
+        self._previous = None
+        graphics.framebuffer_bind(framebuffer)
+        graphics.viewport_set(*viewport)
+        graphics.width = width
+        graphics.height = height
+
+    def read_pixels(self) -> np.ndarray:
+        """
+        Color attachment as (height, width, 4) uint8, top row first.
+        """
+        graphics = self.graphics
+        if graphics is None or self.framebuffer_index == -1:
+            return np.zeros((0, 0, 4), dtype=np.uint8)
+        previous = graphics.state_framebuffer or 0
+        graphics.framebuffer_bind(self.framebuffer_index)
+        pixels = graphics.framebuffer_read_pixels(0, 0, self.width, self.height)
+        graphics.framebuffer_bind(previous)
+        return pixels[::-1]
+
+    def read_pixels_async(self, tag: Any = None) -> None:
+        """
+        Queue a non-blocking read of the color attachment; the pixels come
+        back from graphics.framebuffer_read_pixels_collect() under tag.
+        """
+        graphics = self.graphics
+        if graphics is None or self.framebuffer_index == -1:
+            return
+        previous = graphics.state_framebuffer or 0
+        graphics.framebuffer_bind(self.framebuffer_index)
+        graphics.framebuffer_read_pixels_async(0, 0, self.width, self.height, tag)
+        graphics.framebuffer_bind(previous)
+
+    def save(self, file_name: str) -> None:
+        Image.fromarray(np.ascontiguousarray(self.read_pixels()), "RGBA").save(file_name)
+
+    def print(self) -> None:
+        print("GraphicsFramebuffer -> [" + str(self.width) + ", " + str(self.height) + "]")
+        print("\tFramebuffer = " + str(self.framebuffer_index))
+        print("\tTexture = " + str(self.texture_index))
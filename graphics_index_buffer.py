@@ -0,0 +1,101 @@
+# graphics_index_buffer.py
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, TYPE_CHECKING
+
+import numpy as np
+from OpenGL import GL as gl
+
+if TYPE_CHECKING:
+    from graphics_library import GraphicsLibrary
+
+# Largest vertex count that still fits GL_UNSIGNED_SHORT indices
+UINT16_VERTEX_LIMIT = 65536
+
+def index_dtype_for_vertex_count(vertex_count: int) -> np.dtype:
+    if vertex_count <= UINT16_VERTEX_LIMIT:
+        return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+class GraphicsIndexBuffer:
+    """
+    GPU-resident element buffer (GL_ELEMENT_ARRAY_BUFFER).
+
+    The index type is uint16 when every index fits (vertex count up to
+    65536), otherwise uint32. Pass it to the draw_* helpers in place of
+    the client-side numpy index arrays.
+    """
+
+    def __init__(self) -> None:
+        self.graphics: Optional["GraphicsLibrary"] = None
+        self.index_buffer: np.ndarray = np.zeros(0, dtype=np.uint16)
+        self.buffer_index: int = -1
+        self.count: int = 0
+        self.index_type: int = gl.GL_UNSIGNED_SHORT
+        self.size: int = 0  # in bytes
+
+    def load(
+        self,
+        graphics: "GraphicsLibrary",
+        indices: Sequence[int],
+        vertex_count: Optional[int] = None,
+    ) -> None:
+        """
+        vertex_count picks the index type; if omitted, max(indices) + 1 is used.
+        """
+        self.graphics = graphics
+        self.index_buffer = self._pack(indices, vertex_count)
+        self.count = int(self.index_buffer.size)
+        self.size = int(self.index_buffer.nbytes)
+        if self.count == 0:
+            self.buffer_index = -1
+            return
+
+        self.buffer_index = graphics.buffer_element_generate()
+        graphics.buffer_element_write(self.buffer_index, self.index_buffer)
+
+    def write(self, indices: Sequence[int], vertex_count: Optional[int] = None) -> None:
+        """
+        Replace the indices. Re-specifies the buffer if size or type changed.
+        """
+        if self.graphics is None or self.buffer_index == -1:
+            return
+        graphics = self.graphics
+
+        new_data = self._pack(indices, vertex_count)
+        if new_data.nbytes == self.size and new_data.dtype == self.index_buffer.dtype:
+            graphics.buffer_element_write_range(self.buffer_index, 0, new_data)
+        else:
+            graphics.buffer_element_write(self.buffer_index, new_data)
+
+        self.index_buffer = new_data
+        self.count = int(new_data.size)
+        self.size = int(new_data.nbytes)
+
+    def unload(self) -> None:
+        if self.graphics is not None and self.buffer_index != -1:
+            self.graphics.buffer_element_delete(self.buffer_index)
+        self.buffer_index = -1
+        self.count = 0
+        self.size = 0
+
+    def _pack(self, indices: Sequence[int], vertex_count: Optional[int]) -> np.ndarray:
+        values = np.asarray(indices)
+        if values.size == 0:
+            return np.zeros(0, dtype=np.uint16)
+        if vertex_count is None:
+            vertex_count = int(values.max()) + 1
+        dtype = index_dtype_for_vertex_count(vertex_count)
+        self.index_type = gl.GL_UNSIGNED_SHORT if dtype == np.uint16 else gl.GL_UNSIGNED_INT
+        return np.ascontiguousarray(values, dtype=dtype).reshape(-1)
+
+
+def quad_indices(quad_count: int) -> np.ndarray:
+    """
+    Two triangles per quad, for vertices laid out like main.py's strips:
+    0 = top-left, 1 = top-right, 2 = bottom-left, 3 = bottom-right.
+    """
+    base = np.arange(int(quad_count), dtype=np.uint32)[:, None] * 4
+    pattern = np.array([0, 1, 2, 2, 1, 3], dtype=np.uint32)
+    return (base + pattern).reshape(-1)
@@ -2,21 +2,79 @@
 
 from __future__ import annotations
 
-from typing import Optional, Sequence, TypeVar
+import ctypes
+import time
+from typing import Any, Callable, Optional, Sequence, TypeVar, Union
 
 import numpy as np
 from OpenGL import GL as gl
+from OpenGL.GL.ARB.draw_instanced import glDrawElementsInstancedARB
+from OpenGL.GL.ARB.instanced_arrays import glVertexAttribDivisorARB
 
 from float_bufferable import FloatBufferable
 from graphics_array_buffer import GraphicsArrayBuffer
+from graphics_index_buffer import GraphicsIndexBuffer, quad_indices
 from graphics_texture import GraphicsTexture
 from graphics_sprite import GraphicsSprite
+from graphics_readback import GraphicsReadback
+from graphics_stats import GraphicsStats, GpuTimer
+import tracing
 from color import Color
-from matrix import Matrix
+from matrix import Matrix, TransformNode
 from shader_program import ShaderProgram
 
 T = TypeVar("T", bound=FloatBufferable)
 
+# Blend modes, see blend_set_mode()
+BLEND_MODE_DISABLED = 0
+BLEND_MODE_ALPHA = 1
+BLEND_MODE_ADDITIVE = 2
+BLEND_MODE_PREMULTIPLIED = 3
+
+# Channel count of uint8 pixels -> (internal format, upload format)
+TEXTURE_PIXEL_FORMATS = {
+    1: (gl.GL_LUMINANCE8, gl.GL_LUMINANCE),
+    2: (gl.GL_LUMINANCE8_ALPHA8, gl.GL_LUMINANCE_ALPHA),
+    3: (gl.GL_RGB8, gl.GL_RGB),
+    4: (gl.GL_RGBA8, gl.GL_RGBA),
+}
+
+def texture_pixel_channels(pixels: np.ndarray) -> int:
+    return 1 if pixels.ndim == 2 else int(pixels.shape[2])
+
+def texture_unpack_layout(pixels: np.ndarray) -> tuple[np.ndarray, int, int]:
+    """
+    (pixels, GL_UNPACK_ALIGNMENT, GL_UNPACK_ROW_LENGTH) that upload
+    (H, W[, C]) uint8 pixels as they sit in memory. Row-strided views
+    (crops, memory-mapped files with padded rows) need no copy; only
+    pixels that are not interleaved within a row are made contiguous.
+    """
+    channels = texture_pixel_channels(pixels)
+    if pixels.dtype != np.uint8:
+        pixels = pixels.astype(np.uint8)
+    pixel_stride = pixels.strides[1]
+    if pixels.shape[0] > 0 and (
+        pixel_stride != channels
+        or (pixels.ndim == 3 and pixels.strides[2] != 1)
+        or pixels.strides[0] < pixels.shape[1] * channels
+    ):
+        pixels = np.ascontiguousarray(pixels)
+
+    height, width = pixels.shape[0], pixels.shape[1]
+    row_bytes = width * channels
+    stride = pixels.strides[0] if height > 1 else row_bytes
+    if stride % channels == 0:
+        # Rows start every stride bytes: say so in pixels, align exactly
+        row_length = stride // channels
+        for alignment in (8, 4, 2, 1):
+            if stride % alignment == 0:
+                return pixels, alignment, (0 if row_length == width else row_length)
+    for alignment in (8, 4, 2, 1):
+        # Padding shorter than one pixel: only expressible as alignment
+        if (row_bytes + alignment - 1) // alignment * alignment == stride:
+            return pixels, alignment, 0
+    return np.ascontiguousarray(pixels), 1, 0
+
 class GraphicsLibrary:
     def __init__(
         self,
@@ -30,6 +88,140 @@ class GraphicsLibrary:
         self.texture_set_filter_linear()
         self.texture_set_clamp()
 
+        # Shadow copy of the GL state this class sets. None = unknown,
+        # so the first call always goes through. See state_invalidate().
+        self.state_program: Optional[int] = None
+        self.state_array_buffer: Optional[int] = None
+        self.state_active_texture_unit: Optional[int] = None
+        self.state_textures: dict[int, int] = {}
+        self.state_blend_enabled: Optional[bool] = None
+        self.state_blend_func: Optional[tuple[int, int, int, int]] = None
+        self.state_viewport: Optional[tuple[int, int, int, int]] = None
+        self.state_framebuffer: Optional[int] = None
+
+        # GL_ELEMENT_ARRAY_BUFFER currently bound (0 = client-side indices)
+        self.element_buffer_bound: Optional[int] = None
+
+        # Calls issued vs. skipped because the state already matched
+        self.state_changes: int = 0
+        self.state_changes_skipped: int = 0
+
+        # Uniform uploads issued vs. skipped by the per-program value cache
+        self.uniform_uploads: int = 0
+        self.uniform_uploads_skipped: int = 0
+
+        # Per-frame counters, see stats_begin_frame / stats_end_frame
+        self.draw_calls: int = 0
+        self.vertices_submitted: int = 0
+        self.buffer_bytes_uploaded: int = 0
+        self.texture_bytes_uploaded: int = 0
+        self.stats = GraphicsStats()
+        self.gpu_timer = GpuTimer()
+        self.gpu_timing_enabled: bool = True
+        self._frame_start_time: float = 0.0
+
+        # Asynchronous pixel readback ring, see framebuffer_read_pixels_async()
+        self.readback = GraphicsReadback()
+
+        # Shared quad index pattern, grown on demand
+        self.quad_index_buffer: Optional[GraphicsIndexBuffer] = None
+        self.quad_index_buffer_quads: int = 0
+
+        # Vertex array objects (GL 3.x only), resolved on first use
+        self._vertex_arrays_resolved: bool = False
+        self._vertex_arrays_available: bool = False
+        self.vertex_arrays_enabled: bool = True
+        self.vertex_array_cache: dict[tuple[int, int], int] = {}
+        self.vertex_array_scratch: int = 0
+        self.vertex_array_linked_cached: bool = False
+        self.state_vertex_array: Optional[int] = None
+        # GL_ELEMENT_ARRAY_BUFFER is VAO state; remember it per VAO
+        self.vertex_array_element_buffers: dict[int, int] = {}
+
+        # Instancing entry points, resolved on first use (needs a context)
+        self._instancing_resolved: bool = False
+        self._gl_vertex_attrib_divisor = None
+        self._gl_draw_elements_instanced = None
+
+
+    # ----------------------------------------------------------------------
+    # Shadow state
+    # ----------------------------------------------------------------------
+
+    def state_invalidate(self) -> None:
+        """
+        Forget the cached GL state, e.g. after GL calls made outside
+        this class. The next call of each kind is always issued.
+        """
+        self.state_program = None
+        self.state_array_buffer = None
+        self.element_buffer_bound = None
+        self.state_active_texture_unit = None
+        self.state_textures = {}
+        self.state_blend_enabled = None
+        self.state_blend_func = None
+        self.state_viewport = None
+        self.state_framebuffer = None
+        self.state_vertex_array = None
+
+    def state_counters_reset(self) -> None:
+        self.state_changes = 0
+        self.state_changes_skipped = 0
+        self.uniform_uploads = 0
+        self.uniform_uploads_skipped = 0
+        self.draw_calls = 0
+        self.vertices_submitted = 0
+        self.buffer_bytes_uploaded = 0
+        self.texture_bytes_uploaded = 0
+
+    # ----------------------------------------------------------------------
+    # Frame stats
+    # ----------------------------------------------------------------------
+
+    def stats_begin_frame(self) -> None:
+        self.state_counters_reset()
+        self._frame_start_time = time.perf_counter()
+        if self.gpu_timing_enabled:
+            self.gpu_timer.begin()
+
+    def stats_end_frame(self) -> None:
+        """
+        Record this frame's counters into self.stats. The GPU time is the
+        newest finished timer query, so it trails the CPU counters.
+        """
+        gpu_ms = None
+        if self.gpu_timing_enabled:
+            self.gpu_timer.end()
+            gpu_ms = self.gpu_timer.read()
+        self.stats.add_frame({
+            "cpu_ms": (time.perf_counter() - self._frame_start_time) * 1000.0,
+            "gpu_ms": gpu_ms,
+            "draw_calls": self.draw_calls,
+            "vertices": self.vertices_submitted,
+            "state_changes": self.state_changes,
+            "state_changes_skipped": self.state_changes_skipped,
+            "uniform_uploads": self.uniform_uploads,
+            "uniform_uploads_skipped": self.uniform_uploads_skipped,
+            "buffer_bytes": self.buffer_bytes_uploaded,
+            "texture_bytes": self.texture_bytes_uploaded,
+        })
+
+    def program_use(self, program_index: int) -> None:
+        if self.state_program == program_index:
+            self.state_changes_skipped += 1
+            return
+        gl.glUseProgram(program_index)
+        self.state_program = program_index
+        self.state_changes += 1
+
+    def viewport_set(self, x: int, y: int, width: int, height: int) -> None:
+        viewport = (int(x), int(y), int(width), int(height))
+        if self.state_viewport == viewport:
+            self.state_changes_skipped += 1
+            return
+        gl.glViewport(*viewport)
+        self.state_viewport = viewport
+        self.state_changes += 1
 
     def clear(self) -> None:
         gl.glClearColor(0.0, 0.0, 0.0, 1.0)
@@ -45,6 +237,10 @@ class GraphicsLibrary:
     def clear_rgb(self, r: float, g: float, b: float) -> None:
         gl.glClearColor(r, g, b, 1.0)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)  
+
+    def clear_rgba(self, r: float, g: float, b: float, a: float) -> None:
+        gl.glClearColor(r, g, b, a)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
         
     # ----------------------------------------------------------------------
     # VBO helpers (ARRAY_BUFFER)
@@ -58,18 +254,47 @@ class GraphicsLibrary:
 
     def buffer_array_delete(self, index: int) -> None:
         if index != -1:
+            if self.state_array_buffer == index:
+                self.state_array_buffer = None
+            for key in [key for key in self.vertex_array_cache if key[1] == index]:
+                self._vertex_array_delete(self.vertex_array_cache.pop(key))
             gl.glDeleteBuffers(1, [int(index)])
 
-    def buffer_array_write(self, index: int, data: Sequence[float]) -> None:
+    def buffer_array_write(
+        self,
+        index: int,
+        data: Sequence[float],
+        usage: int = gl.GL_STATIC_DRAW,
+    ) -> None:
         if index == -1:
             return
         arr = np.asarray(data, dtype=np.float32)
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, index)
-        gl.glBufferData(gl.GL_ARRAY_BUFFER, arr, gl.GL_STATIC_DRAW)
+        self.buffer_array_bind(index)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, arr, usage)
+        self.buffer_bytes_uploaded += arr.nbytes
+
+    def buffer_array_write_range(self, index: int, offset: int, data: Sequence[float]) -> None:
+        """
+        Overwrite part of an existing buffer; offset is in bytes.
+        """
+        if index == -1:
+            return
+        arr = np.ascontiguousarray(data, dtype=np.float32)
+        if arr.size == 0:
+            return
+        self.buffer_array_bind(index)
+        gl.glBufferSubData(gl.GL_ARRAY_BUFFER, int(offset), arr.nbytes, arr)
+        self.buffer_bytes_uploaded += arr.nbytes
 
     def buffer_array_bind(self, index: int) -> None:
-        if index != -1:
-            gl.glBindBuffer(gl.GL_ARRAY_BUFFER, index)
+        if index == -1:
+            return
+        if self.state_array_buffer == index:
+            self.state_changes_skipped += 1
+            return
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, index)
+        self.state_array_buffer = index
+        self.state_changes += 1
 
     def buffer_array_bind_array_buffer(
         self,
@@ -99,6 +324,64 @@ class GraphicsLibrary:
     def buffer_index_generate_from_int_array(self, values: Sequence[int]) -> np.ndarray:
         return self.buffer_index_generate_from_list(values)
 
+    # ----------------------------------------------------------------------
+    # Element buffers (GL_ELEMENT_ARRAY_BUFFER)
+    # ----------------------------------------------------------------------
+
+    def buffer_element_generate(self) -> int:
+        return self.buffer_array_generate()
+
+    def buffer_element_delete(self, index: int) -> None:
+        if index != -1:
+            if self.element_buffer_bound == index:
+                self.element_buffer_bound = 0
+            gl.glDeleteBuffers(1, [int(index)])
+
+    def buffer_element_bind(self, index: int) -> None:
+        if index == -1:
+            index = 0
+        if self.element_buffer_bound == index:
+            self.state_changes_skipped += 1
+            return
+        gl.glBindBuffer(gl.GL_ELEMENT_ARRAY_BUFFER, index)
+        self.element_buffer_bound = index
+        if self.state_vertex_array:
+            self.vertex_array_element_buffers[self.state_vertex_array] = index
+        self.state_changes += 1
+
+    def buffer_element_write(self, index: int, data: np.ndarray) -> None:
+        if index == -1:
+            return
+        self.buffer_element_bind(index)
+        gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER, data, gl.GL_STATIC_DRAW)
+        self.buffer_bytes_uploaded += data.nbytes
+
+    def buffer_element_write_range(self, index: int, offset: int, data: np.ndarray) -> None:
+        """
+        Overwrite part of an existing element buffer; offset is in bytes.
+        """
+        if index == -1 or data.size == 0:
+            return
+        self.buffer_element_bind(index)
+        gl.glBufferSubData(gl.GL_ELEMENT_ARRAY_BUFFER, int(offset), data.nbytes, data)
+        self.buffer_bytes_uploaded += data.nbytes
+
+    def buffer_index_quads(self, quad_count: int) -> GraphicsIndexBuffer:
+        """
+        Shared element buffer holding at least quad_count quads
+        (6 indices each). Draw 6 * n indices from it for n quads.
+        """
+        quad_count = max(1, int(quad_count))
+        if self.quad_index_buffer is None or self.quad_index_buffer_quads < quad_count:
+            quads = max(quad_count, self.quad_index_buffer_quads * 2, 256)
+            if self.quad_index_buffer is None:
+                self.quad_index_buffer = GraphicsIndexBuffer()
+                self.quad_index_buffer.load(self, quad_indices(quads), vertex_count=quads * 4)
+            else:
+                self.quad_index_buffer.write(quad_indices(quads), vertex_count=quads * 4)
+            self.quad_index_buffer_quads = quads
+        return self.quad_index_buffer
+
     # ----------------------------------------------------------------------
     # Float buffers (for FloatBufferable -> list[float])
     # ----------------------------------------------------------------------
@@ -125,13 +408,14 @@ class GraphicsLibrary:
         float_buffer: list[float],
         count: Optional[int] = None,
     ) -> None:
-        float_buffer.clear()
-        if count is None:
-            count = len(items)
-        limit = min(count, len(items))
+        with tracing.span("buffer_float_write_from_list"):
+            float_buffer.clear()
+            if count is None:
+                count = len(items)
+            limit = min(count, len(items))
 
-        for i in range(limit):
-            items[i].write_to_buffer(float_buffer)
+            for i in range(limit):
+                items[i].write_to_buffer(float_buffer)
 
     def buffer_float_write_from_item(self, item: T, float_buffer: list[float]) -> None:
         float_buffer.clear()
@@ -142,8 +426,9 @@ class GraphicsLibrary:
     # ----------------------------------------------------------------------
 
     def texture_set_filter_mipmap(self) -> None:
+        # Mipmap filters are only valid for minification
         gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR_MIPMAP_LINEAR)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR_MIPMAP_LINEAR)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
 
     def texture_set_filter_linear(self) -> None:
         gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
@@ -159,7 +444,38 @@ class GraphicsLibrary:
 
     def texture_bind(self, texture: Optional[GraphicsTexture]) -> None:
         if texture is not None and texture.texture_index != -1:
-            gl.glBindTexture(gl.GL_TEXTURE_2D, int(texture.texture_index))
+            self.texture_bind_index(int(texture.texture_index))
+
+    def texture_active_unit(self, unit: int) -> None:
+        if self.state_active_texture_unit == unit:
+            self.state_changes_skipped += 1
+            return
+        gl.glActiveTexture(gl.GL_TEXTURE0 + unit)
+        self.state_active_texture_unit = unit
+        self.state_changes += 1
+
+    def texture_bind_index(self, texture_index: int, unit: Optional[int] = None) -> None:
+        """
+        Bind texture_index to GL_TEXTURE_2D on unit (default: the active unit).
+        """
+        if unit is not None:
+            self.texture_active_unit(unit)
+        current_unit = self.state_active_texture_unit
+        if current_unit is not None and self.state_textures.get(current_unit) == texture_index:
+            self.state_changes_skipped += 1
+            return
+        gl.glBindTexture(gl.GL_TEXTURE_2D, texture_index)
+        if current_unit is not None:
+            self.state_textures[current_unit] = texture_index
+        self.state_changes += 1
+
+    def texture_delete(self, texture_index: int) -> None:
+        if texture_index == -1:
+            return
+        for unit, bound in list(self.state_textures.items()):
+            if bound == texture_index:
+                del self.state_textures[unit]
+        gl.glDeleteTextures([int(texture_index)])
             
     # --- variant that takes a "bitmap" (you decide what that is) ----------
     def texture_generate_from_bitmap(self, bitmap) -> int:
@@ -178,7 +494,7 @@ class GraphicsLibrary:
         if tex_id == 0:
             return -1
 
-        gl.glBindTexture(gl.GL_TEXTURE_2D, tex_id)
+        self.texture_bind_index(tex_id)
         self.texture_set_filter_linear()
         self.texture_set_clamp()
 
@@ -193,6 +509,144 @@ class GraphicsLibrary:
             gl.GL_UNSIGNED_BYTE,
             data,
         )
+        self.texture_bytes_uploaded += data.nbytes
+        return tex_id
+
+    # --- variant that takes a full mip chain (level 0 first) -------------
+
+    def texture_generate_from_mipmaps(self, levels) -> int:
+        """
+        Texture from [level0, level1, ...] (H, W, 4) uint8 arrays, e.g. the
+        memory-mapped levels from ImageDiskCache.
+        """
+        if not levels:
+            return -1
+        # Same sized internal format on every level, or the chain is incomplete
+        tex_id = self.texture_generate_from_pixels(levels[0])
+        if tex_id != -1 and len(levels) > 1:
+            self.texture_upload_mip_levels(tex_id, levels[1:])
+        return tex_id
+
+    def texture_upload_mip_levels(self, texture_index: int, levels, first_level: int = 1) -> None:
+        """
+        Upload levels as mip levels first_level, first_level + 1, ... of
+        texture_index and switch it to trilinear filtering.
+        """
+        for offset, level in enumerate(levels):
+            level = np.asarray(level)
+            self.texture_allocate_level(
+                texture_index,
+                first_level + offset,
+                level.shape[1],
+                level.shape[0],
+                texture_pixel_channels(level),
+            )
+            self.texture_upload_pixels(texture_index, level, level=first_level + offset)
+        self.texture_set_mip_levels(texture_index, first_level + len(levels) - 1)
+
+    def texture_allocate_level(self, texture_index: int, level: int, width: int, height: int, channels: int = 4) -> None:
+        """
+        Uninitialized storage for mip level of texture_index (fill it with
+        texture_upload_pixels(..., level=level)).
+        """
+        internal_format, upload_format = TEXTURE_PIXEL_FORMATS[int(channels)]
+        self.texture_bind_index(texture_index)
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D,
+            int(level),
+            internal_format,
+            int(width),
+            int(height),
+            0,
+            upload_format,
+            gl.GL_UNSIGNED_BYTE,
+            None,
+        )
+
+    def texture_set_mip_levels(self, texture_index: int, max_level: int) -> None:
+        """
+        Sample levels 0..max_level of texture_index with trilinear filtering.
+        """
+        self.texture_bind_index(texture_index)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAX_LEVEL, int(max_level))
+        self.texture_set_filter_mipmap()
+
+    def texture_generate_mipmap(self, texture_index: int) -> bool:
+        """
+        Build the mip chain of texture_index on the GPU from its level 0.
+        Returns False (texture stays linear) without glGenerateMipmap.
+        """
+        if not bool(gl.glGenerateMipmap):
+            return False
+        self.texture_bind_index(texture_index)
+        gl.glGenerateMipmap(gl.GL_TEXTURE_2D)
+        self.texture_set_filter_mipmap()
+        return True
+
+    # --- variant that takes gray / gray-alpha / RGB / RGBA pixels ---------
+
+    def texture_generate_from_pixels(self, pixels) -> int:
+        """
+        Texture in the pixels' own format (no RGBA expansion): (H, W) or
+        (H, W, 1..4) uint8, including np.memmap arrays and row-strided
+        views, uploaded straight from their memory.
+        """
+        if pixels is None:
+            return -1
+        pixels = np.asarray(pixels)
+        height, width = pixels.shape[0], pixels.shape[1]
+        tex_id = self.texture_generate_empty(width, height, texture_pixel_channels(pixels))
+        if tex_id != -1:
+            self.texture_upload_pixels(tex_id, pixels)
+        return tex_id
+
+    def texture_upload_pixels(self, texture_index: int, pixels: np.ndarray, y: int = 0, level: int = 0) -> None:
+        """
+        glTexSubImage2D of pixels into rows y.. of texture_index, with the
+        unpack state set to match their memory layout.
+        """
+        pixels, alignment, row_length = texture_unpack_layout(pixels)
+        height, width = pixels.shape[0], pixels.shape[1]
+        if height == 0 or width == 0:
+            return
+        _, upload_format = TEXTURE_PIXEL_FORMATS[texture_pixel_channels(pixels)]
+
+        self.texture_bind_index(texture_index)
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, alignment)
+        gl.glPixelStorei(gl.GL_UNPACK_ROW_LENGTH, row_length)
+        # PyOpenGL would copy a strided array into a contiguous one, dropping
+        # the row padding the unpack state describes; hand GL the address
+        data = pixels if pixels.flags.c_contiguous else ctypes.c_void_p(pixels.ctypes.data)
+        gl.glTexSubImage2D(gl.GL_TEXTURE_2D, level, 0, int(y), width, height, upload_format, gl.GL_UNSIGNED_BYTE, data)
+        if row_length != 0:
+            gl.glPixelStorei(gl.GL_UNPACK_ROW_LENGTH, 0)
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 4)
+        self.texture_bytes_uploaded += height * width * texture_pixel_channels(pixels)
+
+    # --- variant that allocates an uninitialized texture ------------------
+
+    def texture_generate_empty(self, width: int, height: int, channels: int = 4) -> int:
+        tex = gl.glGenTextures(1)
+        tex_id = int(tex[0] if isinstance(tex, (list, tuple)) else tex)
+        if tex_id == 0:
+            return -1
+
+        self.texture_bind_index(tex_id)
+        self.texture_set_filter_linear()
+        self.texture_set_clamp()
+
+        internal_format, upload_format = TEXTURE_PIXEL_FORMATS[int(channels)]
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D,
+            0,
+            internal_format,
+            int(width),
+            int(height),
+            0,
+            upload_format,
+            gl.GL_UNSIGNED_BYTE,
+            None,
+        )
         return tex_id
 
     # --- variant that creates a random RGBA texture -----------------------
@@ -206,7 +660,7 @@ class GraphicsLibrary:
         if tex_id == 0:
             return -1
 
-        gl.glBindTexture(gl.GL_TEXTURE_2D, tex_id)
+        self.texture_bind_index(tex_id)
         self.texture_set_filter_linear()
         self.texture_set_clamp()
 
@@ -224,53 +678,371 @@ class GraphicsLibrary:
             gl.GL_UNSIGNED_BYTE,
             pixels,
         )
+        self.texture_bytes_uploaded += pixels.nbytes
         return tex_id
 
+    # ----------------------------------------------------------------------
+    # Framebuffers (GL 3.0 / ARB_framebuffer_object)
+    # ----------------------------------------------------------------------
+
+    def framebuffer_generate(self) -> int:
+        framebuffer = gl.glGenFramebuffers(1)
+        if isinstance(framebuffer, (list, tuple)):
+            return int(framebuffer[0])
+        return int(framebuffer)
+
+    def framebuffer_delete(self, index: int) -> None:
+        if index == -1:
+            return
+        if self.state_framebuffer == index:
+            self.framebuffer_bind(0)
+        gl.glDeleteFramebuffers(1, [int(index)])
+
+    def framebuffer_bind(self, index: int) -> None:
+        """
+        Bind index as GL_FRAMEBUFFER; 0 is the window (or headless default).
+        """
+        if self.state_framebuffer == index:
+            self.state_changes_skipped += 1
+            return
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, index)
+        self.state_framebuffer = index
+        self.state_changes += 1
+
+    def framebuffer_attach_texture(self, index: int, texture_index: int) -> bool:
+        """
+        Attach texture_index as color 0 of framebuffer index (left bound).
+        Returns False if the framebuffer is not complete.
+        """
+        self.framebuffer_bind(index)
+        gl.glFramebufferTexture2D(
+            gl.GL_FRAMEBUFFER,
+            gl.GL_COLOR_ATTACHMENT0,
+            gl.GL_TEXTURE_2D,
+            texture_index,
+            0,
+        )
+        status = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)
+        return status == gl.GL_FRAMEBUFFER_COMPLETE
+
+    def framebuffer_read_pixels(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Read RGBA pixels from the bound framebuffer. Rows are in GL order
+        (bottom row first), shape (height, width, 4) uint8.
+        """
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        data = gl.glReadPixels(int(x), int(y), int(width), int(height), gl.GL_RGBA, gl.GL_UNSIGNED_BYTE)
+        pixels = np.frombuffer(data, dtype=np.uint8)
+        return pixels.reshape(int(height), int(width), 4)
+
+    def framebuffer_read_pixels_async(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        tag: Any = None,
+    ) -> None:
+        """
+        Start reading a region of the bound framebuffer into a pixel pack
+        buffer without waiting for the GPU. Pick the result up later with
+        framebuffer_read_pixels_collect(); tag identifies it there.
+        """
+        self.readback.request(x, y, width, height, tag)
+
+    def framebuffer_read_pixels_collect(
+        self,
+        consumer: Optional[Callable[[Any, np.ndarray], None]] = None,
+        wait: bool = False,
+    ) -> list[tuple[Any, np.ndarray]]:
+        """
+        Finished async reads as [(tag, pixels)], top row first; call once
+        per frame. See GraphicsReadback.collect() for consumer and wait.
+        """
+        return self.readback.collect(consumer, wait)
+
     # ----------------------------------------------------------------------
     # Blending
     # ----------------------------------------------------------------------
 
     def blend_set_alpha(self) -> None:
-        gl.glEnable(gl.GL_BLEND)
-        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        # Alpha accumulates as coverage, so offscreen targets end up
+        # premultiplied and can be composited with blend_set_premultiplied().
+        self.blend_set_enabled(True)
+        self.blend_set_func(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA, gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+    def blend_set_premultiplied(self) -> None:
+        self.blend_set_enabled(True)
+        self.blend_set_func(gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
 
     def blend_set_additive(self) -> None:
-        gl.glEnable(gl.GL_BLEND)
-        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE)
+        self.blend_set_enabled(True)
+        self.blend_set_func(gl.GL_SRC_ALPHA, gl.GL_ONE)
 
     def blend_set_disabled(self) -> None:
-        gl.glDisable(gl.GL_BLEND)
+        self.blend_set_enabled(False)
+
+    def blend_set_enabled(self, enabled: bool) -> None:
+        if self.state_blend_enabled == enabled:
+            self.state_changes_skipped += 1
+            return
+        if enabled:
+            gl.glEnable(gl.GL_BLEND)
+        else:
+            gl.glDisable(gl.GL_BLEND)
+        self.state_blend_enabled = enabled
+        self.state_changes += 1
+
+    def blend_set_func(
+        self,
+        source: int,
+        destination: int,
+        source_alpha: Optional[int] = None,
+        destination_alpha: Optional[int] = None,
+    ) -> None:
+        """
+        glBlendFunc, or glBlendFuncSeparate when the alpha factors are given.
+        """
+        if source_alpha is None:
+            source_alpha = source
+        if destination_alpha is None:
+            destination_alpha = destination
+        func = (int(source), int(destination), int(source_alpha), int(destination_alpha))
+        if self.state_blend_func == func:
+            self.state_changes_skipped += 1
+            return
+        if func[0] == func[2] and func[1] == func[3]:
+            gl.glBlendFunc(func[0], func[1])
+        else:
+            gl.glBlendFuncSeparate(*func)
+        self.state_blend_func = func
+        self.state_changes += 1
+
+    def blend_set_mode(self, mode: int) -> None:
+        if mode == BLEND_MODE_ALPHA:
+            self.blend_set_alpha()
+        elif mode == BLEND_MODE_ADDITIVE:
+            self.blend_set_additive()
+        elif mode == BLEND_MODE_PREMULTIPLIED:
+            self.blend_set_premultiplied()
+        else:
+            self.blend_set_disabled()
 
     # ----------------------------------------------------------------------
     # Draw helpers
     # ----------------------------------------------------------------------
 
-    def draw_triangles(self, index_buffer: np.ndarray, count: int) -> None:
-        gl.glDrawElements(
-            gl.GL_TRIANGLES,
-            int(count),
-            gl.GL_UNSIGNED_INT,
-            index_buffer,
-        )
+    def draw_triangles(
+        self,
+        index_buffer: Union[np.ndarray, GraphicsIndexBuffer],
+        count: int,
+    ) -> None:
+        self.draw_primitives(index_buffer, gl.GL_TRIANGLES, count)
 
-    def draw_triangle_strips(self, index_buffer: Optional[np.ndarray], count: int) -> None:
+    def draw_triangle_strips(
+        self,
+        index_buffer: Optional[Union[np.ndarray, GraphicsIndexBuffer]],
+        count: int,
+    ) -> None:
         if index_buffer is None:
             return
+        self.draw_primitives(index_buffer, gl.GL_TRIANGLE_STRIP, count)
+
+    def draw_primitives(
+        self,
+        index_buffer: Union[np.ndarray, GraphicsIndexBuffer],
+        primitive_type: int,
+        count: int,
+        first: int = 0,
+    ) -> None:
+        """
+        Draw count indices starting at index first, either from a
+        GraphicsIndexBuffer on the GPU or from a client-side numpy array.
+        """
+        if count <= 0:
+            return
+
+        if isinstance(index_buffer, GraphicsIndexBuffer):
+            if index_buffer.buffer_index == -1:
+                return
+            self.draw_calls += 1
+            self.vertices_submitted += int(count)
+            self.buffer_element_bind(index_buffer.buffer_index)
+            gl.glDrawElements(
+                int(primitive_type),
+                int(count),
+                index_buffer.index_type,
+                ctypes.c_void_p(int(first) * index_buffer.index_buffer.itemsize),
+            )
+            return
+
+        # Client-side indices are only read when no element buffer is bound
+        self.buffer_element_bind(0)
+        if first:
+            index_buffer = index_buffer[int(first):]
+        if len(index_buffer) == 0:
+            return
+        self.draw_calls += 1
+        self.vertices_submitted += int(count)
         gl.glDrawElements(
-            gl.GL_TRIANGLE_STRIP,
+            int(primitive_type),
             int(count),
             gl.GL_UNSIGNED_INT,
             index_buffer,
         )
 
-    def draw_primitives(self, index_buffer: np.ndarray, primitive_type: int, count: int) -> None:
-        gl.glDrawElements(
+    # ----------------------------------------------------------------------
+    # Instancing (GL 3.3 core, or ARB_instanced_arrays + ARB_draw_instanced)
+    #
+    #   link_buffer_to_shader_program_array_buffer(prog, quad_buffer)
+    #   link_instance_buffer_to_shader_program_array_buffer(prog, instances)
+    #   uniforms_...(prog, ...)
+    #   draw_primitives_instanced(buffer_index_quads(1), GL_TRIANGLES, 6, n)
+    #   unlink_instance_buffer_from_shader_program(prog)
+    #   unlink_buffer_from_shader_program(prog)
+    # ----------------------------------------------------------------------
+
+    def instancing_supported(self) -> bool:
+        if not self._instancing_resolved:
+            self._instancing_resolved = True
+            if bool(gl.glVertexAttribDivisor) and bool(gl.glDrawElementsInstanced):
+                self._gl_vertex_attrib_divisor = gl.glVertexAttribDivisor
+                self._gl_draw_elements_instanced = gl.glDrawElementsInstanced
+            elif bool(glVertexAttribDivisorARB) and bool(glDrawElementsInstancedARB):
+                self._gl_vertex_attrib_divisor = glVertexAttribDivisorARB
+                self._gl_draw_elements_instanced = glDrawElementsInstancedARB
+        return self._gl_draw_elements_instanced is not None
+
+    def link_instance_buffer_to_shader_program_array_buffer(
+        self,
+        program: Optional[ShaderProgram],
+        instance_buffer: Optional[GraphicsArrayBuffer],
+    ) -> None:
+        if instance_buffer is None:
+            return
+        self.link_instance_buffer_to_shader_program(program, instance_buffer.buffer_index)
+
+    def link_instance_buffer_to_shader_program(
+        self,
+        program: Optional[ShaderProgram],
+        buffer_index: int,
+    ) -> None:
+        """
+        Point the program's per-instance attributes at buffer_index with
+        divisor 1. Call after link_buffer_to_shader_program for the mesh.
+        """
+        if program is None or program.program == 0 or buffer_index == -1:
+            return
+        if not self.instancing_supported():
+            print("[GraphicsLibrary] WARNING: instanced arrays are not supported by this context.")
+            return
+
+        self.buffer_array_bind(buffer_index)
+        for location, size, offset in program.instance_attributes:
+            if location == -1:
+                continue
+            gl.glEnableVertexAttribArray(location)
+            gl.glVertexAttribPointer(
+                location,
+                size,
+                gl.GL_FLOAT,
+                False,
+                program.instance_stride,
+                ctypes.c_void_p(offset),
+            )
+            self._gl_vertex_attrib_divisor(location, 1)
+
+    def unlink_instance_buffer_from_shader_program(self, program: Optional[ShaderProgram]) -> None:
+        if program is None or program.program == 0 or not self.instancing_supported():
+            return
+        for location, _size, _offset in program.instance_attributes:
+            if location == -1:
+                continue
+            self._gl_vertex_attrib_divisor(location, 0)
+            gl.glDisableVertexAttribArray(location)
+
+    def draw_primitives_instanced(
+        self,
+        index_buffer: GraphicsIndexBuffer,
+        primitive_type: int,
+        count: int,
+        instance_count: int,
+    ) -> None:
+        if index_buffer.buffer_index == -1 or instance_count <= 0:
+            return
+        if not self.instancing_supported():
+            return
+        self.draw_calls += 1
+        self.vertices_submitted += int(count) * int(instance_count)
+        self.buffer_element_bind(index_buffer.buffer_index)
+        self._gl_draw_elements_instanced(
             int(primitive_type),
             int(count),
-            gl.GL_UNSIGNED_INT,
-            index_buffer,
+            index_buffer.index_type,
+            ctypes.c_void_p(0),
+            int(instance_count),
         )
 
+    # ----------------------------------------------------------------------
+    # Vertex array objects
+    #
+    # On GL 3.x contexts link_buffer_to_shader_program records each
+    # (program, buffer) attribute layout in a VAO once and afterwards
+    # binds it with a single call. The GL 2.1 context main.py requests
+    # has no VAOs, so the classic enable/pointer path is used there.
+    # ----------------------------------------------------------------------
+
+    def vertex_arrays_supported(self) -> bool:
+        if not self.vertex_arrays_enabled:
+            return False
+        if not self._vertex_arrays_resolved:
+            self._vertex_arrays_resolved = True
+            version = gl.glGetString(gl.GL_VERSION)
+            major = 0
+            if version:
+                try:
+                    major = int(version.split(b".")[0].split()[-1])
+                except ValueError:
+                    major = 0
+            self._vertex_arrays_available = major >= 3 and bool(gl.glGenVertexArrays)
+        return self._vertex_arrays_available
+
+    def vertex_array_bind(self, vertex_array: int) -> None:
+        if self.state_vertex_array == vertex_array:
+            self.state_changes_skipped += 1
+            return
+        gl.glBindVertexArray(vertex_array)
+        self.state_vertex_array = vertex_array
+        self.element_buffer_bound = self.vertex_array_element_buffers.get(vertex_array, 0)
+        self.state_changes += 1
+
+    def vertex_arrays_clear(self) -> None:
+        """
+        Delete every cached VAO, e.g. before deleting shader programs.
+        """
+        for vertex_array in self.vertex_array_cache.values():
+            self._vertex_array_delete(vertex_array)
+        self.vertex_array_cache = {}
+        if self.vertex_array_scratch != 0:
+            self._vertex_array_delete(self.vertex_array_scratch)
+            self.vertex_array_scratch = 0
+
+    def _vertex_array_generate(self) -> int:
+        vertex_array = gl.glGenVertexArrays(1)
+        if isinstance(vertex_array, (list, tuple)):
+            vertex_array = vertex_array[0]
+        vertex_array = int(vertex_array)
+        self.vertex_array_element_buffers[vertex_array] = 0
+        return vertex_array
+
+    def _vertex_array_delete(self, vertex_array: int) -> None:
+        if self.state_vertex_array == vertex_array:
+            gl.glBindVertexArray(0)
+            self.state_vertex_array = 0
+            self.element_buffer_bound = None
+        self.vertex_array_element_buffers.pop(vertex_array, None)
+        gl.glDeleteVertexArrays(1, [vertex_array])
+
     # ----------------------------------------------------------------------
     # Linking buffers to shader program (vertex attribs)
     # ----------------------------------------------------------------------
@@ -287,7 +1059,12 @@ class GraphicsLibrary:
         self,
         program: Optional[ShaderProgram],
         buffer_index: int,
+        offset: int = 0,
     ) -> None:
+        """
+        offset (bytes) shifts every attribute pointer, e.g. for
+        sub-allocations handed out by GraphicsStreamBuffer.
+        """
         if program is None:
             print("BAD1")
             return
@@ -295,8 +1072,40 @@ class GraphicsLibrary:
             print("BAD2")
             return
 
-        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, buffer_index)
-        gl.glUseProgram(program.program)
+        self.program_use(program.program)
+
+        if self.vertex_arrays_supported():
+            if offset == 0:
+                # Layout is fixed per (program, buffer): record it once.
+                key = (program.program, buffer_index)
+                vertex_array = self.vertex_array_cache.get(key)
+                if vertex_array is not None:
+                    self.vertex_array_bind(vertex_array)
+                    self.vertex_array_linked_cached = True
+                    return
+                vertex_array = self._vertex_array_generate()
+                self.vertex_array_cache[key] = vertex_array
+                self.vertex_array_bind(vertex_array)
+                self.vertex_array_linked_cached = True
+            else:
+                # Offsets change every frame (stream buffers); reuse one
+                # scratch VAO and set the pointers the classic way.
+                if self.vertex_array_scratch == 0:
+                    self.vertex_array_scratch = self._vertex_array_generate()
+                self.vertex_array_bind(self.vertex_array_scratch)
+                self.vertex_array_linked_cached = False
+
+        self.buffer_array_bind(buffer_index)
+        self._vertex_attributes_setup(program, offset)
+
+    def _vertex_attributes_setup(self, program: ShaderProgram, offset: int) -> None:
+        offset_position = program.attribute_offset_position
+        offset_texture_coordinates = program.attribute_offset_texture_coordinates
+        offset_color = program.attribute_offset_color
+        if offset != 0:
+            offset_position = self._attribute_offset_shifted(offset_position, offset)
+            offset_texture_coordinates = self._attribute_offset_shifted(offset_texture_coordinates, offset)
+            offset_color = self._attribute_offset_shifted(offset_color, offset)
 
         # Position attribute
         if program.attribute_location_position != -1:
@@ -307,7 +1116,7 @@ class GraphicsLibrary:
                 gl.GL_FLOAT,
                 False,
                 program.attribute_stride_position,
-                program.attribute_offset_position,
+                offset_position,
             )
             
         # Texture coordinates attribute
@@ -319,13 +1128,41 @@ class GraphicsLibrary:
                 gl.GL_FLOAT,
                 False,
                 program.attribute_stride_texture_coordinates,
-                program.attribute_offset_texture_coordinates,
+                offset_texture_coordinates,
+            )
+
+        # Color attribute
+        if program.attribute_location_color != -1:
+            gl.glEnableVertexAttribArray(program.attribute_location_color)
+            gl.glVertexAttribPointer(
+                program.attribute_location_color,
+                program.attribute_size_color,
+                gl.GL_FLOAT,
+                False,
+                program.attribute_stride_color,
+                offset_color,
             )
 
+    def _attribute_offset_shifted(self, attribute_offset, offset: int) -> ctypes.c_void_p:
+        base = 0
+        if isinstance(attribute_offset, ctypes.c_void_p):
+            base = attribute_offset.value or 0
+        elif isinstance(attribute_offset, int) and attribute_offset > 0:
+            base = attribute_offset
+        return ctypes.c_void_p(base + int(offset))
+
     def unlink_buffer_from_shader_program(self, program: Optional[ShaderProgram]) -> None:
         if program is None or program.program == 0:
             return
 
+        # A cached VAO keeps its attributes enabled; nothing to undo.
+        if self.vertex_array_linked_cached:
+            self.vertex_array_linked_cached = False
+            return
+
+        if program.attribute_location_color != -1:
+            gl.glDisableVertexAttribArray(program.attribute_location_color)
+
         if program.attribute_location_texture_coordinates != -1:
             gl.glDisableVertexAttribArray(program.attribute_location_texture_coordinates)
 
@@ -336,11 +1173,71 @@ class GraphicsLibrary:
     # Uniform helpers
     # ----------------------------------------------------------------------
 
+    # Each ShaderProgram keeps the last value uploaded per location in
+    # program.uniform_cache; uploads that would not change it are skipped.
+
+    def _uniform_program_use(self, program: ShaderProgram) -> None:
+        # glUniform* writes to the current program; make sure it is this one.
+        if self.state_program != program.program:
+            self.program_use(program.program)
+
+    def _uniform_1i_set(self, program: ShaderProgram, location: int, value: int) -> None:
+        if program.uniform_cache.get(location) == value:
+            self.uniform_uploads_skipped += 1
+            return
+        self._uniform_program_use(program)
+        gl.glUniform1i(location, value)
+        program.uniform_cache[location] = value
+        self.uniform_uploads += 1
+
+    def _uniform_2f_set(self, program: ShaderProgram, location: int, x: float, y: float) -> None:
+        value = (x, y)
+        if program.uniform_cache.get(location) == value:
+            self.uniform_uploads_skipped += 1
+            return
+        self._uniform_program_use(program)
+        gl.glUniform2f(location, x, y)
+        program.uniform_cache[location] = value
+        self.uniform_uploads += 1
+
+    def _uniform_4f_set(
+        self,
+        program: ShaderProgram,
+        location: int,
+        r: float,
+        g: float,
+        b: float,
+        a: float,
+    ) -> None:
+        value = (r, g, b, a)
+        if program.uniform_cache.get(location) == value:
+            self.uniform_uploads_skipped += 1
+            return
+        self._uniform_program_use(program)
+        gl.glUniform4f(location, r, g, b, a)
+        program.uniform_cache[location] = value
+        self.uniform_uploads += 1
+
+    def _uniform_matrix4_set(self, program: ShaderProgram, location: int, values: np.ndarray) -> bool:
+        """
+        values: 16 contiguous float32. Returns True if it was uploaded.
+        """
+        # 64 raw bytes compare faster than an element-wise array compare.
+        key = values.tobytes()
+        if program.uniform_cache.get(location) == key:
+            self.uniform_uploads_skipped += 1
+            return False
+        self._uniform_program_use(program)
+        gl.glUniformMatrix4fv(location, 1, False, values)
+        program.uniform_cache[location] = key
+        self.uniform_uploads += 1
+        return True
+
     def uniforms_texture_size_set(self, program: Optional[ShaderProgram], width: float, height: float) -> None:
         if program is None:
             return
         if program.uniform_location_texture_size != -1:
-            gl.glUniform2f(program.uniform_location_texture_size, float(width), float(height))
+            self._uniform_2f_set(program, program.uniform_location_texture_size, float(width), float(height))
 
     # ModulateColor (from Color object)
     def uniforms_modulate_color_set_color(
@@ -352,7 +1249,7 @@ class GraphicsLibrary:
             return
         loc = program.uniform_location_modulate_color
         if loc != -1:
-            gl.glUniform4f(loc, color.r, color.g, color.b, color.a)
+            self._uniform_4f_set(program, loc, color.r, color.g, color.b, color.a)
 
     # ModulateColor (explicit RGBA)
     def uniforms_modulate_color_set(
@@ -367,7 +1264,7 @@ class GraphicsLibrary:
             return
         loc = program.uniform_location_modulate_color
         if loc != -1:
-            gl.glUniform4f(loc, r, g, b, a)
+            self._uniform_4f_set(program, loc, float(r), float(g), float(b), float(a))
 
     
     def uniforms_matrices_set_buffer(
@@ -384,17 +1281,19 @@ class GraphicsLibrary:
 
         # Projection
         if projection_location != -1:
-            arr_p = np.asarray(projection_buffer, dtype=np.float32)
+            arr_p = np.ascontiguousarray(projection_buffer, dtype=np.float32)
             if arr_p.size != 16:
                 raise ValueError("Projection buffer must contain 16 floats")
-            gl.glUniformMatrix4fv(projection_location, 1, False, arr_p)
+            if self._uniform_matrix4_set(program, projection_location, arr_p):
+                program.uploaded_projection_node = None
 
         # ModelView
         if model_view_location != -1:
-            arr_mv = np.asarray(model_view_buffer, dtype=np.float32)
+            arr_mv = np.ascontiguousarray(model_view_buffer, dtype=np.float32)
             if arr_mv.size != 16:
                 raise ValueError("Model-view buffer must contain 16 floats")
-            gl.glUniformMatrix4fv(model_view_location, 1, False, arr_mv)
+            if self._uniform_matrix4_set(program, model_view_location, arr_mv):
+                program.uploaded_model_view_node = None
     
     def uniforms_matrices_set(
         self,
@@ -402,6 +1301,44 @@ class GraphicsLibrary:
         projection_matrix: Optional[Matrix],
         model_view_matrix: Optional[Matrix],
     ) -> None:
+        if program is None:
+            return
+        self.uniforms_projection_matrix_set(program, projection_matrix)
+        self.uniforms_model_view_matrix_set(program, model_view_matrix)
+
+    def uniforms_projection_matrix_set(
+        self,
+        program: Optional[ShaderProgram],
+        projection_matrix: Optional[Matrix],
+    ) -> None:
+        if program is None or projection_matrix is None:
+            return
+        location = program.uniform_location_projection_matrix
+        # Matrix.m is already contiguous float32, upload it as-is.
+        if location != -1 and self._uniform_matrix4_set(program, location, projection_matrix.m):
+            program.uploaded_projection_node = None
+
+    def uniforms_model_view_matrix_set(
+        self,
+        program: Optional[ShaderProgram],
+        model_view_matrix: Optional[Matrix],
+    ) -> None:
+        if program is None or model_view_matrix is None:
+            return
+        location = program.uniform_location_model_view_matrix
+        if location != -1 and self._uniform_matrix4_set(program, location, model_view_matrix.m):
+            program.uploaded_model_view_node = None
+
+    def uniforms_matrices_set_nodes(
+        self,
+        program: Optional[ShaderProgram],
+        projection_node: Optional[TransformNode],
+        model_view_node: Optional[TransformNode],
+    ) -> None:
+        """
+        Like uniforms_matrices_set, but skips even the value compare when
+        the program already holds this node's current world matrix.
+        """
         if program is None:
             return
 
@@ -409,14 +1346,26 @@ class GraphicsLibrary:
         model_view_location = program.uniform_location_model_view_matrix
 
         # Projection
-        if projection_location != -1 and projection_matrix is not None:
-            arr_p = np.asarray(projection_matrix.array(), dtype=np.float32)
-            gl.glUniformMatrix4fv(projection_location, 1, False, arr_p)
+        if projection_location != -1 and projection_node is not None:
+            projection_matrix = projection_node.world
+            if (program.uploaded_projection_node is not projection_node
+                    or program.uploaded_projection_version != projection_node.version):
+                self._uniform_matrix4_set(program, projection_location, projection_matrix.m)
+                program.uploaded_projection_node = projection_node
+                program.uploaded_projection_version = projection_node.version
+            else:
+                self.uniform_uploads_skipped += 1
 
         # ModelView
-        if model_view_location != -1 and model_view_matrix is not None:
-            arr_mv = np.asarray(model_view_matrix.array(), dtype=np.float32)
-            gl.glUniformMatrix4fv(model_view_location, 1, False, arr_mv)
+        if model_view_location != -1 and model_view_node is not None:
+            model_view_matrix = model_view_node.world
+            if (program.uploaded_model_view_node is not model_view_node
+                    or program.uploaded_model_view_version != model_view_node.version):
+                self._uniform_matrix4_set(program, model_view_location, model_view_matrix.m)
+                program.uploaded_model_view_node = model_view_node
+                program.uploaded_model_view_version = model_view_node.version
+            else:
+                self.uniform_uploads_skipped += 1
             
     def uniforms_texture_set_texture(
         self,
@@ -447,6 +1396,5 @@ class GraphicsLibrary:
         if loc == -1 or texture_index == -1:
             return
         
-        gl.glActiveTexture(gl.GL_TEXTURE0)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, texture_index)
-        gl.glUniform1i(loc, 0)
+        self.texture_bind_index(texture_index, unit=0)
+        self._uniform_1i_set(program, loc, 0)
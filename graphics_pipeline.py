@@ -13,8 +13,12 @@ from OpenGL.GL import (
     GL_COMPILE_STATUS,
 )
 
+import tracing
 from shader_program_sprite_2d import ShaderProgramSprite2D
+from shader_program_sprite_2d_colored import ShaderProgramSprite2DColored
 from shader_program_shape_2d import ShaderProgramShape2D
+from shader_program_sprite_2d_instanced import ShaderProgramSprite2DInstanced
+from shader_program_shape_2d_instanced import ShaderProgramShape2DInstanced
 
 class GraphicsPipeline:
     def __init__(self, base_path: str = "."):
@@ -30,6 +34,15 @@ class GraphicsPipeline:
             self.function_sprite2d_fragment,
         )
 
+        # Sprite 2D (per-vertex color) shader functions and program
+        self.function_sprite2d_colored_vertex = self._load_shader_vertex("sprite_2d_colored_vertex.glsl")
+        self.function_sprite2d_colored_fragment = self._load_shader_fragment("sprite_2d_colored_fragment.glsl")
+        self.program_sprite2d_colored = ShaderProgramSprite2DColored(
+            "sprite_2d_colored",
+            self.function_sprite2d_colored_vertex,
+            self.function_sprite2d_colored_fragment,
+        )
+
         # Shape 2D shader functions and program
         self.function_shape2d_vertex = self._load_shader_vertex("shape_2d_vertex.glsl")
         self.function_shape2d_fragment = self._load_shader_fragment("shape_2d_fragment.glsl")
@@ -39,6 +52,23 @@ class GraphicsPipeline:
             self.function_shape2d_fragment,
         )
 
+        # Instanced variants (need GL 3.3 or ARB_instanced_arrays to draw)
+        self.function_sprite2d_instanced_vertex = self._load_shader_vertex("sprite_2d_instanced_vertex.glsl")
+        self.function_sprite2d_instanced_fragment = self._load_shader_fragment("sprite_2d_instanced_fragment.glsl")
+        self.program_sprite2d_instanced = ShaderProgramSprite2DInstanced(
+            "sprite_2d_instanced",
+            self.function_sprite2d_instanced_vertex,
+            self.function_sprite2d_instanced_fragment,
+        )
+
+        self.function_shape2d_instanced_vertex = self._load_shader_vertex("shape_2d_instanced_vertex.glsl")
+        self.function_shape2d_instanced_fragment = self._load_shader_fragment("shape_2d_instanced_fragment.glsl")
+        self.program_shape2d_instanced = ShaderProgramShape2DInstanced(
+            "shape_2d_instanced",
+            self.function_shape2d_instanced_vertex,
+            self.function_shape2d_instanced_fragment,
+        )
+
     # ---------------------------------------------------------
     # Shader loading helpers
     # ---------------------------------------------------------
@@ -55,6 +85,10 @@ class GraphicsPipeline:
         return self._load_shader(GL_FRAGMENT_SHADER, filename)
 
     def _load_shader(self, shader_type: int, filename: str) -> int:
+        with tracing.span(f"compile {filename}", "shader"):
+            return self._load_shader_traced(shader_type, filename)
+
+    def _load_shader_traced(self, shader_type: int, filename: str) -> int:
         try:
             source = self._read_file_as_string(filename)
         except OSError as e:
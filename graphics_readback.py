@@ -0,0 +1,212 @@
+# graphics_readback.py
+
+from __future__ import annotations
+
+import ctypes
+from collections import deque
+from typing import Any, Callable, Optional
+
+import numpy as np
+from OpenGL import GL as gl
+
+class _ReadbackSlot:
+    __slots__ = ("buffer_index", "capacity", "pending", "tag", "width", "height", "fence", "age")
+
+    def __init__(self, buffer_index: int) -> None:
+        self.buffer_index = buffer_index
+        self.capacity: int = 0
+        self.pending: bool = False
+        self.tag: Any = None
+        self.width: int = 0
+        self.height: int = 0
+        self.fence = None
+        self.age: int = 0
+
+
+class GraphicsReadback:
+    """
+    Asynchronous glReadPixels through a ring of GL_PIXEL_PACK_BUFFERs.
+
+    request() starts a copy of a region of the bound read framebuffer into
+    the next pack buffer and returns at once; collect(), called once per
+    frame, hands back every request the GPU has finished, oldest first.
+
+    A request is ready when its fence has signaled (GL 3.2 / ARB_sync),
+    or, without fences, once it is `latency` collect() calls old. If the
+    ring is full, request() finishes the oldest one first (that wait is
+    the only stall, counted in `stalls`).
+
+    Results are (height, width, 4) uint8 RGBA with the top row first.
+    collect(consumer) passes a view straight into the mapped buffer
+    (zero-copy, only valid during the call); otherwise each result is
+    copied out before the buffer is unmapped.
+    """
+
+    def __init__(self, ring_size: int = 3, latency: int = 2) -> None:
+        self.ring_size = max(2, int(ring_size))
+        self.latency = max(1, int(latency))
+        self.slots: list[_ReadbackSlot] = []
+        self.order: deque[_ReadbackSlot] = deque()
+        self.next_slot: int = 0
+        self.fences_supported: Optional[bool] = None
+        self.map_range_supported: Optional[bool] = None
+
+        # Results finished early (ring full) and not yet collected
+        self.finished: list[tuple[Any, np.ndarray]] = []
+
+        self.requests: int = 0
+        self.stalls: int = 0
+        self.bytes_read: int = 0
+
+    def load(self) -> None:
+        if self.slots:
+            return
+        buffers = np.atleast_1d(gl.glGenBuffers(self.ring_size))
+        self.slots = [_ReadbackSlot(int(buffer_index)) for buffer_index in buffers]
+        self.fences_supported = bool(gl.glFenceSync) and bool(gl.glClientWaitSync)
+        self.map_range_supported = bool(gl.glMapBufferRange)
+
+    def unload(self) -> None:
+        for slot in self.slots:
+            self._fence_delete(slot)
+        if self.slots:
+            gl.glDeleteBuffers(len(self.slots), [slot.buffer_index for slot in self.slots])
+        self.slots = []
+        self.order.clear()
+        self.finished = []
+        self.next_slot = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.order)
+
+    def request(self, x: int, y: int, width: int, height: int, tag: Any = None) -> None:
+        self.load()
+        slot = self.slots[self.next_slot]
+        self.next_slot = (self.next_slot + 1) % self.ring_size
+
+        if slot.pending:
+            # Ring full: finish the oldest request rather than drop it.
+            self.stalls += 1
+            while self.order:
+                oldest = self.order[0]
+                self._finish(oldest, None, self.finished)
+                if oldest is slot:
+                    break
+
+        width = int(width)
+        height = int(height)
+        size = width * height * 4
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, slot.buffer_index)
+        if size > slot.capacity:
+            gl.glBufferData(gl.GL_PIXEL_PACK_BUFFER, size, None, gl.GL_STREAM_READ)
+            slot.capacity = size
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        gl.glReadPixels(int(x), int(y), width, height, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+
+        if self.fences_supported:
+            slot.fence = gl.glFenceSync(gl.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        slot.pending = True
+        slot.tag = tag
+        slot.width = width
+        slot.height = height
+        slot.age = 0
+        self.order.append(slot)
+        self.requests += 1
+
+    def collect(
+        self,
+        consumer: Optional[Callable[[Any, np.ndarray], None]] = None,
+        wait: bool = False,
+    ) -> list[tuple[Any, np.ndarray]]:
+        """
+        Return [(tag, pixels)] for every finished request, oldest first.
+        With a consumer, results are passed to it instead and the list is
+        empty. wait=True finishes everything still in flight.
+        """
+        results: list[tuple[Any, np.ndarray]] = []
+        if self.finished:
+            for tag, pixels in self.finished:
+                if consumer is not None:
+                    consumer(tag, pixels)
+                else:
+                    results.append((tag, pixels))
+            self.finished = []
+
+        for slot in self.order:
+            slot.age += 1
+
+        while self.order:
+            slot = self.order[0]
+            if not wait and not self._ready(slot):
+                break
+            self._finish(slot, consumer, results)
+        return results
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    def _ready(self, slot: _ReadbackSlot) -> bool:
+        if slot.fence is not None:
+            status = gl.glClientWaitSync(slot.fence, 0, 0)
+            return status in (gl.GL_ALREADY_SIGNALED, gl.GL_CONDITION_SATISFIED)
+        return slot.age >= self.latency
+
+    def _finish(
+        self,
+        slot: _ReadbackSlot,
+        consumer: Optional[Callable[[Any, np.ndarray], None]],
+        results: list[tuple[Any, np.ndarray]],
+    ) -> None:
+        self.order.popleft()
+        size = slot.width * slot.height * 4
+        shape = (slot.height, slot.width, 4)
+
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, slot.buffer_index)
+        pointer = self._map(size)
+        if pointer:
+            mapped = np.ctypeslib.as_array(
+                ctypes.cast(pointer, ctypes.POINTER(ctypes.c_ubyte)),
+                shape=(size,),
+            )
+            pixels = mapped.reshape(shape)[::-1]
+            if consumer is not None:
+                consumer(slot.tag, pixels)
+            else:
+                results.append((slot.tag, pixels.copy()))
+            gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+        else:
+            # Mapping unavailable: fall back to a plain copy
+            data = gl.glGetBufferSubData(gl.GL_PIXEL_PACK_BUFFER, 0, size)
+            pixels = np.frombuffer(data, dtype=np.uint8, count=size).reshape(shape)[::-1]
+            if consumer is not None:
+                consumer(slot.tag, pixels)
+            else:
+                results.append((slot.tag, pixels))
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+
+        self._fence_delete(slot)
+        self.bytes_read += size
+        slot.pending = False
+        slot.tag = None
+
+    def _map(self, size: int):
+        if self.map_range_supported:
+            pointer = gl.glMapBufferRange(gl.GL_PIXEL_PACK_BUFFER, 0, size, gl.GL_MAP_READ_BIT)
+        else:
+            pointer = gl.glMapBuffer(gl.GL_PIXEL_PACK_BUFFER, gl.GL_READ_ONLY)
+        return pointer
+
+    @staticmethod
+    def _fence_delete(slot: _ReadbackSlot) -> None:
+        if slot.fence is not None:
+            gl.glDeleteSync(slot.fence)
+            slot.fence = None
+
+    def print(self) -> None:
+        print("GraphicsReadback -> [" + str(self.ring_size) + " buffers]")
+        print("\tRequests: " + str(self.requests))
+        print("\tStalls: " + str(self.stalls))
+        print("\tBytes: " + str(self.bytes_read))
@@ -0,0 +1,203 @@
+# graphics_stats.py
+
+from __future__ import annotations
+
+import ctypes
+import json
+from collections import deque
+from typing import Optional
+
+import numpy as np
+from OpenGL import GL as gl
+
+# Per-frame counters recorded by GraphicsLibrary.stats_end_frame()
+FRAME_COUNTER_NAMES = (
+    "cpu_ms",
+    "gpu_ms",
+    "draw_calls",
+    "vertices",
+    "state_changes",
+    "state_changes_skipped",
+    "uniform_uploads",
+    "uniform_uploads_skipped",
+    "buffer_bytes",
+    "texture_bytes",
+)
+
+class GraphicsStats:
+    """
+    Rolling window of per-frame counters.
+
+    Each frame is one dict of FRAME_COUNTER_NAMES -> number. gpu_ms lags
+    a couple of frames behind (see GpuTimer) and is None until the first
+    query result is available.
+    """
+
+    def __init__(self, window: int = 300) -> None:
+        self.window = int(window)
+        self.frames: deque[dict[str, Optional[float]]] = deque(maxlen=self.window)
+        self.frame_count: int = 0
+
+    def add_frame(self, counters: dict[str, Optional[float]]) -> None:
+        self.frames.append(counters)
+        self.frame_count += 1
+
+    def clear(self) -> None:
+        self.frames.clear()
+
+    def values(self, name: str) -> np.ndarray:
+        return np.array(
+            [frame[name] for frame in self.frames if frame.get(name) is not None],
+            dtype=np.float64,
+        )
+
+    def percentile(self, name: str, percent: float) -> Optional[float]:
+        values = self.values(name)
+        if values.size == 0:
+            return None
+        return float(np.percentile(values, percent))
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result: dict[str, dict[str, float]] = {}
+        for name in FRAME_COUNTER_NAMES:
+            values = self.values(name)
+            if values.size == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [50.0, 95.0, 99.0])
+            result[name] = {
+                "mean": float(values.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "max": float(values.max()),
+            }
+        return result
+
+    def to_json(self, include_frames: bool = False) -> str:
+        data: dict[str, object] = {
+            "frame_count": self.frame_count,
+            "window": len(self.frames),
+            "summary": self.summary(),
+        }
+        if include_frames:
+            data["frames"] = list(self.frames)
+        return json.dumps(data, indent=2)
+
+    def dump_json(self, path: str, include_frames: bool = False) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json(include_frames=include_frames))
+
+    def print(self) -> None:
+        print("GraphicsStats -> [" + str(len(self.frames)) + " frames]")
+        for name, values in self.summary().items():
+            print(
+                f"\t{name}: mean={values['mean']:.3f} p50={values['p50']:.3f} "
+                f"p95={values['p95']:.3f} p99={values['p99']:.3f} max={values['max']:.3f}"
+            )
+
+
+class GpuTimer:
+    """
+    GL_TIME_ELAPSED queries in a small ring, so results are read
+    (len(ring) - 1) frames later, only once available. Never blocks.
+
+    Needs GL 3.3 or ARB_timer_query; otherwise begin/end are no-ops
+    and read() returns None. Results are read as 64-bit values where
+    glGetQueryObjectui64v exists (32 bits wrap at 4.29 s); samples that
+    are saturated or longer than MAX_SAMPLE_NS are dropped.
+    """
+
+    # No frame takes this long; a bigger result is a driver artifact
+    MAX_SAMPLE_NS = 10 * 1000 * 1000 * 1000
+    SATURATED_32 = 0xFFFFFFFF
+
+    def __init__(self, ring_size: int = 3) -> None:
+        self.ring_size = max(2, int(ring_size))
+        self.queries: list[int] = []
+        self.pending: list[bool] = []
+        self.frame: int = 0
+        self.active: bool = False
+        self.supported: Optional[bool] = None
+        # Invalid samples discarded by read()
+        self.dropped: int = 0
+
+    def _resolve(self) -> bool:
+        if self.supported is None:
+            self.supported = False
+            try:
+                if self._timer_query_available():
+                    queries = gl.glGenQueries(self.ring_size)
+                    self.queries = [int(query) for query in np.atleast_1d(queries)]
+                    self.pending = [False] * self.ring_size
+                    self.supported = True
+            except Exception as e:
+                print(f"[GpuTimer] Timer queries unavailable: {e}")
+        return self.supported
+
+    @staticmethod
+    def _timer_query_available() -> bool:
+        if not (bool(gl.glGenQueries) and bool(gl.glBeginQuery)):
+            return False
+        version = gl.glGetString(gl.GL_VERSION) or b""
+        try:
+            major, minor = (int(part) for part in version.split()[0].split(b".")[:2])
+        except ValueError:
+            major, minor = 0, 0
+        if (major, minor) >= (3, 3):
+            return True
+        extensions = gl.glGetString(gl.GL_EXTENSIONS) or b""
+        return b"GL_ARB_timer_query" in extensions or b"GL_EXT_timer_query" in extensions
+
+    def begin(self) -> None:
+        if not self._resolve():
+            return
+        slot = self.frame % self.ring_size
+        if self.pending[slot]:
+            # Result never became available in time; drop it rather than wait.
+            self.pending[slot] = False
+        gl.glBeginQuery(gl.GL_TIME_ELAPSED, self.queries[slot])
+        self.active = True
+
+    def end(self) -> None:
+        if not self.active:
+            return
+        gl.glEndQuery(gl.GL_TIME_ELAPSED)
+        self.pending[self.frame % self.ring_size] = True
+        self.active = False
+        self.frame += 1
+
+    def read(self) -> Optional[float]:
+        """
+        Milliseconds for the oldest finished frame, or None.
+        """
+        if not self.supported:
+            return None
+        slot = self.frame % self.ring_size  # oldest query in the ring
+        if not self.pending[slot]:
+            return None
+        query = self.queries[slot]
+        available = gl.glGetQueryObjectiv(query, gl.GL_QUERY_RESULT_AVAILABLE)
+        if not available:
+            return None
+        nanoseconds = self._query_result(query)
+        self.pending[slot] = False
+        if nanoseconds == self.SATURATED_32 or nanoseconds > self.MAX_SAMPLE_NS:
+            self.dropped += 1
+            return None
+        return float(nanoseconds) / 1.0e6
+
+    @staticmethod
+    def _query_result(query: int) -> int:
+        if bool(gl.glGetQueryObjectui64v):
+            # PyOpenGL has no output array type for GLuint64; pass our own
+            result = ctypes.c_uint64(0)
+            gl.glGetQueryObjectui64v(query, gl.GL_QUERY_RESULT, ctypes.byref(result))
+            return int(result.value)
+        return int(gl.glGetQueryObjectuiv(query, gl.GL_QUERY_RESULT))
+
+    def unload(self) -> None:
+        if self.queries:
+            gl.glDeleteQueries(len(self.queries), self.queries)
+        self.queries = []
+        self.pending = []
+        self.supported = None
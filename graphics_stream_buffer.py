@@ -0,0 +1,118 @@
+# graphics_stream_buffer.py
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Union, TYPE_CHECKING
+
+import numpy as np
+from OpenGL import GL as gl
+
+from float_bufferable import FloatBufferable
+from vertex_array import VertexArray
+
+if TYPE_CHECKING:
+    from graphics_library import GraphicsLibrary
+
+class GraphicsStreamBuffer:
+    """
+    One large VBO that hands out per-frame sub-allocations from a ring.
+
+    Each write() copies vertex data at the ring head and returns its byte
+    offset; draw it with
+        graphics.link_buffer_to_shader_program(program, stream.buffer_index, offset)
+
+    When the ring is full the storage is orphaned (glBufferData with no
+    data, same size) and the head wraps to 0. The driver hands back fresh
+    memory while the GPU keeps reading the old block, so the CPU never
+    waits on draws still in flight. The GL 2.1 context has no fence sync,
+    which is why orphaning is used instead of fences.
+
+    If a frame writes more than the capacity, the buffer grows at the
+    next begin_frame() (or immediately, for a single oversized write).
+    """
+
+    ALIGNMENT = 16
+
+    def __init__(self, capacity: int = 4 * 1024 * 1024) -> None:
+        self.graphics: Optional["GraphicsLibrary"] = None
+        self.buffer_index: int = -1
+        self.capacity: int = max(int(capacity), self.ALIGNMENT)  # in bytes
+        self.head: int = 0  # in bytes
+
+        # Per-frame bookkeeping
+        self.frame_bytes: int = 0
+        self.orphan_count: int = 0
+        self.grow_count: int = 0
+
+    def load(self, graphics: "GraphicsLibrary") -> None:
+        self.graphics = graphics
+        self.buffer_index = graphics.buffer_array_generate()
+        self._orphan()
+
+    def unload(self) -> None:
+        if self.graphics is not None and self.buffer_index != -1:
+            self.graphics.buffer_array_delete(self.buffer_index)
+        self.buffer_index = -1
+        self.head = 0
+
+    def begin_frame(self) -> None:
+        """
+        Call once per frame, before the first write().
+        """
+        if self.frame_bytes > self.capacity:
+            self._grow(self.frame_bytes)
+        self.frame_bytes = 0
+
+    def write(self, items: Union[np.ndarray, VertexArray, Sequence[FloatBufferable]]) -> int:
+        """
+        Copy vertex data into the ring. Returns the byte offset of the
+        data inside buffer_index, or -1 if nothing was written.
+        """
+        if self.graphics is None or self.buffer_index == -1:
+            return -1
+        graphics = self.graphics
+
+        if isinstance(items, VertexArray):
+            data = items.floats()
+        elif isinstance(items, np.ndarray):
+            data = np.ascontiguousarray(items, dtype=np.float32).reshape(-1)
+        else:
+            float_buffer: list[float] = []
+            graphics.buffer_float_write_from_list(items, float_buffer)
+            data = np.asarray(float_buffer, dtype=np.float32)
+
+        size = int(data.nbytes)
+        if size == 0:
+            return -1
+
+        aligned = (size + self.ALIGNMENT - 1) // self.ALIGNMENT * self.ALIGNMENT
+        self.frame_bytes += aligned
+
+        if aligned > self.capacity:
+            self._grow(aligned)
+        elif self.head + aligned > self.capacity:
+            self._orphan()
+
+        offset = self.head
+        graphics.buffer_array_write_range(self.buffer_index, offset, data)
+        self.head += aligned
+        return offset
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    def _orphan(self) -> None:
+        self.graphics.buffer_array_bind(self.buffer_index)
+        gl.glBufferData(gl.GL_ARRAY_BUFFER, self.capacity, None, gl.GL_STREAM_DRAW)
+        self.head = 0
+        self.orphan_count += 1
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        print(f"[GraphicsStreamBuffer] Growing from {self.capacity} to {capacity} bytes.")
+        self.capacity = capacity
+        self.grow_count += 1
+        self._orphan()
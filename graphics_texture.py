@@ -5,26 +5,54 @@ from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from graphics_library import GraphicsLibrary
+    from image_disk_cache import ImageDiskCache
 
 from PIL import Image
 import numpy as np
 from OpenGL import GL as gl
 
+from image_memmap import map_image
+import tracing
+
+# PIL modes uploaded as they are; anything else is converted to RGBA
+TEXTURE_NATIVE_MODES = ("L", "LA", "RGB", "RGBA")
+
+def decode_image(file_name: str) -> np.ndarray:
+    """
+    Decoded (H, W[, C]) uint8 pixels. The PIL image is released on
+    return, so only the array outlives the decode.
+    """
+    with Image.open(file_name) as img:
+        if img.mode not in TEXTURE_NATIVE_MODES:
+            img = img.convert("RGBA")
+        return np.asarray(img)
+
 
 class GraphicsTexture:
     def __init__(
         self,
         graphics: Optional["GraphicsLibrary"] = None,
         file_name: Optional[str] = None,
+        disk_cache: Optional["ImageDiskCache"] = None,
+        mipmaps: bool = False,
     ) -> None:
         self.graphics: Optional["GraphicsLibrary"] = graphics
         self.file_name: Optional[str] = file_name
 
+        # Decoded pixels (and mip levels) come memory-mapped from here if set
+        self.disk_cache: Optional["ImageDiskCache"] = disk_cache
+        self.mipmaps: bool = mipmaps
+
         self.texture_index: int = -1
         self.width: int = 0
         self.height: int = 0
         self.widthf: float = 0.0
         self.heightf: float = 0.0
+        # 1 gray, 2 gray + alpha, 3 RGB, 4 RGBA (as uploaded)
+        self.channels: int = 4
+
+        # texture_index is a shared stand-in (TextureLoader); never delete it
+        self.placeholder: bool = False
 
         # Auto-load if both graphics + path are provided
         if graphics is not None and file_name is not None:
@@ -36,23 +64,63 @@ class GraphicsTexture:
     def load(self) -> None:
         """
         Load or reload the texture from file_name.
+
+        .npy and uncompressed TIFF files are memory-mapped and uploaded
+        from the mapping; other formats come from the disk cache if there
+        is one, else are decoded by PIL (gray / RGB stay unexpanded).
         """
         if self.graphics is None or self.file_name is None:
             return
 
-        # If previously loaded, delete old GL texture
-        self.unload()
+        with tracing.span("GraphicsTexture.load"):
+            # If previously loaded, delete old GL texture
+            self.unload()
+
+            pixels = map_image(self.file_name)
+            if pixels is not None:
+                self._load_pixels(pixels)
+                return
+
+            if self.disk_cache is not None:
+                # Cached levels are mapped, not decoded; upload reads the pages directly
+                with tracing.span("decode"):
+                    levels = self.disk_cache.load(self.file_name, mipmaps=self.mipmaps)
+                    self.height, self.width = levels[0].shape[0], levels[0].shape[1]
+                    self.channels = int(levels[0].shape[2])
+                    self.widthf = float(self.width)
+                    self.heightf = float(self.height)
 
-        # Open with PIL
-        img = Image.open(self.file_name).convert("RGBA")
-        self.width, self.height = img.size
+                with tracing.span("upload"):
+                    self.texture_index = self.graphics.texture_generate_from_mipmaps(levels)
+                return
+
+            # Open with PIL; one decoded copy, handed to GL as is
+            with tracing.span("decode"):
+                pixels = decode_image(self.file_name)
+
+            self._load_pixels(pixels)
+
+    def load_pixels(self, pixels: np.ndarray) -> None:
+        """
+        Load from (H, W) or (H, W, 1..4) uint8 pixels (e.g. an np.memmap
+        from image_memmap.map_raw) without converting them to RGBA.
+        """
+        if self.graphics is None:
+            return
+        with tracing.span("GraphicsTexture.load"):
+            self.unload()
+            self._load_pixels(pixels)
+
+    def _load_pixels(self, pixels: np.ndarray) -> None:
+        self.height, self.width = int(pixels.shape[0]), int(pixels.shape[1])
         self.widthf = float(self.width)
         self.heightf = float(self.height)
+        self.channels = 1 if pixels.ndim == 2 else int(pixels.shape[2])
 
-        bitmap = np.array(img, dtype=np.uint8)
-
-        # Use GraphicsLibrary to create GL texture
-        self.texture_index = self.graphics.texture_generate_from_bitmap(bitmap)
+        with tracing.span("upload"):
+            self.texture_index = self.graphics.texture_generate_from_pixels(pixels)
+            if self.mipmaps:
+                self.graphics.texture_generate_mipmap(self.texture_index)
 
     # --------------------------------------------------------------
     # Unload / delete GPU texture
@@ -61,14 +129,19 @@ class GraphicsTexture:
         """
         Delete the texture from GPU and reset fields.
         """
-        if self.texture_index != -1:
-            gl.glDeleteTextures([self.texture_index])
-            self.texture_index = -1
+        if self.texture_index != -1 and not self.placeholder:
+            if self.graphics is not None:
+                self.graphics.texture_delete(self.texture_index)
+            else:
+                gl.glDeleteTextures([self.texture_index])
+        self.texture_index = -1
+        self.placeholder = False
 
         self.width = 0
         self.height = 0
         self.widthf = 0.0
         self.heightf = 0.0
+        self.channels = 4
 
     def print(self) -> None:
         print("GraphicsTexture -> [" + str(self.width) + ", " + str(self.height) + "]")
@@ -0,0 +1,213 @@
+# headless_context.py
+#
+# PyOpenGL picks its platform (GLX, EGL, OSMesa) when OpenGL is first
+# imported, so call headless_platform_select() before importing
+# OpenGL, GraphicsLibrary or anything else that does:
+#
+#     import headless_context
+#     headless_context.headless_platform_select()
+#     from graphics_library import GraphicsLibrary
+#     ...
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Optional
+
+HEADLESS_BACKENDS = ("egl", "osmesa")
+
+# EGL_MESA_platform_surfaceless (not wrapped by PyOpenGL)
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+def headless_platform_select(backend: Optional[str] = None) -> str:
+    """
+    Set PYOPENGL_PLATFORM for a headless backend. An existing
+    PYOPENGL_PLATFORM wins; otherwise backend, defaulting to "egl".
+    """
+    if "OpenGL.GL" in sys.modules:
+        print("[HeadlessContext] OpenGL already imported; PYOPENGL_PLATFORM may be ignored")
+    platform = os.environ.get("PYOPENGL_PLATFORM") or backend or "egl"
+    platform = platform.lower()
+    if platform not in HEADLESS_BACKENDS:
+        raise ValueError(f"Unknown headless backend '{platform}', expected one of {HEADLESS_BACKENDS}")
+    os.environ["PYOPENGL_PLATFORM"] = platform
+    return platform
+
+
+class HeadlessContext:
+    """
+    A GL context with no window, for batch rendering on servers without
+    a display. Draw into a GraphicsFramebuffer; the context's own default
+    framebuffer is either absent (EGL surfaceless) or a small client
+    buffer (OSMesa).
+
+        egl      EGL_MESA_platform_surfaceless / EGL_KHR_surfaceless_context,
+                 falling back to a pbuffer surface (GPU or llvmpipe)
+        osmesa   Mesa's off-screen renderer (llvmpipe / softpipe, CPU only)
+    """
+
+    def __init__(self, width: int = 1, height: int = 1, backend: Optional[str] = None) -> None:
+        self.width: int = int(width)
+        self.height: int = int(height)
+        self.backend: str = (backend or os.environ.get("PYOPENGL_PLATFORM") or "egl").lower()
+
+        self._egl_display = None
+        self._egl_surface = None
+        self._egl_context = None
+        self._osmesa_context = None
+        self._osmesa_buffer = None
+
+    def create(self) -> None:
+        if self.backend == "egl":
+            self._create_egl()
+        elif self.backend == "osmesa":
+            self._create_osmesa()
+        else:
+            raise ValueError(f"Unknown headless backend '{self.backend}'")
+
+    def destroy(self) -> None:
+        if self._egl_display is not None:
+            from OpenGL import EGL as egl
+            egl.eglMakeCurrent(self._egl_display, egl.EGL_NO_SURFACE, egl.EGL_NO_SURFACE, egl.EGL_NO_CONTEXT)
+            if self._egl_surface is not None:
+                egl.eglDestroySurface(self._egl_display, self._egl_surface)
+            if self._egl_context is not None:
+                egl.eglDestroyContext(self._egl_display, self._egl_context)
+            egl.eglTerminate(self._egl_display)
+        if self._osmesa_context is not None:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self._osmesa_context)
+
+        self._egl_display = None
+        self._egl_surface = None
+        self._egl_context = None
+        self._osmesa_context = None
+        self._osmesa_buffer = None
+
+    def __enter__(self) -> "HeadlessContext":
+        self.create()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.destroy()
+
+    # ----------------------------------------------------------------------
+    # EGL
+    # ----------------------------------------------------------------------
+
+    def _create_egl(self) -> None:
+        import ctypes
+        from OpenGL import EGL as egl
+
+        display = self._egl_display_surfaceless()
+        if display is None or display == egl.EGL_NO_DISPLAY:
+            display = egl.eglGetDisplay(egl.EGL_DEFAULT_DISPLAY)
+        if display == egl.EGL_NO_DISPLAY:
+            raise RuntimeError("eglGetDisplay failed")
+
+        major, minor = egl.EGLint(), egl.EGLint()
+        if not egl.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("eglInitialize failed")
+        self._egl_display = display
+
+        config_attributes = [
+            egl.EGL_SURFACE_TYPE, egl.EGL_PBUFFER_BIT,
+            egl.EGL_RED_SIZE, 8,
+            egl.EGL_GREEN_SIZE, 8,
+            egl.EGL_BLUE_SIZE, 8,
+            egl.EGL_ALPHA_SIZE, 8,
+            egl.EGL_RENDERABLE_TYPE, egl.EGL_OPENGL_BIT,
+            egl.EGL_NONE,
+        ]
+        config = egl.EGLConfig()
+        config_count = egl.EGLint()
+        if not egl.eglChooseConfig(
+            display,
+            (egl.EGLint * len(config_attributes))(*config_attributes),
+            ctypes.pointer(config),
+            1,
+            ctypes.pointer(config_count),
+        ) or config_count.value == 0:
+            # Surfaceless displays may not advertise pbuffer configs
+            config_attributes[1] = 0
+            if not egl.eglChooseConfig(
+                display,
+                (egl.EGLint * len(config_attributes))(*config_attributes),
+                ctypes.pointer(config),
+                1,
+                ctypes.pointer(config_count),
+            ) or config_count.value == 0:
+                raise RuntimeError("eglChooseConfig found no desktop GL config")
+
+        if not egl.eglBindAPI(egl.EGL_OPENGL_API):
+            raise RuntimeError("eglBindAPI(EGL_OPENGL_API) failed")
+
+        context = egl.eglCreateContext(display, config, egl.EGL_NO_CONTEXT, None)
+        if context == egl.EGL_NO_CONTEXT:
+            raise RuntimeError("eglCreateContext failed")
+        self._egl_context = context
+
+        if egl.eglMakeCurrent(display, egl.EGL_NO_SURFACE, egl.EGL_NO_SURFACE, context):
+            return
+
+        # No EGL_KHR_surfaceless_context: make current on a pbuffer instead
+        surface_attributes = [egl.EGL_WIDTH, self.width, egl.EGL_HEIGHT, self.height, egl.EGL_NONE]
+        surface = egl.eglCreatePbufferSurface(
+            display,
+            config,
+            (egl.EGLint * len(surface_attributes))(*surface_attributes),
+        )
+        if surface == egl.EGL_NO_SURFACE:
+            raise RuntimeError("eglCreatePbufferSurface failed")
+        self._egl_surface = surface
+        if not egl.eglMakeCurrent(display, surface, surface, context):
+            raise RuntimeError("eglMakeCurrent failed")
+
+    @staticmethod
+    def _egl_display_surfaceless():
+        from OpenGL import EGL as egl
+
+        try:
+            extensions = egl.eglQueryString(egl.EGL_NO_DISPLAY, egl.EGL_EXTENSIONS) or b""
+        except Exception:
+            return None
+        if b"EGL_MESA_platform_surfaceless" not in extensions:
+            return None
+        try:
+            from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+        except ImportError:
+            return None
+        if not eglGetPlatformDisplayEXT:
+            return None
+        try:
+            return eglGetPlatformDisplayEXT(EGL_PLATFORM_SURFACELESS_MESA, egl.EGL_DEFAULT_DISPLAY, None)
+        except Exception:
+            return None
+
+    # ----------------------------------------------------------------------
+    # OSMesa
+    # ----------------------------------------------------------------------
+
+    def _create_osmesa(self) -> None:
+        from OpenGL import GL as gl
+        from OpenGL import arrays
+        from OpenGL import osmesa
+
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not context:
+            raise RuntimeError("OSMesaCreateContextExt failed")
+        self._osmesa_context = context
+
+        # OSMesa always renders into client memory; keep it small and
+        # draw into framebuffer objects instead.
+        self._osmesa_buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(context, self._osmesa_buffer, gl.GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("OSMesaMakeCurrent failed")
+
+    def print(self) -> None:
+        from OpenGL import GL as gl
+
+        print("HeadlessContext -> [" + self.backend + "]")
+        print("\tGL VERSION: " + str(gl.glGetString(gl.GL_VERSION)))
+        print("\tRENDERER: " + str(gl.glGetString(gl.GL_RENDERER)))
@@ -0,0 +1,268 @@
+# image_disk_cache.py
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+import tracing
+
+def _box_sum(values: np.ndarray, axis: int, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sums of pairs along axis into size bins (size = max(1, n // 2)); an
+    odd trailing row / column folds into the last bin. Returns the sums
+    and the count per bin.
+    """
+    starts = np.arange(size) * 2
+    ends = np.append(starts[1:], values.shape[axis])
+    return np.add.reduceat(values, starts, axis=axis), (ends - starts).astype(np.float32)
+
+def mipmap_chain(level0: np.ndarray) -> list[np.ndarray]:
+    """
+    Full RGBA mip chain down to 1x1 (level0 included), with GL's level
+    sizes max(1, n // 2).
+
+    Each texel averages its 2x2 block (2x3, 3x2 or 3x3 at the far edge of
+    an odd size), weighted by alpha so fully transparent texels do not
+    bleed their color into their neighbours.
+    """
+    levels = [level0]
+    current = level0.astype(np.float32)
+    while current.shape[0] > 1 or current.shape[1] > 1:
+        height = max(1, current.shape[0] // 2)
+        width = max(1, current.shape[1] // 2)
+
+        alpha = current[:, :, 3:4]
+        stacked = np.concatenate([current[:, :, 0:3] * alpha, alpha, current[:, :, 0:3]], axis=2)
+        stacked, rows = _box_sum(stacked, 0, height)
+        stacked, columns = _box_sum(stacked, 1, width)
+        count = (rows[:, None] * columns[None, :])[:, :, None]
+
+        color_sum = stacked[:, :, 0:3]
+        alpha_sum = stacked[:, :, 3:4]
+        color = np.where(alpha_sum > 0.0, color_sum / np.maximum(alpha_sum, 1e-6), stacked[:, :, 4:7] / count)
+        current = np.concatenate([color, alpha_sum / count], axis=2)
+        levels.append(np.clip(current + 0.5, 0.0, 255.0).astype(np.uint8))
+    return levels
+
+
+class ImageDiskCache:
+    """
+    Decoded RGBA pixels (and mip chains) kept on disk as .npy files,
+    memory-mapped on reopen so no PNG decode or RGBA convert is repeated.
+
+    Layout:
+        keys/<hash of path, size, mtime>     -> content hash (skips rehashing)
+        entries/<content hash>/level<N>.npy  -> (H, W, 4) uint8 per mip level
+
+    Entries are keyed by content, so renamed or copied files share one
+    entry. Every access touches the entry directory; once the total size
+    passes max_bytes the least recently used entries are deleted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 2 * 1024 * 1024 * 1024) -> None:
+        self.directory = os.fspath(directory)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.directory, "keys"), exist_ok=True)
+        os.makedirs(os.path.join(self.directory, "entries"), exist_ok=True)
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def default_directory() -> str:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "graphics_image_cache")
+
+    # ----------------------------------------------------------------------
+    # Lookup
+    # ----------------------------------------------------------------------
+
+    def load(self, file_name: str, mipmaps: bool = False) -> list[np.ndarray]:
+        """
+        [level0] or the full mip chain for file_name, as read-only
+        memory-mapped arrays. Decodes and stores the image on a miss.
+        """
+        entry = self._entry_directory(self.content_hash(file_name))
+        level_count = self._level_count(entry)
+        wanted = None if mipmaps else 1
+
+        if level_count > 0 and (not mipmaps or self._mipmaps_complete(entry, level_count)):
+            self.hits += 1
+            self._touch(entry)
+            return self._map_levels(entry, wanted or level_count)
+
+        self.misses += 1
+        with tracing.span(f"ImageDiskCache.store {file_name}", "loader"):
+            if level_count > 0:
+                level0 = np.load(os.path.join(entry, "level0.npy"))
+            else:
+                with Image.open(file_name) as img:
+                    level0 = np.ascontiguousarray(np.asarray(img.convert("RGBA"), dtype=np.uint8))
+            levels = mipmap_chain(level0) if mipmaps else [level0]
+            self._store(entry, levels)
+        self.cleanup(keep=entry)
+        return self._map_levels(entry, len(levels))
+
+    def load_rgba(self, file_name: str) -> np.ndarray:
+        return self.load(file_name)[0]
+
+    def entry_directory_for(self, file_name: str) -> str:
+        """
+        The (created, touched) entry directory for file_name's content, for
+        derived data such as TiledImageSource pyramid levels. It counts
+        toward max_bytes and is cleaned up with the entry.
+        """
+        entry = self._entry_directory(self.content_hash(file_name))
+        os.makedirs(entry, exist_ok=True)
+        self._touch(entry)
+        return entry
+
+    def content_hash(self, file_name: str) -> str:
+        stat = os.stat(file_name)
+        quick = f"{os.path.realpath(file_name)}|{stat.st_size}|{stat.st_mtime_ns}"
+        key_path = os.path.join(
+            self.directory,
+            "keys",
+            hashlib.blake2b(quick.encode("utf-8"), digest_size=16).hexdigest(),
+        )
+        try:
+            with open(key_path, "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            pass
+
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_name, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        content = digest.hexdigest()
+        self._write_atomic(key_path, content.encode("utf-8"))
+        return content
+
+    # ----------------------------------------------------------------------
+    # Cleanup
+    # ----------------------------------------------------------------------
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def cleanup(self, max_bytes: Optional[int] = None, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used entries until the cache fits in
+        max_bytes (default self.max_bytes). The entry directory keep (the
+        one just stored, about to be mapped) is never deleted, even if it
+        alone is over the limit. Returns the bytes freed.
+        """
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if total <= limit:
+                    break
+                if path == keep:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                freed += size
+        return freed
+
+    def clear(self) -> None:
+        self.cleanup(0)
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    def _entry_directory(self, content: str) -> str:
+        return os.path.join(self.directory, "entries", content)
+
+    @staticmethod
+    def _level_count(entry: str) -> int:
+        count = 0
+        while os.path.exists(os.path.join(entry, f"level{count}.npy")):
+            count += 1
+        return count
+
+    @staticmethod
+    def _mipmaps_complete(entry: str, level_count: int) -> bool:
+        """
+        True if the stored levels form a chain GL accepts: each level
+        max(1, n // 2) of the one before, ending at 1x1.
+        """
+        height, width = 0, 0
+        for index in range(level_count):
+            level = np.load(os.path.join(entry, f"level{index}.npy"), mmap_mode="r")
+            if index > 0 and (level.shape[0], level.shape[1]) != (max(1, height // 2), max(1, width // 2)):
+                return False
+            height, width = level.shape[0], level.shape[1]
+        return height == 1 and width == 1
+
+    @staticmethod
+    def _map_levels(entry: str, count: int) -> list[np.ndarray]:
+        return [np.load(os.path.join(entry, f"level{index}.npy"), mmap_mode="r") for index in range(count)]
+
+    def _store(self, entry: str, levels: list[np.ndarray]) -> None:
+        os.makedirs(entry, exist_ok=True)
+        for index, level in enumerate(levels):
+            path = os.path.join(entry, f"level{index}.npy")
+            if index == 0 and os.path.exists(path):
+                # Mip levels are rewritten (a stale chain may be there), level 0 never changes
+                continue
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                np.save(f, np.ascontiguousarray(level))
+            os.replace(temporary, path)
+        index = len(levels)
+        while levels[-1].shape[0] == 1 and levels[-1].shape[1] == 1 and os.path.exists(
+            os.path.join(entry, f"level{index}.npy")
+        ):
+            # Left over from a longer stale chain
+            os.remove(os.path.join(entry, f"level{index}.npy"))
+            index += 1
+        self._touch(entry)
+
+    @staticmethod
+    def _touch(entry: str) -> None:
+        now = time.time()
+        try:
+            os.utime(entry, (now, now))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        """
+        (path, bytes, last used) per entry.
+        """
+        root = os.path.join(self.directory, "entries")
+        result = []
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+                result.append((path, size, os.stat(path).st_mtime))
+            except OSError:
+                continue
+        return result
+
+    def print(self) -> None:
+        print("ImageDiskCache -> [" + self.directory + "]")
+        print("\tBytes: " + str(self.size_bytes()) + " / " + str(self.max_bytes))
+        print("\tHits: " + str(self.hits) + " Misses: " + str(self.misses))
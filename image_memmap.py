@@ -0,0 +1,127 @@
+# image_memmap.py
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+
+# Extensions map_image() can open without decoding
+IMAGE_MEMMAP_EXTENSIONS = (".npy", ".tif", ".tiff")
+
+# Baseline TIFF tags
+_TIFF_IMAGE_WIDTH = 256
+_TIFF_IMAGE_LENGTH = 257
+_TIFF_BITS_PER_SAMPLE = 258
+_TIFF_COMPRESSION = 259
+_TIFF_PHOTOMETRIC = 262
+_TIFF_STRIP_OFFSETS = 273
+_TIFF_SAMPLES_PER_PIXEL = 277
+_TIFF_ROWS_PER_STRIP = 278
+_TIFF_STRIP_BYTE_COUNTS = 279
+_TIFF_PLANAR_CONFIGURATION = 284
+
+# TIFF field type -> struct code
+_TIFF_TYPES = {1: "B", 3: "H", 4: "I", 16: "Q"}
+
+def map_npy(file_name: str) -> np.ndarray:
+    pixels = np.load(file_name, mmap_mode="r")
+    _check_pixels(pixels, file_name)
+    return pixels
+
+def map_raw(file_name: str, width: int, height: int, channels: int = 4, offset: int = 0) -> np.ndarray:
+    """
+    Headerless interleaved uint8 pixels, rows top-down and unpadded.
+    """
+    shape = (int(height), int(width)) if channels == 1 else (int(height), int(width), int(channels))
+    return np.memmap(file_name, dtype=np.uint8, mode="r", offset=int(offset), shape=shape)
+
+def map_tiff(file_name: str) -> np.ndarray:
+    """
+    Uncompressed 8-bit gray / RGB / RGBA TIFF whose strips are stored
+    back to back (as most writers do). Anything else raises ValueError;
+    decode those with PIL instead.
+    """
+    with open(file_name, "rb") as f:
+        header = f.read(8)
+        if header[:4] == b"II*\x00":
+            endian = "<"
+        elif header[:4] == b"MM\x00*":
+            endian = ">"
+        else:
+            raise ValueError(f"{file_name}: not a classic TIFF")
+        (ifd_offset,) = struct.unpack(endian + "I", header[4:8])
+
+        f.seek(ifd_offset)
+        (count,) = struct.unpack(endian + "H", f.read(2))
+        tags: dict[int, list[int]] = {}
+        for _ in range(count):
+            tag, field_type, value_count, value = struct.unpack(endian + "HHI4s", f.read(12))
+            code = _TIFF_TYPES.get(field_type)
+            if code is None:
+                continue
+            size = struct.calcsize(code) * value_count
+            if size > 4:
+                position = f.tell()
+                (data_offset,) = struct.unpack(endian + "I", value)
+                f.seek(data_offset)
+                value = f.read(size)
+                f.seek(position)
+            tags[tag] = list(struct.unpack(endian + code * value_count, value[:size]))
+
+    def tag(key: int, default: Optional[int] = None) -> int:
+        values = tags.get(key)
+        if values is None:
+            if default is None:
+                raise ValueError(f"{file_name}: missing TIFF tag {key}")
+            return default
+        return values[0]
+
+    width = tag(_TIFF_IMAGE_WIDTH)
+    height = tag(_TIFF_IMAGE_LENGTH)
+    channels = tag(_TIFF_SAMPLES_PER_PIXEL, 1)
+    if tag(_TIFF_COMPRESSION, 1) != 1:
+        raise ValueError(f"{file_name}: compressed TIFF")
+    if any(bits != 8 for bits in tags.get(_TIFF_BITS_PER_SAMPLE, [1])):
+        raise ValueError(f"{file_name}: only 8 bits per sample can be mapped")
+    if channels > 1 and tag(_TIFF_PLANAR_CONFIGURATION, 1) != 1:
+        raise ValueError(f"{file_name}: planar TIFF")
+    if tag(_TIFF_PHOTOMETRIC) not in (1, 2) or channels not in (1, 2, 3, 4):
+        raise ValueError(f"{file_name}: unsupported photometric interpretation")
+
+    offsets = tags.get(_TIFF_STRIP_OFFSETS, [])
+    counts = tags.get(_TIFF_STRIP_BYTE_COUNTS, [])
+    row_bytes = width * channels
+    rows_per_strip = min(tag(_TIFF_ROWS_PER_STRIP, height), height)
+    expected = (height + rows_per_strip - 1) // rows_per_strip
+    if not offsets or len(offsets) != expected:
+        raise ValueError(f"{file_name}: unexpected strip layout")
+    for index in range(1, len(offsets)):
+        if offsets[index] != offsets[index - 1] + rows_per_strip * row_bytes:
+            raise ValueError(f"{file_name}: strips are not contiguous")
+    if counts and sum(counts) < height * row_bytes:
+        raise ValueError(f"{file_name}: truncated strips")
+
+    return map_raw(file_name, width, height, channels, offset=offsets[0])
+
+def map_image(file_name: str) -> Optional[np.ndarray]:
+    """
+    Read-only memory map of file_name's pixels if its format allows one
+    (.npy, uncompressed TIFF), else None. Nothing is read until the
+    pixels are touched, e.g. by the texture upload.
+    """
+    extension = os.path.splitext(os.fspath(file_name))[1].lower()
+    if extension not in IMAGE_MEMMAP_EXTENSIONS:
+        return None
+    try:
+        if extension == ".npy":
+            return map_npy(file_name)
+        return map_tiff(file_name)
+    except ValueError:
+        return None
+
+def _check_pixels(pixels: np.ndarray, file_name: str) -> None:
+    if pixels.dtype != np.uint8 or pixels.ndim not in (2, 3) or (pixels.ndim == 3 and pixels.shape[2] not in (1, 2, 3, 4)):
+        raise ValueError(f"{file_name}: expected (H, W[, 1-4]) uint8, got {pixels.dtype} {pixels.shape}")
@@ -9,33 +9,49 @@ import numpy as np
 from OpenGL import GL as gl
 from PIL import Image
 
-from matrix import Matrix
-
 from graphics_pipeline import GraphicsPipeline
 from graphics_library import GraphicsLibrary
 
-from primitives import Sprite2DVertex
-from primitives import Shape2DVertex
+from demo_scene import DemoScene
+from image_disk_cache import ImageDiskCache
+from redraw_scheduler import RedrawScheduler
+from texture_cache import TextureCache
+from texture_loader import TextureLoader
 
-from graphics_array_buffer import GraphicsArrayBuffer
-from graphics_texture import GraphicsTexture
-from graphics_sprite import GraphicsSprite
+import tracing
 
 def framebuffer_size_callback(window, width, height):
+    scene = glfw.get_window_user_pointer(window)
+    graphics = scene.graphics
+
     # Update OpenGL viewport
-    gl.glViewport(0, 0, width, height)
+    graphics.viewport_set(0, 0, width, height)
 
     # Update your GraphicsLibrary dimensions
-    graphics = glfw.get_window_user_pointer(window)
     graphics.width = width
     graphics.height = height
 
     print("Resized:", width, height)
+    scene.mark_dirty()
+
+def window_refresh_callback(window):
+    # Window exposed / damaged by the window system
+    scene = glfw.get_window_user_pointer(window)
+    scene.mark_dirty()
+
+def key_callback(window, key, scancode, action, mods):
+    scene = glfw.get_window_user_pointer(window)
+    if action == glfw.PRESS and key == glfw.KEY_SPACE:
+        # Pause / resume the rotation; paused, the window is only redrawn on demand
+        scene.set_animating(not scene.animating)
 
 # ----------------------------------------------------------------------
 # Main: Textured triangle using vanilla OpenGL + your sprite_2d shaders
 # ----------------------------------------------------------------------
 def main():
+    # Set TRACE_FILE=trace.json to record a Chrome/Perfetto trace
+    trace_path = tracing.enable_from_environment()
+
     # --------------------------------------------------------------
     # Initialize GLFW and create a window / context
     # --------------------------------------------------------------
@@ -59,6 +75,8 @@ def main():
     print("VENDOR:", gl.glGetString(gl.GL_VENDOR))
     
     glfw.make_context_current(window)
+    # Framebuffer pixels, not window coordinates (they differ on HiDPI)
+    width, height = glfw.get_framebuffer_size(window)
 
     base_dir = Path(__file__).resolve().parent
     shader_path = base_dir / "shaders"
@@ -66,82 +84,78 @@ def main():
 
     pipeline = GraphicsPipeline(shader_path)
     graphics = GraphicsLibrary(width=width, height=height)
-
-    glfw.set_window_user_pointer(window, graphics)
+    graphics.viewport_set(0, 0, width, height)
+
+    # Frames are only drawn when something asked for one; otherwise the
+    # loop sleeps in wait_events_timeout.
+    scheduler = RedrawScheduler(idle_timeout=1.0, wake=glfw.post_empty_event)
+
+    # Images decode on worker threads and upload a slice per frame
+    texture_loader = TextureLoader(graphics)
+    texture_loader.attach_scheduler(scheduler)
+
+    # Decoded pixels and mip chains persist on disk between runs
+    image_cache = ImageDiskCache(ImageDiskCache.default_directory(), max_bytes=2 * 1024 * 1024 * 1024)
+
+    # Shared textures, released ones kept within a VRAM budget
+    texture_cache = TextureCache(
+        graphics,
+        budget_bytes=512 * 1024 * 1024,
+        loader=texture_loader,
+        disk_cache=image_cache,
+        mipmaps=True,
+    )
+
+    # Same scene render_headless.py draws into an offscreen framebuffer
+    scene = DemoScene()
+    scene.load(pipeline, graphics, image_path, texture_cache)
+    scene.attach_scheduler(scheduler)
+    glfw.swap_interval(1)
+
+    glfw.set_window_user_pointer(window, scene)
     glfw.set_framebuffer_size_callback(window, framebuffer_size_callback)
-    
-    texture = GraphicsTexture(graphics=graphics, file_name=image_path)
-    texture.print()
-
-    sprite = GraphicsSprite()
-    sprite.load(graphics=graphics, texture=texture)
-    sprite.print()
-
-    sprite_prog = pipeline.program_sprite2d
-
-    sprite_vertices = [
-        Sprite2DVertex(x=-140.0, y=-133.0, u=0.0, v=1.0),
-        Sprite2DVertex(x=140.0,  y=-133.0, u=1.0, v=1.0),
-        Sprite2DVertex(x=-140.0,  y=140.0, u=0.0, v=0.0),
-        Sprite2DVertex(x=140.0,  y=140.0, u=1.0, v=0.0),
-    ]
-
-    sprite_vertex_buffer = GraphicsArrayBuffer[Sprite2DVertex]()
-    sprite_vertex_buffer.load(graphics, sprite_vertices)
-
-    sprite_indices = [0, 1, 2, 3]
-    sprite_index_buffer = graphics.buffer_index_generate_from_int_array(sprite_indices)
-    shape_prog = pipeline.program_shape2d
-
-    shape_vertices = [
-        Shape2DVertex(x=-128.0, y=-128.0),
-        Shape2DVertex(x=128.0,  y=-128.0),
-        Shape2DVertex(x=-128.0,  y=128.0),
-        Shape2DVertex(x=128.0,  y=128.0),
-    ]
-
-    shape_vertex_buffer = GraphicsArrayBuffer[Shape2DVertex]()
-    shape_vertex_buffer.load(graphics, shape_vertices)
-
-    shape_indices = [0, 1, 2, 3]
-    shape_index_buffer = graphics.buffer_index_generate_from_int_array(shape_indices)
-
-    roz = float(0.0)
+    glfw.set_window_refresh_callback(window, window_refresh_callback)
+    glfw.set_key_callback(window, key_callback)
 
     while not glfw.window_should_close(window):
+        timeout = scheduler.wait_timeout()
+        if timeout > 0.0:
+            with tracing.span("wait_events"):
+                glfw.wait_events_timeout(timeout)
+            scheduler.note_idle_wakeup()
+            continue
 
-        roz += 0.5
+        with tracing.span("frame"):
 
-        projection = Matrix()
-        projection.ortho_size(width=graphics.width, height=graphics.height)
+            graphics.stats_begin_frame()
 
-        model_view = Matrix()
-        model_view.translate(x=width/2, y=height/2, z=0.0)
-        model_view.rotate_z(roz * 0.04)
-        model_view.scale(2.0)
+            with tracing.span("update"):
+                texture_loader.update()
+                scene.update()
 
-        graphics.clear_rgb(0.22, 0.22, 0.28)
+            with tracing.span("draw"):
+                scene.draw()
 
-        graphics.blend_set_alpha()
+            graphics.stats_end_frame()
 
-        graphics.link_buffer_to_shader_program_array_buffer(sprite_prog, sprite_vertex_buffer)
-        graphics.uniforms_texture_set_sprite(program=sprite_prog, sprite=sprite)
-        graphics.uniforms_modulate_color_set(sprite_prog, r=1.0, g=1.0, b=0.5, a=0.5)
-        graphics.uniforms_matrices_set(shape_prog, projection, model_view)
-        graphics.draw_primitives(index_buffer=sprite_index_buffer, primitive_type=gl.GL_TRIANGLE_STRIP, count=4)
-        graphics.unlink_buffer_from_shader_program(sprite_prog)
+            with tracing.span("swap"):
+                glfw.swap_buffers(window)
+            scheduler.frame_drawn()
 
-        graphics.link_buffer_to_shader_program_array_buffer(shape_prog, shape_vertex_buffer)
-        graphics.uniforms_matrices_set(shape_prog, projection, model_view)
-        graphics.uniforms_modulate_color_set(shape_prog, r=1.0, g=0.25, b=0.5, a=0.5)
-        graphics.draw_primitives(index_buffer=shape_index_buffer, primitive_type=gl.GL_TRIANGLE_STRIP, count=4)
-        graphics.unlink_buffer_from_shader_program(shape_prog)
+            with tracing.span("poll_events"):
+                glfw.poll_events()
 
-        glfw.swap_buffers(window)
-        glfw.poll_events()
+    graphics.stats.print()
+    scheduler.print()
+    if trace_path:
+        tracing.dump(trace_path)
 
     # Cleanup
-    #gl.glDeleteTextures([tex])
+    scene.unload()
+    texture_cache.print()
+    texture_cache.clear()
+    image_cache.print()
+    texture_loader.shutdown()
 
     glfw.terminate()
 
@@ -1,36 +1,41 @@
 # matrix.py
 
 from math import cos, sin, tan, sqrt
+from typing import Optional
+
+import numpy as np
+
 from float_bufferable import FloatBufferable
 
+_IDENTITY = np.array(
+    [
+        1.0, 0.0, 0.0, 0.0,
+        0.0, 1.0, 0.0, 0.0,
+        0.0, 0.0, 1.0, 0.0,
+        0.0, 0.0, 0.0, 1.0,
+    ],
+    dtype=np.float32,
+)
+
 class Matrix(FloatBufferable):
     """
     Column-major 4x4 matrix, same layout and math as regular C++ OpenGL matrix.
 
     Internal storage:
         self.m[0..15]  (column-major, i.e. m[col*4 + row])
-    This can be passed directly to glUniformMatrix4fv with transpose=False.
+    self.m is a contiguous float32 ndarray that is only ever written in place,
+    so it can be passed directly to glUniformMatrix4fv with transpose=False.
     """
 
     def __init__(self) -> None:
-        self.m = [
-            1.0, 0.0, 0.0, 0.0,
-            0.0, 1.0, 0.0, 0.0,
-            0.0, 0.0, 1.0, 0.0,
-            0.0, 0.0, 0.0, 1.0,
-        ]
+        self.m = _IDENTITY.copy()
 
     # ---------------------------------------------------------
     # Basic / FloatBufferable
     # ---------------------------------------------------------
 
     def reset(self) -> None:
-        self.m = [
-            1.0, 0.0, 0.0, 0.0,
-            0.0, 1.0, 0.0, 0.0,
-            0.0, 0.0, 1.0, 0.0,
-            0.0, 0.0, 0.0, 1.0,
-        ]
+        self.m[:] = _IDENTITY
 
     def make(
         self,
@@ -39,38 +44,28 @@ class Matrix(FloatBufferable):
         m20, m21, m22, m23,
         m30, m31, m32, m33,
     ) -> None:
-        self.m[0]  = float(m00)
-        self.m[1]  = float(m01)
-        self.m[2]  = float(m02)
-        self.m[3]  = float(m03)
-
-        self.m[4]  = float(m10)
-        self.m[5]  = float(m11)
-        self.m[6]  = float(m12)
-        self.m[7]  = float(m13)
-
-        self.m[8]  = float(m20)
-        self.m[9]  = float(m21)
-        self.m[10] = float(m22)
-        self.m[11] = float(m23)
-
-        self.m[12] = float(m30)
-        self.m[13] = float(m31)
-        self.m[14] = float(m32)
-        self.m[15] = float(m33)
+        self.m[:] = (
+            m00, m01, m02, m03,
+            m10, m11, m12, m13,
+            m20, m21, m22, m23,
+            m30, m31, m32, m33,
+        )
 
     def make_matrix(self, other: "Matrix") -> None:
-        self.m[:] = other.m[:]
+        self.m[:] = other.m
 
     # FloatBufferable
     def size(self) -> int:
         return 16
 
-    def array(self):
-        return list(self.m)
+    def array(self) -> np.ndarray:
+        """
+        Return a copy of the 16 floats. Use self.m directly for uploads.
+        """
+        return self.m.copy()
 
     def write_to_buffer(self, buffer) -> None:
-        buffer.extend(self.m)
+        buffer.extend(self.m.tolist())
 
     def ortho(self, left: float, right: float,
               bottom: float, top: float,
@@ -104,28 +99,16 @@ class Matrix(FloatBufferable):
 
     def translate(self, x: float, y: float, z: float) -> None:
         m = self.m
-        tx = m[0] * x + m[4] * y + m[8]  * z + m[12]
-        ty = m[1] * x + m[5] * y + m[9]  * z + m[13]
-        tz = m[2] * x + m[6] * y + m[10] * z + m[14]
-        tw = m[15]
-        self.make(
-            m[0], m[1], m[2], m[3],
-            m[4], m[5], m[6], m[7],
-            m[8], m[9], m[10], m[11],
-            tx,   ty,   tz,   tw,
-        )
+        m[12:15] += m[0:3] * x + m[4:7] * y + m[8:11] * z
 
     def scale(self, s: float) -> None:
         self.scale_xyz(s, s, s)
 
     def scale_xyz(self, sx: float, sy: float, sz: float) -> None:
         m = self.m
-        self.make(
-            m[0] * sx, m[1] * sx, m[2] * sx, m[3] * sx,
-            m[4] * sy, m[5] * sy, m[6] * sy, m[7] * sy,
-            m[8] * sz, m[9] * sz, m[10] * sz, m[11] * sz,
-            m[12],    m[13],     m[14],      m[15],
-        )
+        m[0:4] *= sx
+        m[4:8] *= sy
+        m[8:12] *= sz
 
     def rotation_x(self, radians: float) -> None:
         c = cos(radians)
@@ -138,9 +121,12 @@ class Matrix(FloatBufferable):
         )
 
     def rotate_x(self, radians: float) -> None:
-        m = Matrix()
-        m.rotation_x(radians)
-        self.multiply(m)
+        c = cos(radians)
+        s = sin(radians)
+        m = self.m
+        col1 = m[4:8].copy()
+        m[4:8] = col1 * c + m[8:12] * s
+        m[8:12] = m[8:12] * c - col1 * s
 
     def rotation_y(self, radians: float) -> None:
         c = cos(radians)
@@ -153,9 +139,12 @@ class Matrix(FloatBufferable):
         )
 
     def rotate_y(self, radians: float) -> None:
-        m = Matrix()
-        m.rotation_y(radians)
-        self.multiply(m)
+        c = cos(radians)
+        s = sin(radians)
+        m = self.m
+        col0 = m[0:4].copy()
+        m[0:4] = col0 * c - m[8:12] * s
+        m[8:12] = col0 * s + m[8:12] * c
 
     def rotation_z(self, radians: float) -> None:
         c = cos(radians)
@@ -168,46 +157,28 @@ class Matrix(FloatBufferable):
         )
 
     def rotate_z(self, radians: float) -> None:
-        m = Matrix()
-        m.rotation_z(radians)
-        self.multiply(m)
+        c = cos(radians)
+        s = sin(radians)
+        m = self.m
+        col0 = m[0:4].copy()
+        m[0:4] = col0 * c + m[4:8] * s
+        m[4:8] = m[4:8] * c - col0 * s
 
     def multiply(self, right: "Matrix") -> None:
-        a0, a1, a2, a3,  a4, a5, a6, a7,  a8, a9, a10, a11,  a12, a13, a14, a15 = self.m
-        b0, b1, b2, b3,  b4, b5, b6, b7,  b8, b9, b10, b11,  b12, b13, b14, b15 = right.m
-        r0  = a0 * b0  + a4 * b1  + a8 * b2   + a12 * b3
-        r4  = a0 * b4  + a4 * b5  + a8 * b6   + a12 * b7
-        r8  = a0 * b8  + a4 * b9  + a8 * b10  + a12 * b11
-        r12 = a0 * b12 + a4 * b13 + a8 * b14  + a12 * b15
-        r1  = a1 * b0  + a5 * b1  + a9 * b2   + a13 * b3
-        r5  = a1 * b4  + a5 * b5  + a9 * b6   + a13 * b7
-        r9  = a1 * b8  + a5 * b9  + a9 * b10  + a13 * b11
-        r13 = a1 * b12 + a5 * b13 + a9 * b14  + a13 * b15
-        r2  = a2 * b0  + a6 * b1  + a10 * b2  + a14 * b3
-        r6  = a2 * b4  + a6 * b5  + a10 * b6  + a14 * b7
-        r10 = a2 * b8  + a6 * b9  + a10 * b10 + a14 * b11
-        r14 = a2 * b12 + a6 * b13 + a10 * b14 + a14 * b15
-        r3  = a3 * b0  + a7 * b1  + a11 * b2  + a15 * b3
-        r7  = a3 * b4  + a7 * b5  + a11 * b6  + a15 * b7
-        r11 = a3 * b8  + a7 * b9  + a11 * b10 + a15 * b11
-        r15 = a3 * b12 + a7 * b13 + a11 * b14 + a15 * b15
-        self.m = [
-            r0, r1, r2, r3,
-            r4, r5, r6, r7,
-            r8, r9, r10, r11,
-            r12, r13, r14, r15,
-        ]
+        # Viewed as (4, 4) the column-major storage is the transpose,
+        # so (A * B)^T = B^T * A^T. matmul handles the aliased output.
+        a = self.m.reshape(4, 4)
+        b = right.m.reshape(4, 4)
+        np.matmul(b, a, out=a)
 
     def add(self, right: "Matrix") -> None:
-        m = [a + b for a, b in zip(self.m, right.m)]
-        self.m = m
+        np.add(self.m, right.m, out=self.m)
 
     def subtract(self, right: "Matrix") -> None:
-        m = [a - b for a, b in zip(self.m, right.m)]
-        self.m = m
+        np.subtract(self.m, right.m, out=self.m)
 
     def determinant(self) -> float:
-        m = self.m
+        m = self.m.tolist()
         return (
             m[3] * m[6] * m[9] * m[12] - m[2] * m[7] * m[9] * m[12]
             - m[3] * m[5] * m[10] * m[12] + m[1] * m[7] * m[10] * m[12]
@@ -224,7 +195,7 @@ class Matrix(FloatBufferable):
         )
 
     def invert(self) -> None:
-        m = self.m[:]
+        m = self.m.tolist()
         inv = [0.0] * 16
 
         inv[0] = m[6] * m[11] * m[13] - m[7] * m[10] * m[13] + m[7] * m[9] * m[14] - m[5] * m[11] * m[14] - m[6] * m[9] * m[15] + m[5] * m[10] * m[15]
@@ -244,26 +215,316 @@ class Matrix(FloatBufferable):
         inv[14] = m[2] * m[5] * m[12] - m[1] * m[6] * m[12] - m[2] * m[4] * m[13] + m[0] * m[6] * m[13] + m[1] * m[4] * m[14] - m[0] * m[5] * m[14]
         inv[15] = m[1] * m[6] * m[8] - m[2] * m[5] * m[8] + m[2] * m[4] * m[9] - m[0] * m[6] * m[9] - m[1] * m[4] * m[10] + m[0] * m[5] * m[10]
 
-        det = (
-            m[3] * m[6] * m[9] * m[12] - m[2] * m[7] * m[9] * m[12]
-            - m[3] * m[5] * m[10] * m[12] + m[1] * m[7] * m[10] * m[12]
-            + m[2] * m[5] * m[11] * m[12] - m[1] * m[6] * m[11] * m[12]
-            - m[3] * m[6] * m[8] * m[13] + m[2] * m[7] * m[8] * m[13]
-            + m[3] * m[4] * m[10] * m[13] - m[0] * m[7] * m[10] * m[13]
-            - m[2] * m[4] * m[11] * m[13] + m[0] * m[6] * m[11] * m[13]
-            + m[3] * m[5] * m[8] * m[14] - m[1] * m[7] * m[8] * m[14]
-            - m[3] * m[4] * m[9] * m[14] + m[0] * m[7] * m[9] * m[14]
-            + m[1] * m[4] * m[11] * m[14] - m[0] * m[5] * m[11] * m[14]
-            - m[2] * m[5] * m[8] * m[15] + m[1] * m[6] * m[8] * m[15]
-            + m[2] * m[4] * m[9] * m[15] - m[0] * m[6] * m[9] * m[15]
-            - m[1] * m[4] * m[10] * m[15] + m[0] * m[5] * m[10] * m[15]
-        )
+        # Laplace expansion along the first column reuses the cofactors.
+        det = m[0] * inv[0] + m[1] * inv[4] + m[2] * inv[8] + m[3] * inv[12]
 
         if det != 0.0:
             inv_det = 1.0 / det
-            self.m = [v * inv_det for v in inv]
+            self.m[:] = [v * inv_det for v in inv]
         else:
             # Non-invertible; leave as-is or reset
             pass
 
 
+
+
+class Affine2D:
+    """
+    2D affine transform (2x3 matrix), column-major like Matrix.
+
+        | a  c  tx |
+        | b  d  ty |
+
+    x' = a * x + c * y + tx
+    y' = b * x + d * y + ty
+
+    Everything stays in plain Python floats; the 4x4 form is only built
+    by write_to_matrix() at upload time.
+    """
+
+    __slots__ = ("a", "b", "c", "d", "tx", "ty")
+
+    def __init__(
+        self,
+        a: float = 1.0,
+        b: float = 0.0,
+        c: float = 0.0,
+        d: float = 1.0,
+        tx: float = 0.0,
+        ty: float = 0.0,
+    ) -> None:
+        self.a = float(a)
+        self.b = float(b)
+        self.c = float(c)
+        self.d = float(d)
+        self.tx = float(tx)
+        self.ty = float(ty)
+
+    # ---------------------------------------------------------
+    # Basic
+    # ---------------------------------------------------------
+
+    def reset(self) -> None:
+        self.a = 1.0
+        self.b = 0.0
+        self.c = 0.0
+        self.d = 1.0
+        self.tx = 0.0
+        self.ty = 0.0
+
+    def make(self, a: float, b: float, c: float, d: float, tx: float, ty: float) -> None:
+        self.a = float(a)
+        self.b = float(b)
+        self.c = float(c)
+        self.d = float(d)
+        self.tx = float(tx)
+        self.ty = float(ty)
+
+    def make_affine(self, other: "Affine2D") -> None:
+        self.a = other.a
+        self.b = other.b
+        self.c = other.c
+        self.d = other.d
+        self.tx = other.tx
+        self.ty = other.ty
+
+    def copy(self) -> "Affine2D":
+        return Affine2D(self.a, self.b, self.c, self.d, self.tx, self.ty)
+
+    # ---------------------------------------------------------
+    # Transforms (all in place, right-multiplied like Matrix)
+    # ---------------------------------------------------------
+
+    def translation(self, x: float, y: float) -> None:
+        self.reset()
+        self.tx = float(x)
+        self.ty = float(y)
+
+    def translate(self, x: float, y: float) -> None:
+        self.tx += self.a * x + self.c * y
+        self.ty += self.b * x + self.d * y
+
+    def scale(self, s: float) -> None:
+        self.scale_xy(s, s)
+
+    def scale_xy(self, sx: float, sy: float) -> None:
+        self.a *= sx
+        self.b *= sx
+        self.c *= sy
+        self.d *= sy
+
+    def rotation(self, radians: float) -> None:
+        c = cos(radians)
+        s = sin(radians)
+        self.make(c, s, -s, c, 0.0, 0.0)
+
+    def rotate(self, radians: float) -> None:
+        c = cos(radians)
+        s = sin(radians)
+        a = self.a
+        b = self.b
+        self.a = a * c + self.c * s
+        self.b = b * c + self.d * s
+        self.c = self.c * c - a * s
+        self.d = self.d * c - b * s
+
+    def multiply(self, right: "Affine2D") -> None:
+        a, b, c, d = self.a, self.b, self.c, self.d
+        self.a = a * right.a + c * right.b
+        self.b = b * right.a + d * right.b
+        self.c = a * right.c + c * right.d
+        self.d = b * right.c + d * right.d
+        self.tx += a * right.tx + c * right.ty
+        self.ty += b * right.tx + d * right.ty
+
+    def determinant(self) -> float:
+        return self.a * self.d - self.b * self.c
+
+    def invert(self) -> bool:
+        """
+        Closed-form inverse. Returns False (and leaves self as-is)
+        when the transform is not invertible.
+        """
+        det = self.a * self.d - self.b * self.c
+        if det == 0.0:
+            return False
+        inv_det = 1.0 / det
+        a, b, c, d, tx, ty = self.a, self.b, self.c, self.d, self.tx, self.ty
+        self.a = d * inv_det
+        self.b = -b * inv_det
+        self.c = -c * inv_det
+        self.d = a * inv_det
+        self.tx = (c * ty - d * tx) * inv_det
+        self.ty = (b * tx - a * ty) * inv_det
+        return True
+
+    # ---------------------------------------------------------
+    # Points
+    # ---------------------------------------------------------
+
+    def transform_point(self, x: float, y: float) -> tuple[float, float]:
+        return (
+            self.a * x + self.c * y + self.tx,
+            self.b * x + self.d * y + self.ty,
+        )
+
+    def untransform_point(self, x: float, y: float) -> Optional[tuple[float, float]]:
+        """
+        Map a point through the inverse without building it,
+        e.g. screen -> image coordinates on mouse-move.
+        """
+        det = self.a * self.d - self.b * self.c
+        if det == 0.0:
+            return None
+        x -= self.tx
+        y -= self.ty
+        inv_det = 1.0 / det
+        return (
+            (self.d * x - self.c * y) * inv_det,
+            (self.a * y - self.b * x) * inv_det,
+        )
+
+    # ---------------------------------------------------------
+    # Upload
+    # ---------------------------------------------------------
+
+    def write_to_matrix(self, matrix: Matrix) -> None:
+        """
+        Expand into the column-major 4x4 layout of Matrix.
+        """
+        matrix.make(
+            self.a,  self.b,  0.0, 0.0,
+            self.c,  self.d,  0.0, 0.0,
+            0.0,     0.0,     1.0, 0.0,
+            self.tx, self.ty, 0.0, 1.0,
+        )
+
+    def to_matrix(self) -> Matrix:
+        result = Matrix()
+        self.write_to_matrix(result)
+        return result
+
+
+class TransformNode:
+    """
+    One level of a transform hierarchy (e.g. image -> tiles -> labels).
+
+    Holds a local Matrix and a cached world Matrix (parent.world * local).
+    The world matrix is only recomputed when this node or one of its
+    parents changed; every recompute bumps self.version, so consumers
+    can skip work when the version they last saw is still current.
+
+    If you edit self.local in place, call mark_dirty() afterwards.
+    """
+
+    def __init__(self, parent: Optional["TransformNode"] = None) -> None:
+        self.parent: Optional["TransformNode"] = parent
+        self.local: Matrix = Matrix()
+        self.version: int = 0
+        self._world: Matrix = Matrix()
+        self._dirty: bool = True
+        self._parent_version: int = -1
+        # (width, height) local was last built from by set_ortho_size()
+        self._ortho_size: Optional[tuple[float, float]] = None
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+        self._ortho_size = None
+
+    def set_matrix(self, matrix: Matrix) -> None:
+        """
+        Copy matrix into local, marking dirty only if the values differ.
+        """
+        if not (self.local.m == matrix.m).all():
+            self.local.m[:] = matrix.m
+            self._dirty = True
+            self._ortho_size = None
+
+    def set_identity(self) -> None:
+        if not (self.local.m == _IDENTITY).all():
+            self.local.reset()
+            self._dirty = True
+            self._ortho_size = None
+
+    def set_ortho_size(self, width: float, height: float) -> None:
+        """
+        Convenience for projection nodes; no-op while the size is unchanged.
+        """
+        size = (float(width), float(height))
+        if self._ortho_size == size:
+            return
+        self.local.ortho_size(width=width, height=height)
+        self._dirty = True
+        self._ortho_size = size
+
+    @property
+    def world(self) -> Matrix:
+        parent = self.parent
+        if parent is not None:
+            parent_world = parent.world
+            if parent.version != self._parent_version:
+                self._dirty = True
+
+        if self._dirty:
+            if parent is None:
+                self._world.make_matrix(self.local)
+            else:
+                self._world.make_matrix(parent_world)
+                self._world.multiply(self.local)
+                self._parent_version = parent.version
+            self._dirty = False
+            self.version += 1
+
+        return self._world
+
+
+class MatrixStack:
+    """
+    push/pop stack of TransformNodes.
+
+    Nodes are kept after pop() so the next frame's push() at the same
+    depth reuses them; a level whose matrix did not change keeps its
+    cached world matrix and version.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: list[TransformNode] = [TransformNode()]
+        self._depth: int = 0
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    @property
+    def top(self) -> TransformNode:
+        return self._nodes[self._depth]
+
+    @property
+    def matrix(self) -> Matrix:
+        """
+        Composed matrix of every level up to the top.
+        """
+        return self._nodes[self._depth].world
+
+    def load(self, matrix: Matrix) -> None:
+        """
+        Replace the local matrix of the top level.
+        """
+        self._nodes[self._depth].set_matrix(matrix)
+
+    def push(self, matrix: Optional[Matrix] = None) -> TransformNode:
+        self._depth += 1
+        if self._depth == len(self._nodes):
+            self._nodes.append(TransformNode(parent=self._nodes[self._depth - 1]))
+        node = self._nodes[self._depth]
+        if matrix is None:
+            node.set_identity()
+        else:
+            node.set_matrix(matrix)
+        return node
+
+    def pop(self) -> None:
+        if self._depth == 0:
+            print("[MatrixStack] WARNING: pop() on empty stack.")
+            return
+        self._depth -= 1
@@ -0,0 +1,182 @@
+# matrix_batch.py
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+
+from matrix import Matrix, _IDENTITY
+
+ScalarOrArray = Union[float, np.ndarray]
+
+class MatrixBatch:
+    """
+    N column-major 4x4 matrices held in one float32 array.
+
+    Internal storage:
+        self.m[i]  (shape (4, 4), i.e. m[i, col, row])
+    self.m[i].ravel() has exactly the layout of Matrix.m, so the whole batch
+    can be uploaded with glUniformMatrix4fv(location, N, False, self.m).
+
+    Every per-instance argument accepts either a scalar (applied to all
+    instances) or an array of shape (N,).
+    """
+
+    def __init__(self, count: int = 0) -> None:
+        self.m: np.ndarray = np.tile(_IDENTITY.reshape(4, 4), (int(count), 1, 1))
+
+    @property
+    def count(self) -> int:
+        return int(self.m.shape[0])
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ---------------------------------------------------------
+    # Basic
+    # ---------------------------------------------------------
+
+    def reset(self) -> None:
+        self.m[:] = _IDENTITY.reshape(4, 4)
+
+    def resize(self, count: int) -> None:
+        """
+        Change the number of instances. Existing matrices are kept,
+        new ones start as identity.
+        """
+        count = int(count)
+        old = self.m
+        self.m = np.tile(_IDENTITY.reshape(4, 4), (count, 1, 1))
+        keep = min(count, old.shape[0])
+        self.m[:keep] = old[:keep]
+
+    def set_matrix(self, index: int, matrix: Matrix) -> None:
+        self.m[index] = matrix.m.reshape(4, 4)
+
+    def get_matrix(self, index: int) -> Matrix:
+        result = Matrix()
+        result.m[:] = self.m[index].ravel()
+        return result
+
+    def set_all(self, matrix: Matrix) -> None:
+        self.m[:] = matrix.m.reshape(4, 4)
+
+    # ---------------------------------------------------------
+    # Vectorized transforms (all in place)
+    # ---------------------------------------------------------
+
+    def translation(self, x: ScalarOrArray, y: ScalarOrArray, z: ScalarOrArray = 0.0) -> None:
+        self.reset()
+        self.m[:, 3, 0] = x
+        self.m[:, 3, 1] = y
+        self.m[:, 3, 2] = z
+
+    def translate(self, x: ScalarOrArray, y: ScalarOrArray, z: ScalarOrArray = 0.0) -> None:
+        m = self.m
+        x = self._column(x)
+        y = self._column(y)
+        z = self._column(z)
+        m[:, 3, 0:3] += m[:, 0, 0:3] * x + m[:, 1, 0:3] * y + m[:, 2, 0:3] * z
+
+    def scale(self, s: ScalarOrArray) -> None:
+        self.scale_xyz(s, s, s)
+
+    def scale_xyz(self, sx: ScalarOrArray, sy: ScalarOrArray, sz: ScalarOrArray = 1.0) -> None:
+        m = self.m
+        m[:, 0, :] *= self._column(sx)
+        m[:, 1, :] *= self._column(sy)
+        m[:, 2, :] *= self._column(sz)
+
+    def rotate_z(self, radians: ScalarOrArray) -> None:
+        radians = self._column(radians)
+        c = np.cos(radians)
+        s = np.sin(radians)
+        m = self.m
+        col0 = m[:, 0, :].copy()
+        m[:, 0, :] = col0 * c + m[:, 1, :] * s
+        m[:, 1, :] = m[:, 1, :] * c - col0 * s
+
+    def multiply(self, right: Union["MatrixBatch", Matrix]) -> None:
+        """
+        self[i] = self[i] * right[i] (or * right, for a single Matrix).
+        """
+        if isinstance(right, Matrix):
+            b = right.m.reshape(4, 4)
+        else:
+            b = right.m
+        # Stored layout is the transpose, so (A * B)^T = B^T * A^T.
+        np.matmul(b, self.m, out=self.m)
+
+    def multiply_left(self, left: Union["MatrixBatch", Matrix]) -> None:
+        """
+        self[i] = left[i] * self[i] (or left * self[i], for a single Matrix).
+        """
+        if isinstance(left, Matrix):
+            a = left.m.reshape(4, 4)
+        else:
+            a = left.m
+        np.matmul(self.m, a, out=self.m)
+
+    def invert(self) -> None:
+        """
+        Invert every matrix. Singular matrices are left as-is,
+        same as Matrix.invert().
+        """
+        # inverse(A^T) == inverse(A)^T, so the stored layout inverts directly.
+        m64 = self.m.astype(np.float64)
+        det = np.linalg.det(m64)
+        ok = det != 0.0
+        if np.any(ok):
+            self.m[ok] = np.linalg.inv(m64[ok])
+
+    # ---------------------------------------------------------
+    # Points
+    # ---------------------------------------------------------
+
+    def transform_points(self, points: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Transform 2D points (z = 0, w = 1) by their instance's matrix.
+
+        points: (N, 2) for one point per instance,
+                or (N, K, 2) for K points per instance.
+        Returns an array of the same shape.
+        """
+        pts = np.asarray(points, dtype=np.float32)
+        m = self.m
+        if pts.ndim == 2:
+            x = pts[:, 0:1]
+            y = pts[:, 1:2]
+            cx = m[:, 0, 0:2]
+            cy = m[:, 1, 0:2]
+            ct = m[:, 3, 0:2]
+        elif pts.ndim == 3:
+            x = pts[:, :, 0:1]
+            y = pts[:, :, 1:2]
+            cx = m[:, None, 0, 0:2]
+            cy = m[:, None, 1, 0:2]
+            ct = m[:, None, 3, 0:2]
+        else:
+            raise ValueError("transform_points expects shape (N, 2) or (N, K, 2)")
+
+        if pts.shape[0] != m.shape[0] or pts.shape[-1] != 2:
+            raise ValueError("transform_points expects one row of points per matrix")
+
+        if out is None:
+            out = np.empty_like(pts)
+        np.multiply(x, cx, out=out)
+        out += y * cy
+        out += ct
+        return out
+
+    # ---------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------
+
+    def _column(self, value: ScalarOrArray):
+        if np.ndim(value) == 0:
+            return float(value)
+        arr = np.asarray(value, dtype=np.float32)
+        if arr.shape != (self.m.shape[0],):
+            raise ValueError("MatrixBatch expects a scalar or an array of shape (N,)")
+        return arr[:, None]
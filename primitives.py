@@ -2,6 +2,9 @@
 
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+
+import numpy as np
+
 from float_bufferable import FloatBufferable
 
 class ColorConforming(ABC):
@@ -144,3 +147,37 @@ class Sprite2DColoredVertex(
 
     def size(self):
         return 8
+
+
+# ----------------------------------------------------------------------
+# Structured dtypes, same float layout as the dataclasses above
+# ----------------------------------------------------------------------
+
+SHAPE_2D_VERTEX_DTYPE = np.dtype([
+    ("position", np.float32, (2,)),
+])
+
+SHAPE_2D_COLORED_VERTEX_DTYPE = np.dtype([
+    ("position", np.float32, (2,)),
+    ("color", np.float32, (4,)),
+])
+
+SPRITE_2D_VERTEX_DTYPE = np.dtype([
+    ("position", np.float32, (2,)),
+    ("uv", np.float32, (2,)),
+])
+
+SPRITE_2D_COLORED_VERTEX_DTYPE = np.dtype([
+    ("position", np.float32, (2,)),
+    ("uv", np.float32, (2,)),
+    ("color", np.float32, (4,)),
+])
+
+# Per-instance data for the *_2d_instanced shaders
+INSTANCE_2D_DTYPE = np.dtype([
+    ("offset", np.float32, (2,)),
+    ("scale", np.float32, (2,)),
+    ("rotation", np.float32),
+    ("color", np.float32, (4,)),
+    ("uv_rect", np.float32, (4,)),
+])
@@ -0,0 +1,93 @@
+# redraw_scheduler.py
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+class RedrawScheduler:
+    """
+    Decides when the main loop draws a frame instead of redrawing
+    unconditionally.
+
+    - request_redraw(): something changed, draw one more frame
+      (scene objects, input callbacks, other threads).
+    - animation_start(key) / animation_stop(key): draw every frame while
+      any animation is running.
+    - request_redraw_after(seconds): draw once a deadline passes.
+
+    Between frames the loop sleeps for wait_timeout() seconds, e.g. in
+    glfw.wait_events_timeout(), so an idle window costs next to no CPU.
+    wake (e.g. glfw.post_empty_event) is called when a redraw is requested
+    from another thread, to end that wait early.
+    """
+
+    def __init__(self, idle_timeout: float = 1.0, wake: Optional[Callable[[], None]] = None) -> None:
+        self.idle_timeout = float(idle_timeout)
+        self.wake = wake
+
+        self.dirty: bool = True  # first frame
+        self.animations: set[Hashable] = set()
+        self.deadline: Optional[float] = None
+        self._main_thread = threading.get_ident()
+
+        self.frames_drawn: int = 0
+        self.idle_wakeups: int = 0
+
+    @property
+    def animating(self) -> bool:
+        return bool(self.animations)
+
+    def request_redraw(self) -> None:
+        self.dirty = True
+        if self.wake is not None and threading.get_ident() != self._main_thread:
+            self.wake()
+
+    def request_redraw_after(self, seconds: float) -> None:
+        deadline = time.perf_counter() + max(0.0, float(seconds))
+        if self.deadline is None or deadline < self.deadline:
+            self.deadline = deadline
+
+    def animation_start(self, key: Hashable) -> None:
+        self.animations.add(key)
+        self.request_redraw()
+
+    def animation_stop(self, key: Hashable) -> None:
+        if key in self.animations:
+            self.animations.discard(key)
+            # One last frame so the final state is on screen
+            self.request_redraw()
+
+    def should_draw(self) -> bool:
+        if self.dirty or self.animations:
+            return True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return True
+        return False
+
+    def frame_drawn(self) -> None:
+        self.dirty = False
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.deadline = None
+        self.frames_drawn += 1
+
+    def wait_timeout(self) -> float:
+        """
+        Seconds the loop may block waiting for events; 0 = poll and draw.
+        """
+        if self.should_draw():
+            return 0.0
+        timeout = self.idle_timeout
+        if self.deadline is not None:
+            timeout = min(timeout, max(0.0, self.deadline - time.perf_counter()))
+        return timeout
+
+    def note_idle_wakeup(self) -> None:
+        if not self.should_draw():
+            self.idle_wakeups += 1
+
+    def print(self) -> None:
+        print("RedrawScheduler -> [" + str(self.frames_drawn) + " frames]")
+        print("\tIdle wakeups: " + str(self.idle_wakeups))
+        print("\tAnimations: " + str(len(self.animations)))
@@ -0,0 +1,90 @@
+# render_headless.py
+#
+# Render the demo scene into an offscreen framebuffer without a window:
+#
+#     python render_headless.py out.png [width height frames]
+#
+# With a {frame} field in the file name every frame is exported, e.g.
+# frames/out_{frame:04d}.png; the readback runs asynchronously, a couple
+# of frames behind rendering.
+#
+# PYOPENGL_PLATFORM=osmesa selects OSMesa instead of EGL.
+import sys
+from pathlib import Path
+
+import headless_context
+headless_context.headless_platform_select()
+
+import numpy as np
+from OpenGL import GL as gl
+from PIL import Image
+
+from demo_scene import DemoScene
+from graphics_framebuffer import GraphicsFramebuffer
+from graphics_library import GraphicsLibrary
+from graphics_pipeline import GraphicsPipeline
+from headless_context import HeadlessContext
+
+import tracing
+
+def main():
+    trace_path = tracing.enable_from_environment()
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "frame.png"
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 1280
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 960
+    frames = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+
+    with HeadlessContext() as context:
+        context.print()
+
+        base_dir = Path(__file__).resolve().parent
+        shader_path = base_dir / "shaders"
+        image_path = base_dir / "images/image.png"
+
+        pipeline = GraphicsPipeline(shader_path)
+        graphics = GraphicsLibrary(width=width, height=height)
+
+        framebuffer = GraphicsFramebuffer()
+        framebuffer.load(graphics, width, height)
+        framebuffer.print()
+
+        scene = DemoScene()
+        scene.load(pipeline, graphics, image_path)
+
+        export_frames = "{frame" in output_path
+
+        def export(frame: int, pixels: np.ndarray) -> None:
+            with tracing.span("export"):
+                Image.fromarray(pixels, "RGBA").save(output_path.format(frame=frame))
+
+        for frame in range(frames):
+            with tracing.span("frame"):
+                graphics.stats_begin_frame()
+                framebuffer.begin()
+                scene.update()
+                scene.draw()
+                framebuffer.end()
+                if export_frames:
+                    framebuffer.read_pixels_async(tag=frame)
+                    graphics.framebuffer_read_pixels_collect(export)
+                graphics.stats_end_frame()
+
+        if export_frames:
+            graphics.framebuffer_read_pixels_collect(export, wait=True)
+            graphics.readback.print()
+        else:
+            gl.glFinish()
+            framebuffer.save(output_path)
+        print("Wrote", output_path)
+
+        graphics.stats.print()
+        if trace_path:
+            tracing.dump(trace_path)
+
+        scene.unload()
+        framebuffer.unload()
+        graphics.readback.unload()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# render_layers.py
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+import numpy as np
+from OpenGL import GL as gl
+
+from graphics_array_buffer import GraphicsArrayBuffer
+from graphics_framebuffer import GraphicsFramebuffer
+from graphics_index_buffer import GraphicsIndexBuffer
+from graphics_library import GraphicsLibrary
+from matrix import TransformNode
+from redraw_scheduler import RedrawScheduler
+from shader_program import ShaderProgram
+from vertex_array import Sprite2DVertexArray
+
+import tracing
+
+class RenderLayer:
+    """
+    One cached layer (base image, committed labels, live edits, UI...).
+
+    draw(layer) renders the layer's content into its framebuffer; it is
+    only called again after mark_dirty(). Content is drawn in layer space
+    (0..width, 0..height, y down) using layer.projection_node.
+
+    Layers are stored premultiplied (see GraphicsLibrary.blend_set_alpha)
+    and cleared to transparent before each draw.
+
+    screen_space layers (UI chrome) follow the window size and ignore the
+    stack's view transform; the others follow the content size and are
+    panned / zoomed by it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        draw: Callable[["RenderLayer"], None],
+        screen_space: bool = False,
+    ) -> None:
+        self.name = name
+        self.draw = draw
+        self.screen_space = screen_space
+
+        self.visible: bool = True
+        self.opacity: float = 1.0
+        self.dirty: bool = True
+
+        self.graphics: Optional[GraphicsLibrary] = None
+        self.framebuffer = GraphicsFramebuffer()
+        self.projection_node = TransformNode()
+        self.quad_buffer = GraphicsArrayBuffer()
+        self.stack: Optional["RenderLayerStack"] = None
+
+        self.width: int = 0
+        self.height: int = 0
+        self.render_count: int = 0
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+        if self.stack is not None:
+            self.stack.request_redraw()
+
+    def set_visible(self, visible: bool) -> None:
+        if self.visible != visible:
+            self.visible = visible
+            if self.stack is not None:
+                self.stack.request_redraw()
+
+    def set_opacity(self, opacity: float) -> None:
+        opacity = float(opacity)
+        if self.opacity != opacity:
+            self.opacity = opacity
+            if self.stack is not None:
+                self.stack.request_redraw()
+
+    def resize(self, width: int, height: int) -> None:
+        width = max(1, int(width))
+        height = max(1, int(height))
+        if (width, height) == (self.width, self.height):
+            return
+        graphics = self.graphics
+        self.width = width
+        self.height = height
+        self.framebuffer.load(graphics, width, height)
+        self.projection_node.set_ortho_size(width=width, height=height)
+
+        # Framebuffer rows are bottom-up, layer space is y down
+        quad = Sprite2DVertexArray.from_floats(np.array([
+            0.0, 0.0, 0.0, 1.0,
+            float(width), 0.0, 1.0, 1.0,
+            0.0, float(height), 0.0, 0.0,
+            float(width), float(height), 1.0, 0.0,
+        ], dtype=np.float32))
+        if self.quad_buffer.buffer_index == -1:
+            self.quad_buffer.load(graphics, quad)
+        else:
+            self.quad_buffer.write(quad)
+        self.dirty = True
+
+    def render(self) -> None:
+        framebuffer = self.framebuffer
+        graphics = self.graphics
+        with tracing.span(f"layer {self.name}"):
+            framebuffer.begin()
+            graphics.clear_rgba(0.0, 0.0, 0.0, 0.0)
+            self.draw(self)
+            framebuffer.end()
+        self.dirty = False
+        self.render_count += 1
+
+    def unload(self) -> None:
+        if self.graphics is not None and self.quad_buffer.buffer_index != -1:
+            self.graphics.buffer_array_delete(self.quad_buffer.buffer_index)
+            self.quad_buffer.buffer_index = -1
+        self.framebuffer.unload()
+        self.width = 0
+        self.height = 0
+        self.dirty = True
+
+
+class RenderLayerStack:
+    """
+    Ordered layers, each cached in its own framebuffer texture.
+
+        stack.load(graphics, pipeline.program_sprite2d)
+        stack.add(RenderLayer("base", draw_base))
+        ...
+        stack.update()                       # re-render dirty layers only
+        stack.composite(projection_node)     # one quad per visible layer
+
+    view_node (pan / zoom) only changes how content layers are placed
+    when compositing, so moving the view never re-renders a layer.
+    """
+
+    def __init__(self) -> None:
+        self.graphics: Optional[GraphicsLibrary] = None
+        self.program: Optional[ShaderProgram] = None
+        self.scheduler: Optional[RedrawScheduler] = None
+
+        self.layers: list[RenderLayer] = []
+        self.content_width: int = 0
+        self.content_height: int = 0
+        self.view_node = TransformNode()
+        self.screen_node = TransformNode()
+        self.index_buffer = GraphicsIndexBuffer()
+
+        # Layers re-rendered by the last update()
+        self.rendered_count: int = 0
+
+    def load(self, graphics: GraphicsLibrary, program: Optional[ShaderProgram]) -> None:
+        self.graphics = graphics
+        self.program = program
+        self.index_buffer.load(graphics, [0, 1, 2, 3])
+
+    def unload(self) -> None:
+        for layer in self.layers:
+            layer.unload()
+        self.index_buffer.unload()
+
+    def attach_scheduler(self, scheduler: RedrawScheduler) -> None:
+        self.scheduler = scheduler
+
+    def request_redraw(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.request_redraw()
+
+    def add(self, layer: RenderLayer) -> RenderLayer:
+        layer.graphics = self.graphics
+        layer.stack = self
+        self.layers.append(layer)
+        if not layer.screen_space and self.content_width > 0:
+            layer.resize(self.content_width, self.content_height)
+        layer.mark_dirty()
+        return layer
+
+    def remove(self, layer: RenderLayer) -> None:
+        if layer in self.layers:
+            self.layers.remove(layer)
+            layer.unload()
+            layer.stack = None
+            self.request_redraw()
+
+    def layer(self, name: str) -> Optional[RenderLayer]:
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        return None
+
+    def mark_dirty(self) -> None:
+        for layer in self.layers:
+            layer.mark_dirty()
+
+    def set_content_size(self, width: int, height: int) -> None:
+        """
+        Size of content-space layers; no-op while unchanged.
+        """
+        width = int(width)
+        height = int(height)
+        if (width, height) == (self.content_width, self.content_height):
+            return
+        self.content_width = width
+        self.content_height = height
+        for layer in self.layers:
+            if not layer.screen_space:
+                layer.resize(width, height)
+        self.request_redraw()
+
+    def update(self) -> None:
+        """
+        Re-render dirty visible layers. Screen-space layers are resized to
+        the current GraphicsLibrary size first.
+        """
+        graphics = self.graphics
+        self.rendered_count = 0
+        for layer in self.layers:
+            if layer.screen_space:
+                layer.resize(graphics.width, graphics.height)
+            elif layer.width == 0:
+                continue
+            if layer.visible and layer.dirty:
+                layer.render()
+                self.rendered_count += 1
+
+    def composite(self, projection_node: TransformNode) -> None:
+        graphics = self.graphics
+        program = self.program
+        if graphics is None or program is None:
+            return
+
+        with tracing.span("RenderLayerStack.composite"):
+            graphics.blend_set_premultiplied()
+            for layer in self.layers:
+                if not layer.visible or layer.width == 0 or layer.opacity <= 0.0:
+                    continue
+                model_view_node = self.screen_node if layer.screen_space else self.view_node
+                opacity = layer.opacity
+
+                graphics.link_buffer_to_shader_program_array_buffer(program, layer.quad_buffer)
+                graphics.uniforms_texture_set_index(program, layer.framebuffer.texture_index)
+                graphics.uniforms_modulate_color_set(program, r=opacity, g=opacity, b=opacity, a=opacity)
+                graphics.uniforms_matrices_set_nodes(program, projection_node, model_view_node)
+                graphics.draw_primitives(
+                    index_buffer=self.index_buffer,
+                    primitive_type=gl.GL_TRIANGLE_STRIP,
+                    count=4,
+                )
+                graphics.unlink_buffer_from_shader_program(program)
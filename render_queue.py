@@ -0,0 +1,228 @@
+# render_queue.py
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+from OpenGL import GL as gl
+
+from graphics_library import GraphicsLibrary, BLEND_MODE_ALPHA
+from graphics_index_buffer import GraphicsIndexBuffer
+from matrix import Matrix
+from shader_program import ShaderProgram
+
+class RenderCommand:
+    """
+    One recorded draw. Matrices are copied at submit time, so the caller
+    is free to keep mutating its own Matrix objects. Every command carries
+    both matrices; nothing is inherited from the command drawn before it,
+    which after sorting could be any other submit.
+    """
+
+    __slots__ = (
+        "key",
+        "program",
+        "texture_index",
+        "blend_mode",
+        "buffer_index",
+        "offset",
+        "index_buffer",
+        "primitive_type",
+        "first",
+        "count",
+        "color",
+        "projection",
+        "model_view",
+    )
+
+    def __init__(self) -> None:
+        self.key: int = 0
+        self.program: Optional[ShaderProgram] = None
+        self.texture_index: int = -1
+        self.blend_mode: int = BLEND_MODE_ALPHA
+        self.buffer_index: int = -1
+        self.offset: int = 0
+        self.index_buffer: Union[np.ndarray, GraphicsIndexBuffer, None] = None
+        self.primitive_type: int = gl.GL_TRIANGLES
+        self.first: int = 0
+        self.count: int = 0
+        self.color: tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0)
+        self.projection: Optional[Matrix] = None
+        self.model_view: Optional[Matrix] = None
+
+
+class RenderQueue:
+    """
+    Deferred draws, executed sorted by a packed state key at flush().
+
+    Key layout (most significant first):
+        layer     16 bits   explicit draw order, always respected;
+                            -32768..32767, stored biased by 0x8000
+        program    8 bits   dense per-frame slot (at most 256 programs)
+        texture   16 bits   dense per-frame slot (at most 65536 textures)
+        blend      8 bits
+    Values outside those ranges raise ValueError instead of aliasing.
+    The sort is stable, so commands with equal keys keep submission order.
+
+    After sorting, neighbouring GL_TRIANGLES / GL_LINES / GL_POINTS
+    commands with identical state and contiguous index ranges of the
+    same buffers are merged into one draw.
+    """
+
+    MERGEABLE_PRIMITIVES = (gl.GL_TRIANGLES, gl.GL_LINES, gl.GL_POINTS)
+
+    LAYER_MIN = -0x8000
+    LAYER_MAX = 0x7FFF
+    PROGRAM_SLOTS = 0x100
+    TEXTURE_SLOTS = 0x10000
+
+    def __init__(self, graphics: GraphicsLibrary) -> None:
+        self.graphics = graphics
+        self.commands: list[RenderCommand] = []
+        self._program_slots: dict[int, int] = {}
+        self._texture_slots: dict[int, int] = {}
+
+        # Stats from the last flush()
+        self.submitted_count: int = 0
+        self.executed_count: int = 0
+
+    def submit(
+        self,
+        program: Optional[ShaderProgram],
+        buffer_index: int,
+        index_buffer: Union[np.ndarray, GraphicsIndexBuffer],
+        primitive_type: int,
+        count: int,
+        projection_matrix: Matrix,
+        model_view_matrix: Matrix,
+        texture_index: int = -1,
+        color: tuple[float, float, float, float] = (1.0, 1.0, 1.0, 1.0),
+        blend_mode: int = BLEND_MODE_ALPHA,
+        layer: int = 0,
+        first: int = 0,
+        offset: int = 0,
+    ) -> None:
+        if program is None or program.program == 0 or buffer_index == -1 or count <= 0:
+            return
+        layer = int(layer)
+        if not self.LAYER_MIN <= layer <= self.LAYER_MAX:
+            raise ValueError(f"RenderQueue layer {layer} outside {self.LAYER_MIN}..{self.LAYER_MAX}")
+        if projection_matrix is None or model_view_matrix is None:
+            raise ValueError("RenderQueue.submit needs both a projection and a model-view matrix")
+
+        command = RenderCommand()
+        command.program = program
+        command.texture_index = int(texture_index)
+        command.blend_mode = int(blend_mode)
+        command.buffer_index = int(buffer_index)
+        command.offset = int(offset)
+        command.index_buffer = index_buffer
+        command.primitive_type = int(primitive_type)
+        command.first = int(first)
+        command.count = int(count)
+        command.color = color
+        command.projection = Matrix()
+        command.projection.make_matrix(projection_matrix)
+        command.model_view = Matrix()
+        command.model_view.make_matrix(model_view_matrix)
+
+        program_slot = self._slot(self._program_slots, program.program, self.PROGRAM_SLOTS, "programs")
+        texture_slot = self._slot(self._texture_slots, command.texture_index, self.TEXTURE_SLOTS, "textures")
+        command.key = (
+            ((layer + 0x8000) << 32)
+            | (program_slot << 24)
+            | (texture_slot << 8)
+            | (command.blend_mode & 0xFF)
+        )
+        self.commands.append(command)
+
+    def clear(self) -> None:
+        self.commands = []
+        self._program_slots = {}
+        self._texture_slots = {}
+
+    def flush(self) -> None:
+        """
+        Sort, merge and execute every command, then clear the queue.
+        """
+        commands = self.commands
+        self.submitted_count = len(commands)
+        commands.sort(key=lambda command: command.key)
+        merged = self._merge(commands)
+        self.executed_count = len(merged)
+        self._execute(merged)
+        self.clear()
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    @staticmethod
+    def _slot(slots: dict[int, int], value: int, limit: int, name: str) -> int:
+        slot = slots.get(value)
+        if slot is None:
+            slot = len(slots)
+            if slot >= limit:
+                raise ValueError(f"RenderQueue holds more than {limit} {name} in one frame; flush() sooner")
+            slots[value] = slot
+        return slot
+
+    def _merge(self, commands: list[RenderCommand]) -> list[RenderCommand]:
+        merged: list[RenderCommand] = []
+        for command in commands:
+            if merged and self._can_merge(merged[-1], command):
+                merged[-1].count += command.count
+            else:
+                merged.append(command)
+        return merged
+
+    def _can_merge(self, a: RenderCommand, b: RenderCommand) -> bool:
+        return (
+            a.key == b.key
+            and a.primitive_type == b.primitive_type
+            and a.primitive_type in self.MERGEABLE_PRIMITIVES
+            and a.buffer_index == b.buffer_index
+            and a.offset == b.offset
+            and a.index_buffer is b.index_buffer
+            and a.first + a.count == b.first
+            and a.color == b.color
+            and self._same_matrix(a.projection, b.projection)
+            and self._same_matrix(a.model_view, b.model_view)
+        )
+
+    @staticmethod
+    def _same_matrix(a: Optional[Matrix], b: Optional[Matrix]) -> bool:
+        if a is None or b is None:
+            return a is b
+        return a.m.tobytes() == b.m.tobytes()
+
+    def _execute(self, commands: list[RenderCommand]) -> None:
+        graphics = self.graphics
+        linked: Optional[tuple[int, int, int]] = None
+        linked_program: Optional[ShaderProgram] = None
+
+        for command in commands:
+            program = command.program
+            link = (program.program, command.buffer_index, command.offset)
+            if link != linked:
+                if linked_program is not None:
+                    graphics.unlink_buffer_from_shader_program(linked_program)
+                graphics.link_buffer_to_shader_program(program, command.buffer_index, command.offset)
+                linked = link
+                linked_program = program
+
+            graphics.blend_set_mode(command.blend_mode)
+            if command.texture_index != -1:
+                graphics.uniforms_texture_set_index(program, command.texture_index)
+            graphics.uniforms_modulate_color_set(program, *command.color)
+            graphics.uniforms_matrices_set(program, command.projection, command.model_view)
+            graphics.draw_primitives(
+                command.index_buffer,
+                command.primitive_type,
+                command.count,
+                command.first,
+            )
+
+        if linked_program is not None:
+            graphics.unlink_buffer_from_shader_program(linked_program)
@@ -22,6 +22,7 @@ class ShaderProgram:
         # Attribute locations
         self.attribute_location_position = -1
         self.attribute_location_texture_coordinates = -1
+        self.attribute_location_color = -1
 
         # Uniform locations
         self.uniform_location_texture = -1
@@ -30,6 +31,15 @@ class ShaderProgram:
         self.uniform_location_model_view_matrix = -1
         self.uniform_location_texture_size = -1
 
+        # Last value uploaded per uniform location (see GraphicsLibrary)
+        self.uniform_cache: dict[int, object] = {}
+
+        # Last TransformNode (and its version) uploaded to each matrix uniform
+        self.uploaded_projection_node = None
+        self.uploaded_projection_version = -1
+        self.uploaded_model_view_node = None
+        self.uploaded_model_view_version = -1
+
         # Attribute layout info (you can fill these in per subclass)
         self.attribute_stride_position = -1
         self.attribute_size_position = -1
@@ -39,6 +49,15 @@ class ShaderProgram:
         self.attribute_size_texture_coordinates = -1
         self.attribute_offset_texture_coordinates = -1
 
+        self.attribute_stride_color = -1
+        self.attribute_size_color = -1
+        self.attribute_offset_color = -1
+
+        # Per-instance attributes: (location, size, offset), all sharing
+        # instance_stride. Filled in by the *_instanced subclasses.
+        self.instance_attributes: list[tuple[int, int, int]] = []
+        self.instance_stride = 0
+
         # Create and link program
         if (vertex_shader > 0) and (fragment_shader > 0):
             self.program = self._load_program(vertex_shader, fragment_shader)
@@ -62,6 +81,14 @@ class ShaderProgram:
             )
             self.program = 0
 
+    def uniform_cache_invalidate(self) -> None:
+        """
+        Forget uploaded uniform values, e.g. after relinking the program.
+        """
+        self.uniform_cache = {}
+        self.uploaded_projection_node = None
+        self.uploaded_model_view_node = None
+
     def _load_program(self, vertex_shader: int, fragment_shader: int) -> int:
         program = glCreateProgram()
         glAttachShader(program, vertex_shader)
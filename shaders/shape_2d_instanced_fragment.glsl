@@ -0,0 +1,6 @@
+// shape_2d_instanced_fragment.glsl
+uniform vec4 ModulateColor;
+varying vec4 ColorsOut;
+void main(void) {
+    gl_FragColor = ModulateColor * ColorsOut;
+}
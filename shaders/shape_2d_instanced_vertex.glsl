@@ -0,0 +1,17 @@
+// shape_2d_instanced_vertex.glsl
+attribute vec2 Positions;
+attribute vec2 InstanceOffset;
+attribute vec2 InstanceScale;
+attribute float InstanceRotation;
+attribute vec4 InstanceColor;
+uniform mat4 ProjectionMatrix;
+uniform mat4 ModelViewMatrix;
+varying vec4 ColorsOut;
+void main(void) {
+    float c = cos(InstanceRotation);
+    float s = sin(InstanceRotation);
+    vec2 p = Positions * InstanceScale;
+    p = vec2(p.x * c - p.y * s, p.x * s + p.y * c) + InstanceOffset;
+    gl_Position = ProjectionMatrix * ModelViewMatrix * vec4(p, 0.0, 1.0);
+    ColorsOut = InstanceColor;
+}
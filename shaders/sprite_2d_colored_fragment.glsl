@@ -0,0 +1,8 @@
+// sprite_2d_colored_fragment.glsl
+uniform vec4 ModulateColor;
+varying vec2 TextureCoordinatesOut;
+varying vec4 ColorsOut;
+uniform sampler2D Texture;
+void main(void) {
+    gl_FragColor = ModulateColor * ColorsOut * texture2D(Texture, TextureCoordinatesOut);
+}
@@ -0,0 +1,13 @@
+// sprite_2d_colored_vertex.glsl
+attribute vec2 Positions;
+attribute vec2 TextureCoordinates;
+attribute vec4 Colors;
+uniform mat4 ProjectionMatrix;
+uniform mat4 ModelViewMatrix;
+varying vec2 TextureCoordinatesOut;
+varying vec4 ColorsOut;
+void main(void) {
+    gl_Position = ProjectionMatrix * ModelViewMatrix * vec4(Positions, 0.0, 1.0);
+    TextureCoordinatesOut = TextureCoordinates;
+    ColorsOut = Colors;
+}
@@ -0,0 +1,187 @@
+# sprite_batch.py
+
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+from OpenGL import GL as gl
+
+from color import Color
+from graphics_library import GraphicsLibrary, BLEND_MODE_ALPHA
+from graphics_sprite import GraphicsSprite
+from graphics_stream_buffer import GraphicsStreamBuffer
+from matrix import Matrix, Affine2D
+from shader_program import ShaderProgram
+import tracing
+
+class _SpriteBatchGroup:
+    def __init__(self, texture_index: int, blend_mode: int) -> None:
+        self.texture_index = texture_index
+        self.blend_mode = blend_mode
+        self.rects: list[tuple[float, float, float, float]] = []
+        self.transforms: list[tuple[float, float, float, float, float, float]] = []
+        self.uvs: list[tuple[float, float, float, float]] = []
+        self.colors: list[tuple[float, float, float, float]] = []
+
+
+class SpriteBatch:
+    """
+    Collects sprite draws and flushes them with one draw call per
+    (texture, blend mode) group.
+
+    Each sprite is expanded to 4 Sprite2DColoredVertex corners on the CPU
+    (transform, uv rect and color baked in, all vectorized per group) and
+    streamed through a GraphicsStreamBuffer. Groups are drawn in the order
+    they were first used; sprites in different groups may therefore not
+    keep their relative submission order.
+
+    Use with pipeline.program_sprite2d_colored:
+
+        batch.begin(projection)
+        batch.add(sprite, transform, color)
+        ...
+        batch.end()
+    """
+
+    def __init__(self, capacity: int = 4 * 1024 * 1024) -> None:
+        self.graphics: Optional[GraphicsLibrary] = None
+        self.program: Optional[ShaderProgram] = None
+        self.stream_buffer = GraphicsStreamBuffer(capacity=capacity)
+
+        self.projection_matrix: Optional[Matrix] = None
+        self.model_view_matrix = Matrix()
+
+        self.groups: dict[tuple[int, int], _SpriteBatchGroup] = {}
+        self.sprite_count: int = 0
+        self.draw_call_count: int = 0
+
+    def load(self, graphics: GraphicsLibrary, program: Optional[ShaderProgram]) -> None:
+        self.graphics = graphics
+        self.program = program
+        self.stream_buffer.load(graphics)
+
+    def unload(self) -> None:
+        self.stream_buffer.unload()
+        self.groups = {}
+
+    def begin(self, projection_matrix: Matrix, model_view_matrix: Optional[Matrix] = None) -> None:
+        self.projection_matrix = projection_matrix
+        if model_view_matrix is None:
+            self.model_view_matrix.reset()
+        else:
+            self.model_view_matrix.make_matrix(model_view_matrix)
+        self.groups = {}
+        self.sprite_count = 0
+        self.draw_call_count = 0
+        self.stream_buffer.begin_frame()
+
+    def add(
+        self,
+        sprite: GraphicsSprite,
+        transform: Optional[Union[Matrix, Affine2D]] = None,
+        color: Optional[Color] = None,
+        blend_mode: int = BLEND_MODE_ALPHA,
+        uv_rect: Optional[tuple[float, float, float, float]] = None,
+    ) -> None:
+        """
+        Queue one sprite. uv_rect is (start_u, start_v, end_u, end_v) and
+        defaults to the sprite's own uv rect.
+        """
+        texture = sprite.texture
+        if texture is None or texture.texture_index == -1:
+            return
+
+        key = (texture.texture_index, blend_mode)
+        group = self.groups.get(key)
+        if group is None:
+            group = _SpriteBatchGroup(texture.texture_index, blend_mode)
+            self.groups[key] = group
+
+        group.rects.append((sprite.start_x, sprite.start_y, sprite.end_x, sprite.end_y))
+
+        if transform is None:
+            group.transforms.append((1.0, 0.0, 0.0, 1.0, 0.0, 0.0))
+        elif isinstance(transform, Affine2D):
+            group.transforms.append(
+                (transform.a, transform.b, transform.c, transform.d, transform.tx, transform.ty)
+            )
+        else:
+            m = transform.m
+            group.transforms.append(
+                (float(m[0]), float(m[1]), float(m[4]), float(m[5]), float(m[12]), float(m[13]))
+            )
+
+        if uv_rect is None:
+            group.uvs.append((sprite.start_u, sprite.start_v, sprite.end_u, sprite.end_v))
+        else:
+            group.uvs.append(uv_rect)
+
+        if color is None:
+            group.colors.append((1.0, 1.0, 1.0, 1.0))
+        else:
+            group.colors.append((color.r, color.g, color.b, color.a))
+
+        self.sprite_count += 1
+
+    def end(self) -> None:
+        """
+        Build and draw every group, then clear the batch.
+        """
+        graphics = self.graphics
+        program = self.program
+        if graphics is None or program is None:
+            self.groups = {}
+            return
+
+        for group in self.groups.values():
+            with tracing.span("SpriteBatch.build_vertices"):
+                vertices = self.build_vertices(group)
+            offset = self.stream_buffer.write(vertices)
+            if offset == -1:
+                continue
+
+            quad_count = len(group.rects)
+            graphics.blend_set_mode(group.blend_mode)
+            graphics.link_buffer_to_shader_program(program, self.stream_buffer.buffer_index, offset)
+            graphics.uniforms_texture_set_index(program, group.texture_index)
+            graphics.uniforms_modulate_color_set(program, 1.0, 1.0, 1.0, 1.0)
+            graphics.uniforms_matrices_set(program, self.projection_matrix, self.model_view_matrix)
+            graphics.draw_primitives(
+                index_buffer=graphics.buffer_index_quads(quad_count),
+                primitive_type=gl.GL_TRIANGLES,
+                count=quad_count * 6,
+            )
+            graphics.unlink_buffer_from_shader_program(program)
+            self.draw_call_count += 1
+
+        self.groups = {}
+
+    @staticmethod
+    def build_vertices(group: _SpriteBatchGroup) -> np.ndarray:
+        """
+        (n, 4, 8) float32 corners: top-left, top-right, bottom-left,
+        bottom-right, each x, y, u, v, r, g, b, a.
+        """
+        rects = np.asarray(group.rects, dtype=np.float32)
+        transforms = np.asarray(group.transforms, dtype=np.float32)
+        uvs = np.asarray(group.uvs, dtype=np.float32)
+        colors = np.asarray(group.colors, dtype=np.float32)
+
+        count = rects.shape[0]
+        xs = rects[:, [0, 2, 0, 2]]
+        ys = rects[:, [1, 1, 3, 3]]
+        a = transforms[:, 0:1]
+        b = transforms[:, 1:2]
+        c = transforms[:, 2:3]
+        d = transforms[:, 3:4]
+        tx = transforms[:, 4:5]
+        ty = transforms[:, 5:6]
+
+        vertices = np.empty((count, 4, 8), dtype=np.float32)
+        vertices[:, :, 0] = a * xs + c * ys + tx
+        vertices[:, :, 1] = b * xs + d * ys + ty
+        vertices[:, :, 2] = uvs[:, [0, 2, 0, 2]]
+        vertices[:, :, 3] = uvs[:, [1, 1, 3, 3]]
+        vertices[:, :, 4:8] = colors[:, None, :]
+        return vertices
@@ -0,0 +1,59 @@
+# tests/test_affine2d.py
+#
+# Affine2D is the 2x3 fast path for 2D transforms; its closed-form inverse
+# and its 4x4 expansion must agree with the general Matrix code.
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matrix import Affine2D, Matrix  # noqa: E402
+
+def _sample() -> Affine2D:
+    affine = Affine2D()
+    affine.translate(40.0, -12.0)
+    affine.rotate(0.6)
+    affine.scale_xy(3.0, 0.5)
+    return affine
+
+def test_matches_matrix():
+    matrix = Matrix()
+    matrix.translate(40.0, -12.0, 0.0)
+    matrix.rotate_z(0.6)
+    matrix.scale_xyz(3.0, 0.5, 1.0)
+    assert np.allclose(_sample().to_matrix().m, matrix.m, atol=1e-5)
+
+def test_inverse_round_trips():
+    affine = _sample()
+    inverse = affine.copy()
+    assert inverse.invert()
+
+    product = affine.copy()
+    product.multiply(inverse)
+    for value, expected in zip(
+        (product.a, product.b, product.c, product.d, product.tx, product.ty),
+        (1.0, 0.0, 0.0, 1.0, 0.0, 0.0),
+    ):
+        assert math.isclose(value, expected, abs_tol=1e-9)
+
+    matrix = affine.to_matrix()
+    matrix.invert()
+    assert np.allclose(inverse.to_matrix().m, matrix.m, atol=1e-5)
+
+def test_untransform_point_undoes_transform_point():
+    affine = _sample()
+    x, y = affine.transform_point(7.0, -3.0)
+    back = affine.untransform_point(x, y)
+    assert back is not None
+    assert math.isclose(back[0], 7.0, abs_tol=1e-9)
+    assert math.isclose(back[1], -3.0, abs_tol=1e-9)
+
+def test_singular_transform_is_left_unchanged():
+    affine = Affine2D(1.0, 2.0, 2.0, 4.0, 5.0, 6.0)
+    assert affine.determinant() == 0.0
+    assert not affine.invert()
+    assert (affine.a, affine.b, affine.c, affine.d, affine.tx, affine.ty) == (1.0, 2.0, 2.0, 4.0, 5.0, 6.0)
+    assert affine.untransform_point(1.0, 1.0) is None
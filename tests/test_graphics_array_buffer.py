@@ -0,0 +1,94 @@
+# tests/test_graphics_array_buffer.py
+#
+# write_vertices() / mark_dirty() record vertex ranges that flush() merges
+# and uploads with glBufferSubData. The GL part runs on a headless EGL
+# context and is skipped where none is available.
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from headless_context import HeadlessContext  # noqa: E402
+from graphics_array_buffer import GraphicsArrayBuffer  # noqa: E402
+from vertex_array import VertexArray  # noqa: E402
+
+@pytest.fixture(scope="module")
+def graphics():
+    try:
+        context = HeadlessContext(4, 4)
+    except Exception as e:
+        pytest.skip(f"no headless GL context: {e}")
+    with context:
+        from graphics_library import GraphicsLibrary
+
+        yield GraphicsLibrary(width=4, height=4)
+
+def _cpu_buffer(vertex_count: int, vertex_size: int = 2) -> GraphicsArrayBuffer:
+    buffer = GraphicsArrayBuffer()
+    buffer.vertex_buffer = np.zeros(vertex_count * vertex_size, dtype=np.float32)
+    buffer.vertex_size = vertex_size
+    return buffer
+
+def _read_back(buffer: GraphicsArrayBuffer) -> np.ndarray:
+    from OpenGL import GL as gl
+
+    buffer.graphics.buffer_array_bind(buffer.buffer_index)
+    data = gl.glGetBufferSubData(gl.GL_ARRAY_BUFFER, 0, buffer.size)
+    return np.frombuffer(bytes(data), dtype=np.float32)
+
+def test_overlapping_and_touching_ranges_merge():
+    buffer = _cpu_buffer(100)
+    buffer.mark_dirty(40, 5)   # [40, 45)
+    buffer.mark_dirty(0, 10)   # [0, 10)
+    buffer.mark_dirty(10, 5)   # [10, 15), touches [0, 10)
+    buffer.mark_dirty(42, 10)  # [42, 52), overlaps [40, 45)
+    buffer.mark_dirty(44, 2)   # inside [42, 52)
+    buffer.mark_dirty(60, 1)
+    assert buffer.merged_dirty_ranges() == [(0, 15), (40, 52), (60, 61)]
+
+def test_empty_ranges_are_ignored():
+    buffer = _cpu_buffer(10)
+    buffer.mark_dirty(3, 0)
+    assert buffer.merged_dirty_ranges() == []
+
+def test_out_of_range_raises():
+    buffer = _cpu_buffer(10)
+    with pytest.raises(ValueError):
+        buffer.mark_dirty(-1, 2)
+    with pytest.raises(ValueError):
+        buffer.mark_dirty(8, 3)
+    buffer.mark_dirty(8, 2)
+    assert buffer.merged_dirty_ranges() == [(8, 10)]
+
+def test_flush_uploads_dirty_ranges(graphics, monkeypatch):
+    uploads = []
+    write, write_range = graphics.buffer_array_write, graphics.buffer_array_write_range
+    monkeypatch.setattr(graphics, "buffer_array_write", lambda *args: (uploads.append("all"), write(*args)))
+    monkeypatch.setattr(graphics, "buffer_array_write_range", lambda *args: (uploads.append("range"), write_range(*args)))
+
+    source = VertexArray.from_floats(np.arange(16, dtype=np.float32))
+    buffer = GraphicsArrayBuffer()
+    buffer.load(graphics, source)
+    assert buffer.vertex_count == 8
+
+    patch = VertexArray.from_floats(np.full(4, -1.0, dtype=np.float32))
+    expected = np.arange(16, dtype=np.float32)
+    # The second flush switches the usage hint to GL_DYNAMIC_DRAW
+    for start in (1, 5, 3):
+        buffer.write_vertices(start, patch)
+        buffer.flush()
+        expected[start * 2:start * 2 + 4] = -1.0
+        assert (_read_back(buffer) == expected).all()
+    assert buffer.dirty_ranges == []
+    # One upload per flush; the promotion re-specifies instead of adding one
+    assert uploads == ["all", "range", "all", "range"]
+
+    # The caller's VertexArray is never written
+    assert (source.floats() == np.arange(16, dtype=np.float32)).all()
+    graphics.buffer_array_delete(buffer.buffer_index)
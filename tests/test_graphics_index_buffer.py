@@ -0,0 +1,76 @@
+# tests/test_graphics_index_buffer.py
+#
+# GraphicsIndexBuffer stores uint16 indices while every vertex fits
+# (up to 65536 of them) and uint32 beyond; the GL index type passed to
+# glDrawElements must follow the stored dtype. The GL part runs on a
+# headless EGL context and is skipped where none is available.
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from OpenGL import GL as gl  # noqa: E402
+
+from headless_context import HeadlessContext  # noqa: E402
+from graphics_index_buffer import (  # noqa: E402
+    GraphicsIndexBuffer,
+    UINT16_VERTEX_LIMIT,
+    index_dtype_for_vertex_count,
+    quad_indices,
+)
+
+@pytest.fixture(scope="module")
+def graphics():
+    try:
+        context = HeadlessContext(4, 4)
+    except Exception as e:
+        pytest.skip(f"no headless GL context: {e}")
+    with context:
+        from graphics_library import GraphicsLibrary
+
+        yield GraphicsLibrary(width=4, height=4)
+
+def _buffer_size(index_buffer: GraphicsIndexBuffer) -> int:
+    index_buffer.graphics.buffer_element_bind(index_buffer.buffer_index)
+    return int(gl.glGetBufferParameteriv(gl.GL_ELEMENT_ARRAY_BUFFER, gl.GL_BUFFER_SIZE))
+
+def test_index_dtype_for_vertex_count():
+    assert index_dtype_for_vertex_count(0) == np.uint16
+    assert index_dtype_for_vertex_count(UINT16_VERTEX_LIMIT) == np.uint16
+    assert index_dtype_for_vertex_count(UINT16_VERTEX_LIMIT + 1) == np.uint32
+
+def test_quad_indices():
+    assert quad_indices(2).tolist() == [0, 1, 2, 2, 1, 3, 4, 5, 6, 6, 5, 7]
+
+def test_type_follows_largest_index(graphics):
+    index_buffer = GraphicsIndexBuffer()
+    index_buffer.load(graphics, [0, 1, 65535])
+    assert index_buffer.index_buffer.dtype == np.uint16
+    assert index_buffer.index_type == gl.GL_UNSIGNED_SHORT
+    assert _buffer_size(index_buffer) == 6
+
+    # Same byte size, wider type: re-specified as uint32
+    index_buffer.write([0, 1, 65536])
+    assert index_buffer.index_buffer.dtype == np.uint32
+    assert index_buffer.index_type == gl.GL_UNSIGNED_INT
+    assert _buffer_size(index_buffer) == 12
+    index_buffer.unload()
+
+def test_vertex_count_overrides_largest_index(graphics):
+    index_buffer = GraphicsIndexBuffer()
+    index_buffer.load(graphics, quad_indices(1), vertex_count=UINT16_VERTEX_LIMIT + 4)
+    assert index_buffer.index_type == gl.GL_UNSIGNED_INT
+    assert index_buffer.count == 6
+    index_buffer.unload()
+
+def test_empty_indices_allocate_nothing(graphics):
+    index_buffer = GraphicsIndexBuffer()
+    index_buffer.load(graphics, [])
+    assert index_buffer.buffer_index == -1
+    assert index_buffer.count == 0
@@ -0,0 +1,76 @@
+# tests/test_graphics_stream_buffer.py
+#
+# GraphicsStreamBuffer hands out aligned offsets from a ring, orphans the
+# storage and wraps to 0 when the ring is full, and grows for frames that
+# do not fit. Runs on a headless EGL context and is skipped where none is
+# available.
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from headless_context import HeadlessContext  # noqa: E402
+from graphics_stream_buffer import GraphicsStreamBuffer  # noqa: E402
+
+@pytest.fixture(scope="module")
+def graphics():
+    try:
+        context = HeadlessContext(4, 4)
+    except Exception as e:
+        pytest.skip(f"no headless GL context: {e}")
+    with context:
+        from graphics_library import GraphicsLibrary
+
+        yield GraphicsLibrary(width=4, height=4)
+
+@pytest.fixture
+def stream(graphics):
+    stream = GraphicsStreamBuffer(capacity=64)
+    stream.load(graphics)
+    yield stream
+    stream.unload()
+
+def _read_back(stream: GraphicsStreamBuffer, offset: int, count: int) -> np.ndarray:
+    from OpenGL import GL as gl
+
+    stream.graphics.buffer_array_bind(stream.buffer_index)
+    data = gl.glGetBufferSubData(gl.GL_ARRAY_BUFFER, offset, count * 4)
+    return np.frombuffer(bytes(data), dtype=np.float32)
+
+def test_offsets_are_aligned(stream):
+    stream.begin_frame()
+    assert stream.write(np.ones(3, dtype=np.float32)) == 0  # 12 bytes
+    assert stream.write(np.ones(1, dtype=np.float32)) == 16
+    assert stream.head == 32
+    assert stream.write(np.zeros(0, dtype=np.float32)) == -1
+
+def test_full_ring_orphans_and_wraps(stream):
+    orphans = stream.orphan_count
+    stream.begin_frame()
+    offsets = [stream.write(np.full(4, float(index), dtype=np.float32)) for index in range(5)]
+    assert offsets == [0, 16, 32, 48, 0]
+    assert stream.orphan_count == orphans + 1
+    assert stream.grow_count == 0
+    assert (_read_back(stream, 0, 4) == 4.0).all()
+
+def test_frame_larger_than_ring_grows_at_next_frame(stream):
+    stream.begin_frame()
+    for _ in range(6):
+        stream.write(np.ones(4, dtype=np.float32))
+    assert stream.capacity == 64
+    stream.begin_frame()
+    assert stream.capacity == 128
+    assert stream.grow_count == 1
+
+def test_oversized_write_grows_at_once(stream):
+    stream.begin_frame()
+    data = np.arange(40, dtype=np.float32)  # 160 bytes
+    assert stream.write(data) == 0
+    assert stream.capacity == 256
+    assert (_read_back(stream, 0, 40) == data).all()
@@ -0,0 +1,131 @@
+# tests/test_image_disk_cache.py
+#
+# Odd-size mip chains from ImageDiskCache must be complete in GL's eyes
+# (level sizes max(1, n // 2)); an incomplete texture samples black.
+# Runs on a headless EGL context and is skipped where none is available.
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from headless_context import HeadlessContext  # noqa: E402
+from image_disk_cache import ImageDiskCache, mipmap_chain  # noqa: E402
+
+SIZE = 4
+
+@pytest.fixture(scope="module")
+def graphics():
+    try:
+        context = HeadlessContext(SIZE, SIZE)
+    except Exception as e:
+        pytest.skip(f"no headless GL context: {e}")
+    with context:
+        from graphics_framebuffer import GraphicsFramebuffer
+        from graphics_library import GraphicsLibrary
+
+        graphics = GraphicsLibrary(width=SIZE, height=SIZE)
+        framebuffer = GraphicsFramebuffer()
+        framebuffer.load(graphics, SIZE, SIZE)
+        framebuffer.begin()
+        yield graphics
+        framebuffer.end()
+        framebuffer.unload()
+
+def _odd_image(tmp_path) -> tuple[str, np.ndarray]:
+    pixels = np.zeros((5, 7, 4), dtype=np.uint8)
+    pixels[:, :, 0] = 200
+    pixels[:, :, 1] = 100
+    pixels[:, :, 2] = 50
+    pixels[:, :, 3] = 255
+    path = os.path.join(tmp_path, "odd.png")
+    Image.fromarray(pixels).save(path)
+    return path, pixels
+
+def _sample_minified(graphics, texture_index: int) -> np.ndarray:
+    """
+    Draw the texture into the SIZE x SIZE framebuffer (minified from 7x5,
+    so mip levels are sampled) with the fixed function pipeline.
+    """
+    from OpenGL import GL as gl
+
+    gl.glUseProgram(0)
+    graphics.state_program = None
+    gl.glEnable(gl.GL_TEXTURE_2D)
+    graphics.texture_bind_index(texture_index)
+    gl.glTexEnvi(gl.GL_TEXTURE_ENV, gl.GL_TEXTURE_ENV_MODE, gl.GL_REPLACE)
+    gl.glClearColor(0.0, 0.0, 1.0, 1.0)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+    gl.glBegin(gl.GL_QUADS)
+    for u, v in ((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)):
+        gl.glTexCoord2f(u, v)
+        gl.glVertex2f(u * 2.0 - 1.0, v * 2.0 - 1.0)
+    gl.glEnd()
+    gl.glDisable(gl.GL_TEXTURE_2D)
+    return graphics.framebuffer_read_pixels(0, 0, SIZE, SIZE).reshape(SIZE, SIZE, 4)
+
+def test_mipmap_chain_uses_gl_level_sizes():
+    sizes = [level.shape[:2] for level in mipmap_chain(np.zeros((5, 7, 4), dtype=np.uint8))]
+    assert sizes == [(5, 7), (2, 3), (1, 1)]
+
+    sizes = [level.shape[:2] for level in mipmap_chain(np.zeros((1, 9, 4), dtype=np.uint8))]
+    assert sizes == [(1, 9), (1, 4), (1, 2), (1, 1)]
+
+def test_mipmap_chain_folds_odd_edge():
+    pixels = np.zeros((2, 3, 4), dtype=np.uint8)
+    pixels[:, :, 0] = [[0, 30, 90], [0, 30, 90]]
+    pixels[:, :, 3] = 255
+    last = mipmap_chain(pixels)[-1]
+    assert last.shape[:2] == (1, 1)
+    assert last[0, 0, 0] == 40
+    assert last[0, 0, 3] == 255
+
+def test_cached_odd_size_texture_samples(graphics, tmp_path):
+    from graphics_texture import GraphicsTexture
+
+    path, pixels = _odd_image(tmp_path)
+    cache = ImageDiskCache(os.path.join(tmp_path, "cache"))
+    for _ in range(2):  # miss, then the memory-mapped hit
+        texture = GraphicsTexture(graphics, path, disk_cache=cache, mipmaps=True)
+        assert texture.channels == 4
+        drawn = _sample_minified(graphics, texture.texture_index)
+        assert np.abs(drawn.astype(int) - pixels[0, 0].astype(int)).max() <= 1
+        texture.unload()
+    assert cache.hits == 1
+
+def test_loader_uploads_cached_mips_within_budget(graphics, tmp_path):
+    from graphics_texture import GraphicsTexture
+    from texture_loader import TextureLoader
+
+    path, pixels = _odd_image(tmp_path)
+    cache = ImageDiskCache(os.path.join(tmp_path, "cache"))
+    loader = TextureLoader(graphics, upload_budget_bytes=1)
+    texture = GraphicsTexture(disk_cache=cache, mipmaps=True)
+    texture.file_name = path
+    loader.load(texture)
+
+    loader.wait_decoded()
+    frames = 0
+    while texture.placeholder:
+        loader.update()
+        frames += 1
+        assert frames < 100
+    # One row per frame: 5 + 2 + 1 rows over levels 0, 1, 2
+    assert frames == 8
+
+    drawn = _sample_minified(graphics, texture.texture_index)
+    assert np.abs(drawn.astype(int) - pixels[0, 0].astype(int)).max() <= 1
+    texture.unload()
+    loader.shutdown()
+
+def test_entry_over_budget_survives_its_own_store(tmp_path):
+    path, pixels = _odd_image(tmp_path)
+    cache = ImageDiskCache(os.path.join(tmp_path, "cache"), max_bytes=1)
+    levels = cache.load(path, mipmaps=True)
+    assert (np.asarray(levels[0]) == pixels).all()
@@ -0,0 +1,130 @@
+# tests/test_image_memmap.py
+#
+# .npy and uncompressed TIFF pixels are memory-mapped instead of decoded,
+# and texture_unpack_layout() describes row-strided pixels to GL so they
+# upload without a copy. The upload round trip runs on a headless EGL
+# context and is skipped where none is available.
+import os
+import sys
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from headless_context import HeadlessContext  # noqa: E402
+from graphics_library import texture_unpack_layout  # noqa: E402
+from image_memmap import map_image, map_raw, map_tiff  # noqa: E402
+
+@pytest.fixture(scope="module")
+def graphics():
+    try:
+        context = HeadlessContext(4, 4)
+    except Exception as e:
+        pytest.skip(f"no headless GL context: {e}")
+    with context:
+        from graphics_library import GraphicsLibrary
+
+        yield GraphicsLibrary(width=4, height=4)
+
+def _pixels(height: int, width: int, channels: int) -> np.ndarray:
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    return (np.arange(int(np.prod(shape))) % 251).astype(np.uint8).reshape(shape)
+
+def _padded_rows(pixels: np.ndarray, stride: int) -> np.ndarray:
+    """
+    The same pixels with each row starting stride bytes after the last.
+    """
+    height = pixels.shape[0]
+    row_bytes = pixels[0].size
+    storage = np.zeros(height * stride, dtype=np.uint8)
+    for row in range(height):
+        storage[row * stride:row * stride + row_bytes] = pixels[row].reshape(-1)
+    strides = (stride,) + pixels.strides[1:]
+    return np.lib.stride_tricks.as_strided(storage, shape=pixels.shape, strides=strides, writeable=False)
+
+def _read_texture(graphics, texture_index: int, channels: int) -> np.ndarray:
+    from OpenGL import GL as gl
+
+    from graphics_library import TEXTURE_PIXEL_FORMATS
+
+    _, upload_format = TEXTURE_PIXEL_FORMATS[channels]
+    graphics.texture_bind_index(texture_index)
+    gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+    width = gl.glGetTexLevelParameteriv(gl.GL_TEXTURE_2D, 0, gl.GL_TEXTURE_WIDTH)
+    height = gl.glGetTexLevelParameteriv(gl.GL_TEXTURE_2D, 0, gl.GL_TEXTURE_HEIGHT)
+    data = gl.glGetTexImage(gl.GL_TEXTURE_2D, 0, upload_format, gl.GL_UNSIGNED_BYTE)
+    pixels = np.frombuffer(bytes(data), dtype=np.uint8).reshape(int(height), int(width), -1)
+    return pixels[:, :, 0] if channels == 1 else pixels
+
+def test_unpack_layout_contiguous():
+    pixels, alignment, row_length = texture_unpack_layout(_pixels(4, 3, 3))
+    assert (alignment, row_length) == (1, 0)
+    pixels, alignment, row_length = texture_unpack_layout(_pixels(4, 2, 4))
+    assert (alignment, row_length) == (8, 0)
+
+def test_unpack_layout_crop_is_not_copied():
+    image = _pixels(8, 10, 4)
+    crop = image[2:6, 3:7]
+    pixels, alignment, row_length = texture_unpack_layout(crop)
+    assert np.shares_memory(pixels, image)
+    assert (alignment, row_length) == (8, 10)
+
+def test_unpack_layout_sub_pixel_padding_uses_alignment():
+    padded = _padded_rows(_pixels(3, 3, 3), 10)  # 9 bytes of RGB + 1 pad
+    pixels, alignment, row_length = texture_unpack_layout(padded)
+    assert np.shares_memory(pixels, padded)
+    assert (alignment, row_length) == (2, 0)
+
+def test_unpack_layout_copies_planar_pixels():
+    planar = np.ascontiguousarray(_pixels(4, 5, 3).transpose(2, 0, 1)).transpose(1, 2, 0)
+    pixels, alignment, row_length = texture_unpack_layout(planar)
+    assert pixels.flags.c_contiguous
+    assert (pixels == planar).all()
+    assert row_length == 0
+
+@pytest.mark.parametrize("stride", [10, 12, 16])
+def test_strided_pixels_upload_intact(graphics, stride):
+    source = _pixels(3, 3, 3)
+    texture_index = graphics.texture_generate_from_pixels(_padded_rows(source, stride))
+    assert (_read_texture(graphics, texture_index, 3) == source).all()
+    graphics.texture_delete(texture_index)
+
+def test_crop_uploads_intact(graphics):
+    image = _pixels(8, 10, 1)
+    texture_index = graphics.texture_generate_from_pixels(image[1:6, 2:9])
+    assert (_read_texture(graphics, texture_index, 1) == image[1:6, 2:9]).all()
+    graphics.texture_delete(texture_index)
+
+@pytest.mark.parametrize("mode, channels", [("L", 1), ("RGB", 3), ("RGBA", 4)])
+def test_map_tiff(tmp_path, mode, channels):
+    pixels = _pixels(7, 5, channels)
+    path = os.path.join(tmp_path, f"image_{mode}.tif")
+    Image.fromarray(pixels, mode).save(path)
+    mapped = map_tiff(path)
+    assert isinstance(mapped, np.memmap)
+    assert (mapped == pixels).all()
+
+def test_map_image_falls_back_for_compressed_tiff(tmp_path):
+    path = os.path.join(tmp_path, "compressed.tif")
+    Image.fromarray(_pixels(7, 5, 3), "RGB").save(path, compression="tiff_deflate")
+    with pytest.raises(ValueError):
+        map_tiff(path)
+    assert map_image(path) is None
+
+def test_map_image_npy_and_raw(tmp_path):
+    pixels = _pixels(6, 4, 2)
+    path = os.path.join(tmp_path, "image.npy")
+    np.save(path, pixels)
+    assert (map_image(path) == pixels).all()
+    assert map_image(os.path.join(tmp_path, "image.png")) is None
+
+    path = os.path.join(tmp_path, "image.raw")
+    with open(path, "wb") as f:
+        f.write(b"header")
+        f.write(pixels.tobytes())
+    assert (map_raw(path, 4, 6, 2, offset=6) == pixels).all()
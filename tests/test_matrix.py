@@ -0,0 +1,95 @@
+# tests/test_matrix.py
+#
+# Matrix keeps its 16 floats in one contiguous float32 array (uploaded to
+# glUniformMatrix4fv as is), written in place; its math must match the
+# column-major convention of the C++ original.
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matrix import Matrix  # noqa: E402
+
+def _as_math(matrix: Matrix) -> np.ndarray:
+    # Column-major storage: reshape gives the transpose
+    return matrix.m.reshape(4, 4).T.astype(np.float64)
+
+def _sample() -> Matrix:
+    matrix = Matrix()
+    matrix.translate(3.0, -2.0, 0.5)
+    matrix.rotate_z(0.3)
+    matrix.scale_xyz(2.0, 0.5, 1.0)
+    return matrix
+
+def test_storage_is_contiguous_float32_and_written_in_place():
+    matrix = Matrix()
+    storage = matrix.m
+    assert storage.dtype == np.float32
+    assert storage.shape == (16,)
+    assert storage.flags.c_contiguous
+
+    matrix.ortho_size(640.0, 480.0)
+    matrix.translate(1.0, 2.0, 0.0)
+    matrix.multiply(_sample())
+    matrix.invert()
+    matrix.reset()
+    assert matrix.m is storage
+
+def test_translate_rotate_scale_compose_on_the_right():
+    matrix = _sample()
+    c, s = math.cos(0.3), math.sin(0.3)
+    expected = (
+        np.array([[1, 0, 0, 3.0], [0, 1, 0, -2.0], [0, 0, 1, 0.5], [0, 0, 0, 1]])
+        @ np.array([[c, -s, 0, 0], [s, c, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+        @ np.diag([2.0, 0.5, 1.0, 1.0])
+    )
+    assert np.allclose(_as_math(matrix), expected, atol=1e-6)
+
+def test_multiply_matches_matrix_product():
+    left = _sample()
+    right = Matrix()
+    right.rotation_x(0.7)
+    right.translate(0.0, 4.0, -1.0)
+    expected = _as_math(left) @ _as_math(right)
+
+    left.multiply(right)
+    assert np.allclose(_as_math(left), expected, atol=1e-5)
+
+def test_multiply_by_itself():
+    matrix = _sample()
+    expected = _as_math(matrix) @ _as_math(matrix)
+    matrix.multiply(matrix)
+    assert np.allclose(_as_math(matrix), expected, atol=1e-5)
+
+def test_invert_and_determinant():
+    matrix = _sample()
+    assert math.isclose(matrix.determinant(), 1.0, rel_tol=1e-6)
+    expected = np.linalg.inv(_as_math(matrix))
+    matrix.invert()
+    assert np.allclose(_as_math(matrix), expected, atol=1e-5)
+
+def test_invert_leaves_singular_matrix_unchanged():
+    matrix = Matrix()
+    matrix.scale_xyz(1.0, 0.0, 1.0)
+    before = matrix.m.copy()
+    matrix.invert()
+    assert (matrix.m == before).all()
+
+def test_ortho_size_maps_pixels_to_clip_space():
+    matrix = Matrix()
+    matrix.ortho_size(200.0, 100.0)
+    corners = _as_math(matrix) @ np.array([[0.0, 200.0], [0.0, 100.0], [0.0, 0.0], [1.0, 1.0]])
+    assert np.allclose(corners[0:2].T, [[-1.0, 1.0], [1.0, -1.0]])
+
+def test_write_to_buffer_and_array_copy():
+    matrix = _sample()
+    buffer: list[float] = []
+    matrix.write_to_buffer(buffer)
+    assert buffer == matrix.m.tolist()
+
+    copy = matrix.array()
+    copy[0] = 99.0
+    assert matrix.m[0] != 99.0
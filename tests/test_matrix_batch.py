@@ -0,0 +1,100 @@
+# tests/test_matrix_batch.py
+#
+# MatrixBatch applies the Matrix operations to N instances at once; each
+# instance must end up exactly where the same calls on a lone Matrix put
+# it, with scalars broadcast and (N,) arrays applied per instance.
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matrix import Matrix  # noqa: E402
+from matrix_batch import MatrixBatch  # noqa: E402
+
+X = np.array([0.0, 10.0, -4.0], dtype=np.float32)
+Y = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+ANGLE = np.array([0.0, 0.5, -1.25], dtype=np.float32)
+SCALE = np.array([1.0, 2.0, 0.25], dtype=np.float32)
+
+def _batch() -> MatrixBatch:
+    batch = MatrixBatch(len(X))
+    batch.translate(X, Y)
+    batch.rotate_z(ANGLE)
+    batch.scale_xyz(SCALE, 3.0)
+    return batch
+
+def _single(index: int) -> Matrix:
+    matrix = Matrix()
+    matrix.translate(float(X[index]), float(Y[index]), 0.0)
+    matrix.rotate_z(float(ANGLE[index]))
+    matrix.scale_xyz(float(SCALE[index]), 3.0, 1.0)
+    return matrix
+
+def test_layout_matches_matrix():
+    batch = _batch()
+    assert batch.m.dtype == np.float32
+    assert batch.m.shape == (3, 4, 4)
+    assert batch.m.flags.c_contiguous
+    for index in range(len(batch)):
+        assert np.allclose(batch.m[index].ravel(), _single(index).m, atol=1e-6)
+        assert np.allclose(batch.get_matrix(index).m, _single(index).m, atol=1e-6)
+
+def test_multiply_and_multiply_left():
+    view = Matrix()
+    view.ortho_size(320.0, 240.0)
+
+    batch = _batch()
+    batch.multiply_left(view)
+    for index in range(len(batch)):
+        expected = Matrix()
+        expected.make_matrix(view)
+        expected.multiply(_single(index))
+        assert np.allclose(batch.m[index].ravel(), expected.m, atol=1e-6)
+
+    batch = _batch()
+    batch.multiply(view)
+    for index in range(len(batch)):
+        expected = _single(index)
+        expected.multiply(view)
+        assert np.allclose(batch.m[index].ravel(), expected.m, atol=1e-5)
+
+def test_invert_skips_singular_instances():
+    batch = _batch()
+    batch.m[1] = 0.0
+    batch.invert()
+    assert (batch.m[1] == 0.0).all()
+    for index in (0, 2):
+        expected = _single(index)
+        expected.invert()
+        assert np.allclose(batch.m[index].ravel(), expected.m, atol=1e-5)
+
+def test_transform_points():
+    batch = _batch()
+    points = np.array([[1.0, 0.0], [0.0, 1.0], [2.0, -1.0]], dtype=np.float32)
+    out = batch.transform_points(points)
+    for index in range(len(batch)):
+        transform = batch.m[index].T
+        expected = transform @ np.array([points[index, 0], points[index, 1], 0.0, 1.0])
+        assert np.allclose(out[index], expected[0:2], atol=1e-5)
+
+    many = np.repeat(points[:, None, :], 4, axis=1)
+    assert np.allclose(batch.transform_points(many)[:, 2], out, atol=1e-6)
+
+def test_resize_keeps_existing_and_adds_identity():
+    batch = _batch()
+    kept = batch.m.copy()
+    batch.resize(5)
+    assert (batch.m[0:3] == kept).all()
+    assert (batch.m[3:] == np.eye(4, dtype=np.float32)).all()
+    batch.resize(2)
+    assert (batch.m == kept[0:2]).all()
+
+def test_argument_shape_is_checked():
+    batch = MatrixBatch(3)
+    with pytest.raises(ValueError):
+        batch.translate(np.zeros(2), 0.0)
+    with pytest.raises(ValueError):
+        batch.transform_points(np.zeros((2, 2)))
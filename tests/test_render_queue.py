@@ -0,0 +1,97 @@
+# tests/test_render_queue.py
+#
+# RenderQueue packs layer, program, texture and blend into one sort key;
+# layer must always win, and values that do not fit their bits must raise
+# instead of aliasing another slot. Nothing here touches GL.
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from OpenGL import GL as gl  # noqa: E402
+
+from matrix import Matrix  # noqa: E402
+from render_queue import RenderQueue  # noqa: E402
+
+INDICES = np.arange(6, dtype=np.uint32)
+IDENTITY = Matrix()
+
+def _program(name: int) -> SimpleNamespace:
+    # submit() only reads the GL program name
+    return SimpleNamespace(program=name)
+
+def _submit(queue: RenderQueue, program: SimpleNamespace, **kwargs) -> None:
+    queue.submit(program, 1, INDICES, gl.GL_TRIANGLES, 6, IDENTITY, IDENTITY, **kwargs)
+
+def test_key_orders_layer_then_program_then_texture():
+    # Program and texture slots are handed out in first-seen order
+    queue = RenderQueue(None)
+    first, second = _program(7), _program(3)
+    _submit(queue, first, texture_index=20, layer=1)
+    _submit(queue, second, texture_index=10, layer=0)
+    _submit(queue, first, texture_index=10, layer=-5)
+    _submit(queue, first, texture_index=30, layer=0)
+    _submit(queue, second, texture_index=20, layer=0)
+
+    ordered = sorted(queue.commands, key=lambda command: command.key)
+    assert [(command.program.program, command.texture_index) for command in ordered] == [
+        (7, 10),  # layer -5
+        (7, 30),  # layer 0, program 7 has slot 0
+        (3, 20),  # texture 20 has slot 0
+        (3, 10),
+        (7, 20),  # layer 1
+    ]
+
+def test_equal_keys_keep_submission_order():
+    queue = RenderQueue(None)
+    program = _program(1)
+    for first in (0, 6, 12):
+        queue.submit(program, 1, INDICES, gl.GL_TRIANGLES, 6, IDENTITY, IDENTITY, first=first)
+    ordered = sorted(queue.commands, key=lambda command: command.key)
+    assert [command.first for command in ordered] == [0, 6, 12]
+
+def test_layer_out_of_range_raises():
+    queue = RenderQueue(None)
+    program = _program(1)
+    _submit(queue, program, layer=RenderQueue.LAYER_MIN)
+    _submit(queue, program, layer=RenderQueue.LAYER_MAX)
+    with pytest.raises(ValueError):
+        _submit(queue, program, layer=RenderQueue.LAYER_MAX + 1)
+    with pytest.raises(ValueError):
+        _submit(queue, program, layer=RenderQueue.LAYER_MIN - 1)
+
+def test_slot_overflow_raises():
+    queue = RenderQueue(None)
+    for name in range(1, RenderQueue.PROGRAM_SLOTS + 1):
+        _submit(queue, _program(name))
+    with pytest.raises(ValueError):
+        _submit(queue, _program(RenderQueue.PROGRAM_SLOTS + 1))
+
+    # Slots are per frame; clear() (or flush()) frees them
+    queue.clear()
+    _submit(queue, _program(RenderQueue.PROGRAM_SLOTS + 1))
+
+    queue.clear()
+    program = _program(1)
+    for texture_index in range(RenderQueue.TEXTURE_SLOTS):
+        _submit(queue, program, texture_index=texture_index)
+    with pytest.raises(ValueError):
+        _submit(queue, program, texture_index=RenderQueue.TEXTURE_SLOTS)
+
+def test_matrices_are_required_and_copied():
+    queue = RenderQueue(None)
+    program = _program(1)
+    with pytest.raises(ValueError):
+        queue.submit(program, 1, INDICES, gl.GL_TRIANGLES, 6, None, IDENTITY)
+
+    model_view = Matrix()
+    queue.submit(program, 1, INDICES, gl.GL_TRIANGLES, 6, IDENTITY, model_view)
+    model_view.translate(5.0, 0.0, 0.0)
+    assert queue.commands[0].model_view.m[12] == 0.0
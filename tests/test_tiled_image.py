@@ -0,0 +1,73 @@
+# tests/test_tiled_image.py
+#
+# Pyramid levels of TiledImageSource are 2x2 box-filtered, sized
+# ceil(n / 2) per level, and built in row bands so a memory-mapped source
+# is streamed; banding must not change the result.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import headless_context  # noqa: E402
+headless_context.headless_platform_select()
+
+from tiled_image import TiledImageSource, downsample_box  # noqa: E402
+
+def _reference(pixels: np.ndarray) -> np.ndarray:
+    padded = pixels.astype(np.uint32)
+    if padded.shape[0] % 2:
+        padded = np.concatenate([padded, padded[-1:]], axis=0)
+    if padded.shape[1] % 2:
+        padded = np.concatenate([padded, padded[:, -1:]], axis=1)
+    summed = padded[0::2, 0::2] + padded[1::2, 0::2] + padded[0::2, 1::2] + padded[1::2, 1::2]
+    return ((summed + 2) // 4).astype(np.uint8)
+
+def test_downsample_box_averages_blocks():
+    pixels = np.array([[0, 10, 20, 30], [40, 50, 60, 71]], dtype=np.uint8)
+    assert downsample_box(pixels).tolist() == [[25, 45]]
+
+def test_downsample_box_odd_edge_averages_with_itself():
+    pixels = np.array([[10, 20, 200], [30, 40, 100], [7, 9, 255]], dtype=np.uint8)
+    result = downsample_box(pixels)
+    assert result.shape == (2, 2)
+    assert result.tolist() == [[25, 150], [8, 255]]
+
+def test_downsample_box_bands_match_one_pass():
+    rng = np.random.default_rng(5)
+    pixels = rng.integers(0, 256, size=(37, 23, 3), dtype=np.uint8)
+    expected = _reference(pixels)
+    assert (downsample_box(pixels) == expected).all()
+    # One output row per band
+    assert (downsample_box(pixels, band_bytes=1) == expected).all()
+
+def test_downsample_box_writes_into_memmap(tmp_path):
+    rng = np.random.default_rng(6)
+    source_path = os.path.join(tmp_path, "source.npy")
+    np.save(source_path, rng.integers(0, 256, size=(9, 11, 4), dtype=np.uint8))
+    source = np.load(source_path, mmap_mode="r")
+    out = np.lib.format.open_memmap(os.path.join(tmp_path, "out.npy"), mode="w+", dtype=np.uint8, shape=(5, 6, 4))
+    assert downsample_box(source, out, band_bytes=64) is out
+    assert (out == _reference(np.asarray(source))).all()
+
+def test_source_levels_and_tiles():
+    pixels = np.arange(10 * 7, dtype=np.uint8).reshape(10, 7)
+    source = TiledImageSource(pixels)
+    assert source.level_size(0) == (7, 10)
+    assert source.level_size(1) == (4, 5)
+    assert source.level_size(3) == (1, 2)
+    assert source.level_pixels(2).shape == (3, 2)
+    assert (source.level_pixels(1) == _reference(pixels)).all()
+    assert (source.read_tile(1, 2, 1, 2, 3) == _reference(pixels)[1:4, 2:4]).all()
+
+def test_source_levels_are_kept_in_level_directory(tmp_path):
+    rng = np.random.default_rng(7)
+    pixels = rng.integers(0, 256, size=(6, 9, 3), dtype=np.uint8)
+    first = TiledImageSource(pixels, level_directory=str(tmp_path)).level_pixels(2)
+    assert os.path.exists(os.path.join(tmp_path, "pyramid1.npy"))
+    assert os.path.exists(os.path.join(tmp_path, "pyramid2.npy"))
+
+    reopened = TiledImageSource(pixels, level_directory=str(tmp_path)).level_pixels(2)
+    assert isinstance(reopened, np.memmap)
+    assert (np.asarray(reopened) == np.asarray(first)).all()
@@ -0,0 +1,83 @@
+# tests/test_transform_node.py
+#
+# TransformNode caches parent.world * local and bumps version only when
+# it recomputes, so uniform uploads can be skipped; the cache must still
+# follow every change made through the node or any of its parents.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matrix import Matrix, MatrixStack, TransformNode  # noqa: E402
+
+def _translation(x: float, y: float) -> Matrix:
+    matrix = Matrix()
+    matrix.translation(x, y, 0.0)
+    return matrix
+
+def test_world_is_cached_until_something_changes():
+    root = TransformNode()
+    child = TransformNode(parent=root)
+    child.set_matrix(_translation(1.0, 2.0))
+
+    world = child.world
+    version = child.version
+    assert child.world is world
+    assert child.version == version
+
+    child.set_matrix(_translation(1.0, 2.0))  # same values
+    child.world
+    assert child.version == version
+
+def test_parent_change_reaches_child():
+    root = TransformNode()
+    child = TransformNode(parent=root)
+    child.set_matrix(_translation(1.0, 2.0))
+    child.world
+    version = child.version
+
+    root.set_matrix(_translation(10.0, 20.0))
+    assert child.version == version  # nothing computed yet
+    assert np.allclose(child.world.m[12:14], [11.0, 22.0])
+    assert child.version == version + 1
+
+def test_in_place_edit_needs_mark_dirty():
+    node = TransformNode()
+    node.world
+    version = node.version
+
+    node.local.translate(5.0, 0.0, 0.0)
+    node.mark_dirty()
+    assert node.world.m[12] == 5.0
+    assert node.version == version + 1
+
+def test_set_ortho_size_is_a_no_op_while_unchanged():
+    node = TransformNode()
+    node.set_ortho_size(640, 480)
+    node.world
+    version = node.version
+
+    node.set_ortho_size(640.0, 480.0)
+    node.world
+    assert node.version == version
+
+    node.set_ortho_size(800, 600)
+    expected = Matrix()
+    expected.ortho_size(800.0, 600.0)
+    assert (node.world.m == expected.m).all()
+    assert node.version == version + 1
+
+def test_matrix_stack_reuses_nodes_across_frames():
+    stack = MatrixStack()
+    stack.load(_translation(1.0, 0.0))
+
+    versions = []
+    for _ in range(2):
+        node = stack.push(_translation(0.0, 3.0))
+        assert np.allclose(stack.matrix.m[12:14], [1.0, 3.0])
+        versions.append(node.version)
+        stack.pop()
+    assert versions[0] == versions[1]
+    assert stack.depth == 0
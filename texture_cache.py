@@ -0,0 +1,270 @@
+# texture_cache.py
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional
+
+from graphics_library import GraphicsLibrary
+from graphics_texture import GraphicsTexture
+from texture_loader import TextureLoader, TextureRequest
+
+if TYPE_CHECKING:
+    from image_disk_cache import ImageDiskCache
+
+# Format part of the cache key; sizes come from the texture's own channels
+TEXTURE_FORMAT_RGBA8 = "RGBA8"
+
+TextureCacheKey = tuple[str, int, str]
+
+def texture_byte_size(texture: GraphicsTexture) -> int:
+    """
+    Estimated GPU bytes for a loaded texture (a mip chain adds a third).
+    """
+    size = int(texture.width) * int(texture.height) * int(texture.channels)
+    if texture.mipmaps:
+        size += size // 3
+    return size
+
+
+class _TextureCacheEntry:
+    __slots__ = ("key", "texture", "refcount", "pinned", "bytes", "request", "callbacks")
+
+    def __init__(self, key: TextureCacheKey, texture: GraphicsTexture) -> None:
+        self.key = key
+        self.texture = texture
+        self.refcount: int = 0
+        self.pinned: bool = False
+        self.bytes: int = 0
+        self.request: Optional[TextureRequest] = None
+        self.callbacks: list[Callable[[GraphicsTexture], None]] = []
+
+
+class TextureCache:
+    """
+    Shared, reference-counted textures keyed by (path, mtime, format).
+
+        texture = cache.acquire("scan_0001.png")
+        ...
+        cache.release(texture)
+
+    Acquiring the same unchanged file again returns the same
+    GraphicsTexture (a hit) instead of uploading it twice. Released
+    textures stay resident for instant revisits until the total estimated
+    size passes budget_bytes; then the least recently used textures that
+    are neither referenced nor pinned are deleted. Referenced textures
+    are never evicted, so the budget can be exceeded while they are held.
+
+    With a TextureLoader, misses load asynchronously (placeholder first)
+    and their size counts once the upload completes. With a disk_cache,
+    textures are created with it (and with mipmaps if asked) so misses
+    map previously decoded pixels instead of decoding the file again.
+    """
+
+    def __init__(
+        self,
+        graphics: GraphicsLibrary,
+        budget_bytes: int = 512 * 1024 * 1024,
+        loader: Optional[TextureLoader] = None,
+        disk_cache: Optional["ImageDiskCache"] = None,
+        mipmaps: bool = False,
+    ) -> None:
+        self.graphics = graphics
+        self.budget_bytes = int(budget_bytes)
+        self.loader = loader
+        self.disk_cache = disk_cache
+        self.mipmaps = mipmaps
+
+        # Least recently used first
+        self.entries: "OrderedDict[TextureCacheKey, _TextureCacheEntry]" = OrderedDict()
+        self._by_texture: dict[int, _TextureCacheEntry] = {}
+
+        self.bytes: int = 0
+        self.peak_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.evicted_bytes: int = 0
+
+    @staticmethod
+    def key_for(file_name: str, format: str = TEXTURE_FORMAT_RGBA8) -> TextureCacheKey:
+        path = os.path.realpath(os.fspath(file_name))
+        return (path, os.stat(path).st_mtime_ns, format)
+
+    # ----------------------------------------------------------------------
+    # Acquire / release
+    # ----------------------------------------------------------------------
+
+    def acquire(
+        self,
+        file_name: str,
+        pin: bool = False,
+        priority: int = 0,
+        on_loaded: Optional[Callable[[GraphicsTexture], None]] = None,
+    ) -> GraphicsTexture:
+        """
+        Texture for file_name with one more reference. on_loaded(texture)
+        runs once it holds the real image (immediately on a loaded hit).
+        """
+        key = self.key_for(file_name)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            if entry.request is not None and self.loader is not None:
+                # Revisited while still loading: bump it to the front
+                self.loader.set_priority(entry.request, max(entry.request.priority, priority))
+        else:
+            self.misses += 1
+            self._evict_stale(key)
+            entry = self._load(key, priority)
+
+        entry.refcount += 1
+        if pin:
+            entry.pinned = True
+        if on_loaded is not None:
+            if entry.request is None:
+                on_loaded(entry.texture)
+            else:
+                entry.callbacks.append(on_loaded)
+        return entry.texture
+
+    def release(self, texture: GraphicsTexture) -> None:
+        entry = self._by_texture.get(id(texture))
+        if entry is None or entry.refcount == 0:
+            return
+        entry.refcount -= 1
+        if entry.refcount == 0:
+            if entry.request is not None and self.loader is not None:
+                # Nobody is waiting for it any more
+                self.loader.cancel(entry.request)
+                self._remove(entry)
+                return
+            self.evict()
+
+    def pin(self, texture: GraphicsTexture) -> None:
+        entry = self._by_texture.get(id(texture))
+        if entry is not None:
+            entry.pinned = True
+
+    def unpin(self, texture: GraphicsTexture) -> None:
+        entry = self._by_texture.get(id(texture))
+        if entry is not None and entry.pinned:
+            entry.pinned = False
+            self.evict()
+
+    # ----------------------------------------------------------------------
+    # Eviction
+    # ----------------------------------------------------------------------
+
+    def evict(self, budget_bytes: Optional[int] = None) -> None:
+        """
+        Delete least recently used evictable textures until the total is
+        within budget_bytes (default: self.budget_bytes).
+        """
+        budget = self.budget_bytes if budget_bytes is None else int(budget_bytes)
+        if self.bytes <= budget:
+            return
+        for entry in list(self.entries.values()):
+            if self.bytes <= budget:
+                break
+            if entry.refcount > 0 or entry.pinned or entry.request is not None:
+                continue
+            self.evictions += 1
+            self.evicted_bytes += entry.bytes
+            self._remove(entry)
+
+    def clear(self) -> None:
+        """
+        Delete every texture, referenced or not (e.g. at shutdown).
+        """
+        for entry in list(self.entries.values()):
+            if entry.request is not None and self.loader is not None:
+                self.loader.cancel(entry.request)
+            self._remove(entry)
+
+    def _evict_stale(self, key: TextureCacheKey) -> None:
+        # Older versions of a file that changed on disk can never hit again
+        path = key[0]
+        for entry in list(self.entries.values()):
+            if entry.key[0] == path and entry.key != key and entry.refcount == 0 and not entry.pinned:
+                self.evictions += 1
+                self.evicted_bytes += entry.bytes
+                self._remove(entry)
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    def _load(self, key: TextureCacheKey, priority: int) -> _TextureCacheEntry:
+        texture = GraphicsTexture(graphics=self.graphics, disk_cache=self.disk_cache, mipmaps=self.mipmaps)
+        texture.file_name = key[0]
+        entry = _TextureCacheEntry(key, texture)
+        self.entries[key] = entry
+        self._by_texture[id(texture)] = entry
+
+        if self.loader is not None:
+            entry.request = self.loader.load(
+                texture,
+                priority=priority,
+                on_loaded=lambda request: self._loaded(entry, request),
+            )
+        else:
+            texture.load()
+            self._account(entry)
+        return entry
+
+    def _loaded(self, entry: _TextureCacheEntry, request: TextureRequest) -> None:
+        if entry.request is not request:
+            return
+        entry.request = None
+        if entry.texture.placeholder:
+            # Failed: drop it so the next acquire retries
+            self._remove(entry)
+            return
+        self._account(entry)
+        callbacks = entry.callbacks
+        entry.callbacks = []
+        for callback in callbacks:
+            callback(entry.texture)
+
+    def _account(self, entry: _TextureCacheEntry) -> None:
+        entry.bytes = texture_byte_size(entry.texture)
+        self.bytes += entry.bytes
+        self.peak_bytes = max(self.peak_bytes, self.bytes)
+        self.evict()
+
+    def _remove(self, entry: _TextureCacheEntry) -> None:
+        self.entries.pop(entry.key, None)
+        self._by_texture.pop(id(entry.texture), None)
+        self.bytes -= entry.bytes
+        entry.bytes = 0
+        entry.request = None
+        entry.callbacks = []
+        entry.texture.unload()
+
+    # ----------------------------------------------------------------------
+    # Stats
+    # ----------------------------------------------------------------------
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "textures": len(self.entries),
+            "bytes": self.bytes,
+            "peak_bytes": self.peak_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+    def print(self) -> None:
+        stats = self.stats()
+        print("TextureCache -> [" + str(stats["textures"]) + " textures]")
+        print(f"\tBytes: {stats['bytes']} / {stats['budget_bytes']} (peak {stats['peak_bytes']})")
+        print(f"\tHits: {stats['hits']} Misses: {stats['misses']} ({stats['hit_rate'] * 100.0:.1f}%)")
+        print(f"\tEvictions: {stats['evictions']} ({stats['evicted_bytes']} bytes)")
@@ -0,0 +1,409 @@
+# texture_loader.py
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+
+from graphics_library import GraphicsLibrary, texture_pixel_channels
+from graphics_texture import GraphicsTexture, decode_image
+from image_memmap import map_image
+from redraw_scheduler import RedrawScheduler
+
+import tracing
+
+# TextureRequest.state
+TEXTURE_REQUEST_QUEUED = 0
+TEXTURE_REQUEST_DECODING = 1
+TEXTURE_REQUEST_DECODED = 2
+TEXTURE_REQUEST_UPLOADING = 3
+TEXTURE_REQUEST_DONE = 4
+TEXTURE_REQUEST_CANCELLED = 5
+TEXTURE_REQUEST_FAILED = 6
+
+class TextureRequest:
+    """
+    One asynchronous texture load, returned by TextureLoader.load().
+    The texture shows the loader's placeholder until state is DONE.
+    """
+
+    __slots__ = (
+        "texture",
+        "file_name",
+        "decode",
+        "priority",
+        "sequence",
+        "state",
+        "bitmap",
+        "mip_levels",
+        "texture_index",
+        "upload_level",
+        "upload_row",
+        "error",
+        "on_loaded",
+    )
+
+    def __init__(
+        self,
+        texture: GraphicsTexture,
+        priority: int,
+        sequence: int,
+        on_loaded: Optional[Callable[["TextureRequest"], None]],
+        decode: Optional[Callable[[], np.ndarray]] = None,
+    ) -> None:
+        self.texture = texture
+        self.file_name = texture.file_name
+        self.decode = decode
+        self.priority = int(priority)
+        self.sequence = sequence
+        self.state: int = TEXTURE_REQUEST_QUEUED
+        self.bitmap: Optional[np.ndarray] = None
+        # Levels 1..N from the texture's disk cache, uploaded after level 0
+        self.mip_levels: list[np.ndarray] = []
+        self.texture_index: int = -1
+        # Next band to upload: mip level (0 = bitmap) and its first row
+        self.upload_level: int = 0
+        self.upload_row: int = 0
+        self.error: Optional[BaseException] = None
+        self.on_loaded = on_loaded
+
+    @property
+    def finished(self) -> bool:
+        return self.state >= TEXTURE_REQUEST_DONE
+
+
+class TextureLoader:
+    """
+    Decodes image files on a thread pool and uploads them on the GL thread.
+
+    - load() returns at once; the GraphicsTexture gets a shared
+      placeholder texture until its upload completes.
+    - Workers always decode the highest-priority queued request next
+      (ties in submission order); set_priority() re-orders queued and
+      decoded-but-not-uploaded requests.
+    - update(), called once per frame on the GL thread, uploads decoded
+      images in row bands with glTexSubImage2D, stopping once either the
+      byte or the time budget for the frame is spent. Large images are
+      spread over several frames instead of stalling one.
+    - cancel() drops a request at any stage.
+    - .npy and uncompressed TIFF files are memory-mapped, not decoded;
+      textures with a disk_cache are mapped from it, and their cached mip
+      levels follow level 0 as further bands under the same budget. Gray
+      and RGB pixels are uploaded as they are, without an RGBA copy.
+
+    With a scheduler, finished decodes wake the main loop and pending
+    uploads keep requesting frames until they are done.
+    """
+
+    def __init__(
+        self,
+        graphics: GraphicsLibrary,
+        max_workers: int = 4,
+        upload_budget_bytes: int = 16 * 1024 * 1024,
+        upload_budget_ms: float = 4.0,
+    ) -> None:
+        self.graphics = graphics
+        self.upload_budget_bytes = int(upload_budget_bytes)
+        self.upload_budget_ms = float(upload_budget_ms)
+        self.scheduler: Optional[RedrawScheduler] = None
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="TextureLoader")
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        # (-priority, sequence, request); stale entries are skipped
+        self._decode_heap: list[tuple[int, int, TextureRequest]] = []
+        self._decoded: "queue.Queue[TextureRequest]" = queue.Queue()
+        self._uploads: list[TextureRequest] = []
+        self._active: set[TextureRequest] = set()
+
+        self.placeholder_index: int = -1
+
+        self.decoded_count: int = 0
+        self.uploaded_count: int = 0
+        self.bytes_uploaded: int = 0
+
+    def attach_scheduler(self, scheduler: RedrawScheduler) -> None:
+        self.scheduler = scheduler
+
+    @property
+    def busy(self) -> bool:
+        return any(not request.finished for request in self._active)
+
+    # ----------------------------------------------------------------------
+    # Requests
+    # ----------------------------------------------------------------------
+
+    def load(
+        self,
+        texture: GraphicsTexture,
+        priority: int = 0,
+        on_loaded: Optional[Callable[[TextureRequest], None]] = None,
+        decode: Optional[Callable[[], np.ndarray]] = None,
+    ) -> TextureRequest:
+        """
+        Start loading texture.file_name. on_loaded(request) runs on the GL
+        thread, from update(), once the texture is ready (or failed).
+
+        decode, if given, replaces the file read: it runs on a worker and
+        returns (H, W) or (H, W, 1..4) uint8 pixels (e.g. one tile of a
+        larger image; a row-strided view is uploaded without a copy).
+        """
+        texture.unload()
+        texture.graphics = self.graphics
+        texture.texture_index = self._placeholder()
+        texture.placeholder = True
+
+        request = TextureRequest(texture, priority, next(self._sequence), on_loaded, decode)
+        self._active.add(request)
+        with self._lock:
+            heapq.heappush(self._decode_heap, (-request.priority, request.sequence, request))
+        self._executor.submit(self._decode_next)
+        return request
+
+    def set_priority(self, request: TextureRequest, priority: int) -> None:
+        priority = int(priority)
+        with self._lock:
+            if request.priority == priority:
+                return
+            request.priority = priority
+            if request.state == TEXTURE_REQUEST_QUEUED:
+                # The old heap entry goes stale and is skipped when popped
+                request.sequence = next(self._sequence)
+                heapq.heappush(self._decode_heap, (-priority, request.sequence, request))
+
+    def cancel(self, request: TextureRequest) -> None:
+        """
+        Drop request. The texture keeps the placeholder; a partially
+        uploaded GL texture is freed by the next update().
+        """
+        with self._lock:
+            if request.finished:
+                return
+            request.state = TEXTURE_REQUEST_CANCELLED
+            if request.texture_index == -1:
+                request.bitmap = None
+
+    def cancel_all(self) -> None:
+        for request in list(self._active):
+            self.cancel(request)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.update()
+        if self.placeholder_index != -1:
+            self.graphics.texture_delete(self.placeholder_index)
+            self.placeholder_index = -1
+
+    # ----------------------------------------------------------------------
+    # Worker side
+    # ----------------------------------------------------------------------
+
+    def _decode_next(self) -> None:
+        with self._lock:
+            request = None
+            while self._decode_heap:
+                _, sequence, candidate = heapq.heappop(self._decode_heap)
+                if candidate.state == TEXTURE_REQUEST_QUEUED and candidate.sequence == sequence:
+                    request = candidate
+                    break
+            if request is None:
+                return
+            request.state = TEXTURE_REQUEST_DECODING
+
+        bitmap = None
+        mip_levels = []
+        disk_cache = request.texture.disk_cache
+        try:
+            with tracing.span(f"decode {request.file_name}", "loader"):
+                if request.decode is not None:
+                    bitmap = np.asarray(request.decode(), dtype=np.uint8)
+                else:
+                    bitmap = map_image(request.file_name)
+                if bitmap is None and disk_cache is not None:
+                    levels = disk_cache.load(request.file_name, mipmaps=request.texture.mipmaps)
+                    bitmap = levels[0]
+                    mip_levels = levels[1:]
+                elif bitmap is None:
+                    bitmap = decode_image(request.file_name)
+        except Exception as e:
+            request.error = e
+
+        with self._lock:
+            if request.state == TEXTURE_REQUEST_DECODING:
+                request.bitmap = bitmap
+                request.mip_levels = mip_levels
+                request.state = TEXTURE_REQUEST_DECODED
+
+        self._decoded.put(request)
+        if self.scheduler is not None:
+            self.scheduler.request_redraw()
+
+    # ----------------------------------------------------------------------
+    # GL thread
+    # ----------------------------------------------------------------------
+
+    def update(self) -> None:
+        """
+        Upload decoded images within this frame's budget.
+        """
+        self._drain_decoded()
+        if not self._uploads:
+            return
+
+        with tracing.span("TextureLoader.update"):
+            start = time.perf_counter()
+            deadline = start + self.upload_budget_ms / 1000.0
+            budget = self.upload_budget_bytes
+
+            self._uploads.sort(key=lambda request: (-request.priority, request.sequence))
+            while self._uploads and budget > 0 and time.perf_counter() < deadline:
+                request = self._uploads[0]
+                if request.state == TEXTURE_REQUEST_CANCELLED:
+                    self._upload_discard(request)
+                    self._uploads.pop(0)
+                    continue
+                budget -= self._upload_rows(request, budget)
+                if request.finished:
+                    self._uploads.pop(0)
+            self._active = {request for request in self._active if not request.finished}
+
+        if self._uploads and self.scheduler is not None:
+            self.scheduler.request_redraw()
+
+    def finish_all(self) -> None:
+        """
+        Block until every queued load is decoded and uploaded (batch use).
+        """
+        while self.busy or self._uploads:
+            self._drain_decoded(block=True)
+            for request in self._uploads:
+                if request.state == TEXTURE_REQUEST_CANCELLED:
+                    self._upload_discard(request)
+                    continue
+                while not request.finished:
+                    self._upload_rows(request, 1 << 62)
+            self._uploads = []
+        self._active = set()
+
+    def wait_decoded(self) -> None:
+        """
+        Block until every queued load is decoded and waiting for update()
+        (or has failed). Nothing is uploaded; update() still does that
+        within its budget.
+        """
+        while any(
+            not request.finished and request not in self._uploads
+            for request in self._active
+        ):
+            self._drain_decoded(block=True)
+
+    def _drain_decoded(self, block: bool = False) -> None:
+        while True:
+            try:
+                request = self._decoded.get(block=block, timeout=0.05 if block else None)
+            except queue.Empty:
+                return
+            block = False
+            self.decoded_count += 1
+            if request.state == TEXTURE_REQUEST_CANCELLED:
+                request.bitmap = None
+                continue
+            if request.state != TEXTURE_REQUEST_DECODED or request.bitmap is None:
+                request.state = TEXTURE_REQUEST_FAILED
+                print(f"[TextureLoader] Failed to load {request.file_name}: {request.error}")
+                self._notify(request)
+                continue
+            self._uploads.append(request)
+
+    def _upload_rows(self, request: TextureRequest, budget: int) -> int:
+        """
+        Upload as many rows of request's current level as fit in budget
+        bytes (at least one). Returns the bytes uploaded.
+        """
+        graphics = self.graphics
+        bitmap = request.bitmap
+        channels = texture_pixel_channels(bitmap)
+
+        if request.state == TEXTURE_REQUEST_DECODED:
+            with self._lock:
+                if request.state == TEXTURE_REQUEST_CANCELLED:
+                    return 0
+                request.state = TEXTURE_REQUEST_UPLOADING
+            request.texture_index = graphics.texture_generate_empty(bitmap.shape[1], bitmap.shape[0], channels)
+            for level, pixels in enumerate(request.mip_levels, start=1):
+                graphics.texture_allocate_level(request.texture_index, level, pixels.shape[1], pixels.shape[0], channels)
+            request.upload_level = 0
+            request.upload_row = 0
+
+        pixels = bitmap if request.upload_level == 0 else request.mip_levels[request.upload_level - 1]
+        height, width = pixels.shape[0], pixels.shape[1]
+        row_bytes = max(1, width * channels)
+        rows = max(1, min(height - request.upload_row, budget // row_bytes))
+        first = request.upload_row
+        band = pixels[first:first + rows]
+
+        graphics.texture_upload_pixels(request.texture_index, band, y=first, level=request.upload_level)
+        request.upload_row += rows
+        uploaded = band.nbytes
+        self.bytes_uploaded += uploaded
+
+        if request.upload_row >= height:
+            if request.upload_level < len(request.mip_levels):
+                request.upload_level += 1
+                request.upload_row = 0
+            else:
+                self._upload_complete(request)
+        return uploaded
+
+    def _upload_complete(self, request: TextureRequest) -> None:
+        texture = request.texture
+        height, width = request.bitmap.shape[0], request.bitmap.shape[1]
+        if request.mip_levels:
+            self.graphics.texture_set_mip_levels(request.texture_index, len(request.mip_levels))
+        elif texture.mipmaps:
+            self.graphics.texture_generate_mipmap(request.texture_index)
+        texture.texture_index = request.texture_index
+        texture.placeholder = False
+        texture.channels = texture_pixel_channels(request.bitmap)
+        texture.width = width
+        texture.height = height
+        texture.widthf = float(width)
+        texture.heightf = float(height)
+        request.bitmap = None
+        request.mip_levels = []
+        request.state = TEXTURE_REQUEST_DONE
+        self.uploaded_count += 1
+        self._notify(request)
+
+    def _upload_discard(self, request: TextureRequest) -> None:
+        if request.texture_index != -1:
+            self.graphics.texture_delete(request.texture_index)
+            request.texture_index = -1
+        request.bitmap = None
+        request.mip_levels = []
+
+    def _notify(self, request: TextureRequest) -> None:
+        if request.on_loaded is not None:
+            request.on_loaded(request)
+        if self.scheduler is not None:
+            self.scheduler.request_redraw()
+
+    def _placeholder(self) -> int:
+        if self.placeholder_index == -1:
+            pixels = np.full((1, 1, 4), (128, 128, 128, 255), dtype=np.uint8)
+            self.placeholder_index = self.graphics.texture_generate_from_bitmap(pixels)
+        return self.placeholder_index
+
+    def print(self) -> None:
+        print("TextureLoader -> [" + str(self.uploaded_count) + " uploaded]")
+        print("\tDecoded: " + str(self.decoded_count))
+        print("\tBytes: " + str(self.bytes_uploaded))
+        print("\tPending uploads: " + str(len(self._uploads)))
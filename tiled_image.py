@@ -0,0 +1,451 @@
+# tiled_image.py
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Optional
+
+import numpy as np
+from OpenGL import GL as gl
+from PIL import Image
+
+from graphics_array_buffer import GraphicsArrayBuffer
+from graphics_index_buffer import GraphicsIndexBuffer
+from graphics_library import GraphicsLibrary, BLEND_MODE_DISABLED
+from graphics_texture import GraphicsTexture
+from image_disk_cache import ImageDiskCache
+from image_memmap import map_image
+from matrix import Matrix
+from shader_program import ShaderProgram
+from texture_loader import TextureLoader, TextureRequest
+from vertex_array import unit_quad_sprite_vertices
+
+import tracing
+
+TileKey = tuple[int, int, int]  # (level, tile_x, tile_y)
+
+def downsample_box(pixels: np.ndarray, out: Optional[np.ndarray] = None, band_bytes: int = 64 * 1024 * 1024) -> np.ndarray:
+    """
+    (H, W[, C]) uint8 -> (ceil(H / 2), ceil(W / 2)[, C]), each output pixel
+    the rounded mean of its 2x2 block (an odd last row / column averages
+    with itself). Works in row bands of about band_bytes, so a memmap
+    source or out is streamed rather than held in memory.
+    """
+    height, width = pixels.shape[0], pixels.shape[1]
+    out_height, out_width = (height + 1) // 2, (width + 1) // 2
+    if out is None:
+        out = np.empty((out_height, out_width) + pixels.shape[2:], dtype=np.uint8)
+    row_bytes = max(1, pixels[0:1].size * 2 * 2)  # two uint16 source rows per output row
+    band_rows = max(1, band_bytes // row_bytes)
+    for row in range(0, out_height, band_rows):
+        rows = min(band_rows, out_height - row)
+        band = np.asarray(pixels[row * 2:(row + rows) * 2], dtype=np.uint16)
+        if band.shape[0] < rows * 2:
+            band = np.concatenate([band, band[-1:]], axis=0)
+        if width % 2:
+            band = np.concatenate([band, band[:, -1:]], axis=1)
+        summed = band[0::2, 0::2] + band[1::2, 0::2] + band[0::2, 1::2] + band[1::2, 1::2]
+        out[row:row + rows] = (summed + 2) // 4
+    return out
+
+
+class TiledImageSource:
+    """
+    Random access to the pixels of a (possibly huge) image.
+
+    pixels is any (H, W[, C]) uint8 array; a np.memmap works and only the
+    rows a tile needs are read. Level L is a 2x2 box-filtered copy of
+    level L - 1, built the first time a tile of level L (or finer) is
+    read. Building reads the whole source once and writes about a third
+    of its size again; with level_directory the levels are memory-mapped
+    .npy files there and survive restarts, otherwise they live in memory.
+    After that every tile is a view of its level's rows.
+    """
+
+    def __init__(self, pixels: np.ndarray, level_directory: Optional[str] = None) -> None:
+        if pixels.dtype != np.uint8 or pixels.ndim not in (2, 3):
+            raise ValueError(f"TiledImageSource expects (H, W[, C]) uint8, got {pixels.dtype} {pixels.shape}")
+        self.pixels = pixels
+        self.height: int = int(pixels.shape[0])
+        self.width: int = int(pixels.shape[1])
+        self.channels: int = 1 if pixels.ndim == 2 else int(pixels.shape[2])
+
+        self.level_directory = level_directory
+        self._levels: list[np.ndarray] = [pixels]
+        # Tiles are read from loader workers; levels are built once
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, file_name: str, disk_cache: Optional[ImageDiskCache] = None) -> "TiledImageSource":
+        """
+        .npy and uncompressed TIFF files are memory-mapped; anything else
+        is decoded by PIL. With a disk_cache the pyramid levels are kept in
+        the file's cache entry (the first open hashes the whole file).
+        """
+        level_directory = disk_cache.entry_directory_for(file_name) if disk_cache is not None else None
+        pixels = map_image(file_name)
+        if pixels is not None:
+            return cls(pixels, level_directory)
+        with Image.open(file_name) as img:
+            if img.mode not in ("L", "RGB", "RGBA"):
+                img = img.convert("RGBA")
+            return cls(np.asarray(img), level_directory)
+
+    def level_size(self, level: int) -> tuple[int, int]:
+        step = 1 << level
+        return (self.width + step - 1) // step, (self.height + step - 1) // step
+
+    def level_pixels(self, level: int) -> np.ndarray:
+        """
+        All pixels of level, building it (and the levels before it) if needed.
+        """
+        with self._lock:
+            while len(self._levels) <= level:
+                self._levels.append(self._build_level(len(self._levels)))
+            return self._levels[level]
+
+    def read_tile(self, level: int, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Pixels of the level-space rect (x, y, width, height) in the
+        source's channel layout: a row-strided view of the level, uploaded
+        from it without a copy.
+        """
+        return self.level_pixels(level)[y:y + height, x:x + width]
+
+    def _build_level(self, level: int) -> np.ndarray:
+        previous = self._levels[level - 1]
+        width, height = self.level_size(level)
+        shape = (height, width) + previous.shape[2:]
+        if self.level_directory is None:
+            with tracing.span(f"TiledImageSource.build level {level}", "loader"):
+                return downsample_box(previous)
+
+        path = os.path.join(self.level_directory, f"pyramid{level}.npy")
+        if os.path.exists(path):
+            pixels = np.load(path, mmap_mode="r")
+            if pixels.shape == shape and pixels.dtype == np.uint8:
+                return pixels
+        with tracing.span(f"TiledImageSource.build level {level}", "loader"):
+            temporary = f"{path}.{os.getpid()}.tmp"
+            out = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.uint8, shape=shape)
+            downsample_box(previous, out)
+            out.flush()
+            del out
+            os.replace(temporary, path)
+        return np.load(path, mmap_mode="r")
+
+
+class _Tile:
+    __slots__ = ("key", "texture", "request", "rect", "bytes")
+
+    def __init__(self, key: TileKey, rect: tuple[float, float, float, float]) -> None:
+        self.key = key
+        self.texture = GraphicsTexture()
+        self.request: Optional[TextureRequest] = None
+        self.rect = rect  # image space x, y, width, height
+        self.bytes: int = 0
+
+
+class TiledImage:
+    """
+    Draws an image of any size as a pyramid of fixed-size tile textures.
+
+        image = TiledImage(TiledImageSource.from_file("slide.npy"))
+        image.load(graphics, pipeline.program_sprite2d, texture_loader)
+        ...
+        image.update(projection, model_view)    # once per frame
+        image.draw(projection, model_view)
+
+    The image occupies (0, 0)..(width, height) in model space, y down.
+    update() inverts projection * model_view to find the visible image
+    rect, picks the level whose texels are closest to one screen pixel,
+    and requests every visible tile of that level and all coarser levels;
+    coarse levels load first (higher loader priority). Tiles that leave
+    the view are cancelled if still loading, and resident tiles beyond
+    budget_bytes are evicted least recently used first.
+
+    draw() paints resident tiles coarsest level first, so missing fine
+    tiles show the blurrier level beneath them instead of holes.
+    """
+
+    def __init__(
+        self,
+        source: TiledImageSource,
+        tile_size: int = 512,
+        budget_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.source = source
+        self.tile_size = int(tile_size)
+        self.budget_bytes = int(budget_bytes)
+        self.blend_mode: int = BLEND_MODE_DISABLED
+
+        self.width: int = source.width
+        self.height: int = source.height
+        self.levels: int = 1
+        while max(source.level_size(self.levels - 1)) > self.tile_size:
+            self.levels += 1
+
+        self.graphics: Optional[GraphicsLibrary] = None
+        self.program: Optional[ShaderProgram] = None
+        self.loader: Optional[TextureLoader] = None
+        self.quad_buffer = GraphicsArrayBuffer()
+        self.index_buffer = GraphicsIndexBuffer()
+
+        # Resident and loading tiles, least recently wanted first
+        self.tiles: "OrderedDict[TileKey, _Tile]" = OrderedDict()
+        self.draw_list: list[_Tile] = []
+        self.bytes: int = 0
+        self.level: int = 0
+        self._tile_matrix = Matrix()
+
+        # Stats from the last update() / draw()
+        self.tiles_visible: int = 0
+        self.tiles_requested: int = 0
+        self.tiles_drawn: int = 0
+        self.tiles_evicted: int = 0
+
+    def load(
+        self,
+        graphics: GraphicsLibrary,
+        program: Optional[ShaderProgram],
+        loader: Optional[TextureLoader] = None,
+    ) -> None:
+        """
+        Without a loader, tiles are read and uploaded synchronously in update().
+        """
+        self.graphics = graphics
+        self.program = program
+        self.loader = loader
+        self.quad_buffer.load(graphics, unit_quad_sprite_vertices())
+        self.index_buffer.load(graphics, [0, 1, 2, 3])
+
+    def unload(self) -> None:
+        for tile in list(self.tiles.values()):
+            self._tile_remove(tile)
+        if self.graphics is not None and self.quad_buffer.buffer_index != -1:
+            self.graphics.buffer_array_delete(self.quad_buffer.buffer_index)
+            self.quad_buffer.buffer_index = -1
+        self.index_buffer.unload()
+        self.draw_list = []
+
+    # ----------------------------------------------------------------------
+    # Visibility
+    # ----------------------------------------------------------------------
+
+    def visible_rect(
+        self,
+        projection: Matrix,
+        model_view: Matrix,
+    ) -> Optional[tuple[float, float, float, float]]:
+        """
+        Image-space (x0, y0, x1, y1) covered by the viewport, clamped to
+        the image, or None if nothing is visible.
+        """
+        transform = self._clip_transform(projection, model_view)
+        linear = transform[0:2, 0:2]
+        if abs(np.linalg.det(linear)) < 1e-12:
+            return None
+        inverse = np.linalg.inv(linear)
+        corners = np.array([[-1.0, -1.0], [1.0, -1.0], [-1.0, 1.0], [1.0, 1.0]])
+        points = (corners - transform[0:2, 3]) @ inverse.T
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        x0 = max(x0, 0.0)
+        y0 = max(y0, 0.0)
+        x1 = min(x1, float(self.width))
+        y1 = min(y1, float(self.height))
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return (x0, y0, x1, y1)
+
+    def level_for(self, projection: Matrix, model_view: Matrix) -> int:
+        """
+        Coarsest pyramid level whose texels are still no larger than one
+        screen pixel at the current zoom, so drawing it never magnifies.
+        """
+        graphics = self.graphics
+        transform = self._clip_transform(projection, model_view)
+        # Image pixel -> screen pixel scale (geometric mean of both axes)
+        screen = transform[0:2, 0:2] * np.array([[graphics.width * 0.5], [graphics.height * 0.5]])
+        scale = math.sqrt(abs(float(np.linalg.det(screen))))
+        if scale <= 0.0:
+            return self.levels - 1
+        level = int(math.floor(math.log2(1.0 / scale))) if scale < 1.0 else 0
+        return max(0, min(self.levels - 1, level))
+
+    @staticmethod
+    def _clip_transform(projection: Matrix, model_view: Matrix) -> np.ndarray:
+        # Column-major storage: reshape gives the transpose
+        return projection.m.reshape(4, 4).T.astype(np.float64) @ model_view.m.reshape(4, 4).T.astype(np.float64)
+
+    def _tiles_in_rect(self, level: int, rect: tuple[float, float, float, float]) -> list[TileKey]:
+        span = float(self.tile_size << level)
+        level_width, level_height = self.source.level_size(level)
+        tiles_x = (level_width + self.tile_size - 1) // self.tile_size
+        tiles_y = (level_height + self.tile_size - 1) // self.tile_size
+        x0, y0, x1, y1 = rect
+        first_x = max(0, int(x0 // span))
+        first_y = max(0, int(y0 // span))
+        last_x = min(tiles_x - 1, int(math.ceil(x1 / span)) - 1)
+        last_y = min(tiles_y - 1, int(math.ceil(y1 / span)) - 1)
+        return [
+            (level, tile_x, tile_y)
+            for tile_y in range(first_y, last_y + 1)
+            for tile_x in range(first_x, last_x + 1)
+        ]
+
+    # ----------------------------------------------------------------------
+    # Per frame
+    # ----------------------------------------------------------------------
+
+    def update(self, projection: Matrix, model_view: Matrix) -> None:
+        if self.graphics is None:
+            return
+        with tracing.span("TiledImage.update"):
+            rect = self.visible_rect(projection, model_view)
+            wanted: list[TileKey] = []
+            if rect is not None:
+                self.level = self.level_for(projection, model_view)
+                for level in range(self.levels - 1, self.level - 1, -1):
+                    wanted.extend(self._tiles_in_rect(level, rect))
+            wanted_set = set(wanted)
+
+            # Loads for tiles that scrolled out of view are not worth finishing
+            for tile in list(self.tiles.values()):
+                if tile.request is not None and tile.key not in wanted_set:
+                    self._tile_remove(tile)
+
+            self.tiles_requested = 0
+            self.draw_list = []
+            for key in wanted:
+                tile = self.tiles.get(key)
+                if tile is None:
+                    tile = self._tile_request(key)
+                    self.tiles_requested += 1
+                else:
+                    self.tiles.move_to_end(key)
+                if tile.request is None and tile.texture.texture_index != -1:
+                    self.draw_list.append(tile)
+            self.tiles_visible = len(wanted)
+
+            self._evict(wanted_set)
+
+    def draw(self, projection: Matrix, model_view: Matrix) -> None:
+        graphics = self.graphics
+        program = self.program
+        self.tiles_drawn = 0
+        if graphics is None or program is None or not self.draw_list:
+            return
+
+        with tracing.span("TiledImage.draw"):
+            graphics.blend_set_mode(self.blend_mode)
+            graphics.link_buffer_to_shader_program_array_buffer(program, self.quad_buffer)
+            graphics.uniforms_modulate_color_set(program, r=1.0, g=1.0, b=1.0, a=1.0)
+            graphics.uniforms_projection_matrix_set(program, projection)
+
+            tile_matrix = self._tile_matrix
+            for tile in self.draw_list:
+                x, y, width, height = tile.rect
+                tile_matrix.make_matrix(model_view)
+                tile_matrix.translate(x=x + width * 0.5, y=y + height * 0.5, z=0.0)
+                tile_matrix.scale_xyz(width, height, 1.0)
+
+                graphics.uniforms_texture_set_index(program, tile.texture.texture_index)
+                graphics.uniforms_model_view_matrix_set(program, tile_matrix)
+                graphics.draw_primitives(
+                    index_buffer=self.index_buffer,
+                    primitive_type=gl.GL_TRIANGLE_STRIP,
+                    count=4,
+                )
+                self.tiles_drawn += 1
+            graphics.unlink_buffer_from_shader_program(program)
+
+    # ----------------------------------------------------------------------
+    # Tiles
+    # ----------------------------------------------------------------------
+
+    def _tile_request(self, key: TileKey) -> _Tile:
+        level, tile_x, tile_y = key
+        level_width, level_height = self.source.level_size(level)
+        x = tile_x * self.tile_size
+        y = tile_y * self.tile_size
+        width = min(self.tile_size, level_width - x)
+        height = min(self.tile_size, level_height - y)
+
+        # Image-space extent at the texture's own scale (one texel = step
+        # pixels), so edge tiles are not squeezed. On an odd-sized level the
+        # last texel overhangs the image edge by less than one texel.
+        step = 1 << level
+        rect = (
+            float(x * step),
+            float(y * step),
+            float(width * step),
+            float(height * step),
+        )
+        tile = _Tile(key, rect)
+        self.tiles[key] = tile
+
+        decode = partial(self.source.read_tile, level, x, y, width, height)
+        if self.loader is not None:
+            tile.texture.file_name = f"tile {level}/{tile_x}/{tile_y}"
+            # Coarse levels first; they cover the most screen per byte
+            tile.request = self.loader.load(
+                tile.texture,
+                priority=level,
+                on_loaded=partial(self._tile_loaded, tile),
+                decode=decode,
+            )
+        else:
+            tile.texture.graphics = self.graphics
+            tile.texture.texture_index = self.graphics.texture_generate_from_pixels(decode())
+            self._tile_loaded(tile, None)
+        return tile
+
+    def _tile_loaded(self, tile: _Tile, request: Optional[TextureRequest]) -> None:
+        if request is not None:
+            if tile.request is not request:
+                return
+            tile.request = None
+            if tile.texture.placeholder:
+                # Failed; forget it so a later update() retries
+                self._tile_remove(tile)
+                return
+        level, _, _ = tile.key
+        level_width, level_height = self.source.level_size(level)
+        tile.bytes = (
+            min(self.tile_size, level_width - tile.key[1] * self.tile_size)
+            * min(self.tile_size, level_height - tile.key[2] * self.tile_size)
+            * self.source.channels
+        )
+        self.bytes += tile.bytes
+
+    def _tile_remove(self, tile: _Tile) -> None:
+        if tile.request is not None and self.loader is not None:
+            self.loader.cancel(tile.request)
+            tile.request = None
+        self.tiles.pop(tile.key, None)
+        self.bytes -= tile.bytes
+        tile.bytes = 0
+        tile.texture.unload()
+
+    def _evict(self, wanted: set[TileKey]) -> None:
+        self.tiles_evicted = 0
+        if self.bytes <= self.budget_bytes:
+            return
+        for tile in list(self.tiles.values()):
+            if self.bytes <= self.budget_bytes:
+                break
+            if tile.key in wanted or tile.request is not None:
+                continue
+            self._tile_remove(tile)
+            self.tiles_evicted += 1
+
+    def print(self) -> None:
+        print("TiledImage -> [" + str(self.width) + ", " + str(self.height) + "]")
+        print("\tLevels: " + str(self.levels) + " (drawing " + str(self.level) + ")")
+        print("\tTiles: " + str(len(self.tiles)) + " resident, " + str(self.tiles_visible) + " visible")
+        print("\tBytes: " + str(self.bytes) + " / " + str(self.budget_bytes))
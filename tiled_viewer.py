@@ -0,0 +1,178 @@
+# tiled_viewer.py
+#
+# Pan / zoom viewer for images of any size:
+#
+#     python tiled_viewer.py slide.npy
+#
+# Scroll to zoom about the cursor, drag with the left button to pan.
+import sys
+from pathlib import Path
+
+import glfw
+
+from graphics_pipeline import GraphicsPipeline
+from graphics_library import GraphicsLibrary
+from image_disk_cache import ImageDiskCache
+from matrix import Matrix
+from redraw_scheduler import RedrawScheduler
+from texture_loader import TextureLoader
+from tiled_image import TiledImage, TiledImageSource
+
+import tracing
+
+class TiledViewer:
+    def __init__(self, graphics: GraphicsLibrary, image: TiledImage, scheduler: RedrawScheduler) -> None:
+        self.graphics = graphics
+        self.image = image
+        self.scheduler = scheduler
+
+        self.zoom: float = 1.0
+        self.pan_x: float = 0.0
+        self.pan_y: float = 0.0
+        self.dragging: bool = False
+        self.cursor_x: float = 0.0
+        self.cursor_y: float = 0.0
+
+        self.projection = Matrix()
+        self.model_view = Matrix()
+
+    def fit(self) -> None:
+        graphics = self.graphics
+        self.zoom = min(graphics.width / self.image.width, graphics.height / self.image.height)
+        self.pan_x = (graphics.width - self.image.width * self.zoom) * 0.5
+        self.pan_y = (graphics.height - self.image.height * self.zoom) * 0.5
+        self.scheduler.request_redraw()
+
+    def zoom_at(self, x: float, y: float, factor: float) -> None:
+        # Keep the image point under (x, y) fixed
+        self.pan_x = x - (x - self.pan_x) * factor
+        self.pan_y = y - (y - self.pan_y) * factor
+        self.zoom *= factor
+        self.scheduler.request_redraw()
+
+    def pan_by(self, dx: float, dy: float) -> None:
+        self.pan_x += dx
+        self.pan_y += dy
+        self.scheduler.request_redraw()
+
+    def draw(self) -> None:
+        graphics = self.graphics
+        self.projection.ortho_size(width=graphics.width, height=graphics.height)
+        self.model_view.reset()
+        self.model_view.translate(x=self.pan_x, y=self.pan_y, z=0.0)
+        self.model_view.scale(self.zoom)
+
+        graphics.clear_rgb(0.1, 0.1, 0.12)
+        self.image.update(self.projection, self.model_view)
+        self.image.draw(self.projection, self.model_view)
+
+
+def framebuffer_size_callback(window, width, height):
+    viewer = glfw.get_window_user_pointer(window)
+    viewer.graphics.viewport_set(0, 0, width, height)
+    viewer.graphics.width = width
+    viewer.graphics.height = height
+    viewer.scheduler.request_redraw()
+
+def scroll_callback(window, x_offset, y_offset):
+    viewer = glfw.get_window_user_pointer(window)
+    viewer.zoom_at(viewer.cursor_x, viewer.cursor_y, 1.2 ** y_offset)
+
+def mouse_button_callback(window, button, action, mods):
+    viewer = glfw.get_window_user_pointer(window)
+    if button == glfw.MOUSE_BUTTON_LEFT:
+        viewer.dragging = action == glfw.PRESS
+
+def cursor_pos_callback(window, x, y):
+    viewer = glfw.get_window_user_pointer(window)
+    # Cursor is in window coordinates; scale to framebuffer pixels
+    window_width, window_height = glfw.get_window_size(window)
+    if window_width > 0 and window_height > 0:
+        x *= viewer.graphics.width / window_width
+        y *= viewer.graphics.height / window_height
+    if viewer.dragging:
+        viewer.pan_by(x - viewer.cursor_x, y - viewer.cursor_y)
+    viewer.cursor_x = x
+    viewer.cursor_y = y
+
+def key_callback(window, key, scancode, action, mods):
+    viewer = glfw.get_window_user_pointer(window)
+    if action == glfw.PRESS and key == glfw.KEY_F:
+        viewer.fit()
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python tiled_viewer.py IMAGE")
+        sys.exit(1)
+    trace_path = tracing.enable_from_environment()
+
+    if not glfw.init():
+        print("Failed to initialize GLFW")
+        sys.exit(1)
+
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 2)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 1)
+
+    width, height = 1280, 960
+    window = glfw.create_window(width, height, "Tiled Viewer", None, None)
+    if not window:
+        print("Failed to create GLFW window")
+        glfw.terminate()
+        sys.exit(1)
+    glfw.make_context_current(window)
+    glfw.swap_interval(1)
+    width, height = glfw.get_framebuffer_size(window)
+
+    base_dir = Path(__file__).resolve().parent
+    pipeline = GraphicsPipeline(base_dir / "shaders")
+    graphics = GraphicsLibrary(width=width, height=height)
+    graphics.viewport_set(0, 0, width, height)
+
+    scheduler = RedrawScheduler(idle_timeout=1.0, wake=glfw.post_empty_event)
+    texture_loader = TextureLoader(graphics)
+    texture_loader.attach_scheduler(scheduler)
+
+    # Box-filtered pyramid levels are built once and kept with the decoded-image cache
+    image_cache = ImageDiskCache(ImageDiskCache.default_directory())
+    image = TiledImage(TiledImageSource.from_file(sys.argv[1], image_cache))
+    image.load(graphics, pipeline.program_sprite2d, texture_loader)
+    image.print()
+
+    viewer = TiledViewer(graphics, image, scheduler)
+    viewer.fit()
+
+    glfw.set_window_user_pointer(window, viewer)
+    glfw.set_framebuffer_size_callback(window, framebuffer_size_callback)
+    glfw.set_scroll_callback(window, scroll_callback)
+    glfw.set_mouse_button_callback(window, mouse_button_callback)
+    glfw.set_cursor_pos_callback(window, cursor_pos_callback)
+    glfw.set_key_callback(window, key_callback)
+
+    while not glfw.window_should_close(window):
+        timeout = scheduler.wait_timeout()
+        if timeout > 0.0:
+            with tracing.span("wait_events"):
+                glfw.wait_events_timeout(timeout)
+            scheduler.note_idle_wakeup()
+            continue
+
+        with tracing.span("frame"):
+            graphics.stats_begin_frame()
+            texture_loader.update()
+            viewer.draw()
+            graphics.stats_end_frame()
+            glfw.swap_buffers(window)
+            scheduler.frame_drawn()
+            glfw.poll_events()
+
+    image.print()
+    graphics.stats.print()
+    if trace_path:
+        tracing.dump(trace_path)
+
+    image.unload()
+    texture_loader.shutdown()
+    glfw.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# tracing.py
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+class _NullSpan:
+    """
+    Shared no-op span returned while tracing is off.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.start = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        self.tracer.record(self.name, self.category, self.start, end)
+
+
+class Tracer:
+    """
+    CPU timing spans written as Chrome trace_event JSON
+    (open in Perfetto or chrome://tracing).
+
+        with tracing.span("draw"):
+            ...
+
+    While disabled, span() returns one shared no-op object, so the cost
+    is a flag check and an empty with-block.
+    """
+
+    def __init__(self, max_events: int = 1_000_000) -> None:
+        self.enabled: bool = False
+        self.max_events = int(max_events)
+        self.events: list[dict] = []
+        self.dropped: int = 0
+        self._lock = threading.Lock()
+        self._origin_ns: int = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events = []
+            self.dropped = 0
+            self._origin_ns = time.perf_counter_ns()
+
+    def span(self, name: str, category: str = "cpu"):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category)
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self._origin_ns) / 1000.0,
+            "dur": (end_ns - start_ns) / 1000.0,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+
+    def counter(self, name: str, values: dict[str, float]) -> None:
+        """
+        Emit a counter track sample (e.g. draw calls per frame).
+        """
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "ph": "C",
+            "ts": (time.perf_counter_ns() - self._origin_ns) / 1000.0,
+            "pid": self._pid,
+            "args": values,
+        }
+        with self._lock:
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+
+    def dump(self, path: str) -> None:
+        with self._lock:
+            data = {
+                "traceEvents": list(self.events),
+                "displayTimeUnit": "ms",
+            }
+            if self.dropped:
+                data["otherData"] = {"dropped_events": self.dropped}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        print(f"[Tracer] Wrote {len(data['traceEvents'])} events to {path}")
+
+
+# Process-wide tracer used by the rest of the code
+tracer = Tracer()
+
+def span(name: str, category: str = "cpu"):
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, category)
+
+def enable() -> None:
+    tracer.enable()
+
+def disable() -> None:
+    tracer.disable()
+
+def dump(path: str) -> None:
+    tracer.dump(path)
+
+def enable_from_environment(variable: str = "TRACE_FILE") -> Optional[str]:
+    """
+    Turn tracing on if the environment variable names an output file.
+    Returns that path, or None.
+    """
+    path = os.environ.get(variable)
+    if path:
+        tracer.enable()
+    return path
@@ -0,0 +1,184 @@
+# vertex_array.py
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+import tracing
+from float_bufferable import FloatBufferable
+from primitives import (
+    SHAPE_2D_VERTEX_DTYPE,
+    SHAPE_2D_COLORED_VERTEX_DTYPE,
+    SPRITE_2D_VERTEX_DTYPE,
+    SPRITE_2D_COLORED_VERTEX_DTYPE,
+    INSTANCE_2D_DTYPE,
+)
+
+class VertexArray:
+    """
+    Contiguous vertex storage backed by a structured numpy array.
+
+    Each subclass picks a dtype that matches one of the dataclass vertices
+    in primitives.py, so floats() is byte-for-byte what the per-vertex
+    write_to_buffer() loop would have produced, without any Python work
+    per vertex. GraphicsArrayBuffer.load/write take these directly.
+    """
+
+    dtype: np.dtype = SHAPE_2D_VERTEX_DTYPE
+
+    def __init__(self, count: int = 0, data: Optional[np.ndarray] = None) -> None:
+        if data is not None:
+            if data.dtype != self.dtype:
+                raise ValueError(
+                    f"{type(self).__name__} expects dtype {self.dtype}, got {data.dtype}"
+                )
+            self.data: np.ndarray = np.ascontiguousarray(data)
+        else:
+            self.data = np.zeros(int(count), dtype=self.dtype)
+
+    @classmethod
+    def from_items(cls, items: Sequence[FloatBufferable]) -> "VertexArray":
+        """
+        One-time conversion from a list of dataclass vertices.
+        """
+        with tracing.span("VertexArray.from_items"):
+            buf: list[float] = []
+            for item in items:
+                item.write_to_buffer(buf)
+            floats = np.asarray(buf, dtype=np.float32)
+        return cls(data=floats.view(cls.dtype))
+
+    @classmethod
+    def from_floats(cls, floats: np.ndarray) -> "VertexArray":
+        """
+        Wrap an interleaved float32 array (no copy if already contiguous).
+        """
+        floats = np.ascontiguousarray(floats, dtype=np.float32).reshape(-1)
+        return cls(data=floats.view(cls.dtype))
+
+    def __len__(self) -> int:
+        return int(self.data.shape[0])
+
+    # Floats per vertex, same meaning as FloatBufferable.size()
+    def vertex_size(self) -> int:
+        return self.dtype.itemsize // 4
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes)
+
+    def floats(self) -> np.ndarray:
+        """
+        Flat float32 view of the whole array (no copy).
+        """
+        return self.data.view(np.float32).reshape(-1)
+
+    def resize(self, count: int) -> None:
+        count = int(count)
+        if count == len(self):
+            return
+        new_data = np.zeros(count, dtype=self.dtype)
+        keep = min(count, len(self))
+        new_data[:keep] = self.data[:keep]
+        self.data = new_data
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.data["position"]
+
+
+class Shape2DVertexArray(VertexArray):
+    dtype = SHAPE_2D_VERTEX_DTYPE
+
+
+class Shape2DColoredVertexArray(VertexArray):
+    dtype = SHAPE_2D_COLORED_VERTEX_DTYPE
+
+    @property
+    def color(self) -> np.ndarray:
+        return self.data["color"]
+
+
+class Sprite2DVertexArray(VertexArray):
+    dtype = SPRITE_2D_VERTEX_DTYPE
+
+    @property
+    def uv(self) -> np.ndarray:
+        return self.data["uv"]
+
+
+class Sprite2DColoredVertexArray(VertexArray):
+    dtype = SPRITE_2D_COLORED_VERTEX_DTYPE
+
+    @property
+    def uv(self) -> np.ndarray:
+        return self.data["uv"]
+
+    @property
+    def color(self) -> np.ndarray:
+        return self.data["color"]
+
+
+class Instance2DArray(VertexArray):
+    """
+    Per-instance attributes for the *_2d_instanced programs:
+    offset, scale, rotation (radians), color, uv_rect (u0, v0, u1, v1).
+    """
+
+    dtype = INSTANCE_2D_DTYPE
+
+    def __init__(self, count: int = 0, data: Optional[np.ndarray] = None) -> None:
+        super().__init__(count=count, data=data)
+        if data is None:
+            self._set_defaults(self.data)
+
+    def resize(self, count: int) -> None:
+        old_count = len(self)
+        super().resize(count)
+        if len(self) > old_count:
+            self._set_defaults(self.data[old_count:])
+
+    @staticmethod
+    def _set_defaults(rows: np.ndarray) -> None:
+        # Visible, untinted, full texture
+        rows["scale"] = 1.0
+        rows["color"] = 1.0
+        rows["uv_rect"] = (0.0, 0.0, 1.0, 1.0)
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.data["offset"]
+
+    @property
+    def offset(self) -> np.ndarray:
+        return self.data["offset"]
+
+    @property
+    def scale(self) -> np.ndarray:
+        return self.data["scale"]
+
+    @property
+    def rotation(self) -> np.ndarray:
+        return self.data["rotation"]
+
+    @property
+    def color(self) -> np.ndarray:
+        return self.data["color"]
+
+    @property
+    def uv_rect(self) -> np.ndarray:
+        return self.data["uv_rect"]
+
+
+def unit_quad_sprite_vertices() -> Sprite2DVertexArray:
+    """
+    Quad centered on the origin with size 1, uv 0..1, in quad_indices() order.
+    """
+    return Sprite2DVertexArray.from_floats(np.array([
+        -0.5, -0.5, 0.0, 0.0,
+        0.5, -0.5, 1.0, 0.0,
+        -0.5, 0.5, 0.0, 1.0,
+        0.5, 0.5, 1.0, 1.0,
+    ], dtype=np.float32))